@@ -1,9 +1,20 @@
 from google import genai
 import os
-import json
-import re
 from dotenv import load_dotenv
 
+from agents.codegen import (
+    EditApplyError, apply_edit_response, batch_section, edit_mode_section,
+    generate_batch, generate_complete, plan_batches,
+)
+from agents.context_cache import PrefixCache
+from agents.prompt_builder import CodeContext, PromptBuilder
+from agents.prompt_slices import catalogue_index, slice_section
+from agents.templates import emit_templates
+from blob_store import CodesView
+from checkpoint import record_file_done
+from manifest import is_backend
+from token_budget import remaining
+
 load_dotenv()
 client = genai.Client(
     api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -11,33 +22,19 @@ client = genai.Client(
 
 _BE_MODEL = os.getenv("BE_MODEL", "gemini-2.5-flash")
 
-_FRONTEND_EXTENSIONS = {".html", ".css", ".js", ".ts", ".tsx", ".jsx", ".vue", ".svelte"}
-_FRONTEND_DIR_PREFIXES = ("frontend", "static", "public", "src", "client", "web", "templates")
-
-_BACKEND_EXTENSIONS = {".py", ".txt", ".cfg", ".ini", ".toml", ".yaml", ".yml"}
-
-
-def _is_backend_file(file_path: str) -> bool:
-    """파일이 백엔드 담당인지 판별."""
-    normalized = file_path.replace("\\", "/").lower()
-    ext = os.path.splitext(normalized)[1]
-
-    if ext in _FRONTEND_EXTENSIONS:
-        return False
-    for prefix in _FRONTEND_DIR_PREFIXES:
-        if normalized.startswith(prefix + "/"):
-            return False
-
-    if normalized == "design_spec.json":
-        return False
-
-    if ext in _BACKEND_EXTENSIONS:
-        return True
-
-    if not ext:
-        return True
+# 신규 파일(전체 생성) 출력 규칙 — 고도화 수정 파일은 codegen.edit_mode_section으로 대체
+_FULL_OUTPUT_RULES = """
+파일 확장자에 맞는 마크다운 코드 블록으로만 답변하세요. JSON 형식 사용 금지.
+출력 형식 예시 (Python 파일인 경우):
+```python
+# 전체 코드
+from fastapi import FastAPI
+...
+```
 
-    return False
+[필수] 코드 블록 앞뒤에 다른 텍스트나 설명을 추가하지 마세요.
+[필수] 코드가 아무리 길어도 절대 생략하거나 잘라내지 마세요.
+"""
 
 
 def backend_agent(state: dict) -> dict:
@@ -51,7 +48,7 @@ def backend_agent(state: dict) -> dict:
     file_tree = state.get("file_tree", {})
     interface_contracts = state.get("interface_contracts", {})
 
-    be_files = {path: desc for path, desc in file_tree.items() if _is_backend_file(path)}
+    be_files = {path: desc for path, desc in file_tree.items() if is_backend(path)}
 
     # 순수 프론트엔드 프로젝트는 백엔드 생성 불필요
     if project_type == "frontend_only":
@@ -65,47 +62,30 @@ def backend_agent(state: dict) -> dict:
         state.update({"current_step": "QC"})
         return state
 
-    codes = state.get("codes", {})
+    codes = state.setdefault("codes", CodesView())
+    done_files = set(state.get("done_files", []))
+    impact_scope = state.get("impact_scope")
+    # 고도화 모드에서 이미 존재하는 파일은 편집 블록으로만 수정 (신규 파일은 전체 생성)
+    editable_paths = set(codes) if state.get("mode") == "upgrade" else set()
     all_files = "\n".join(f"- {path}: {desc}" for path, desc in file_tree.items())
 
-    # 전체 인터페이스 계약 요약
-    all_contracts_str = "\n".join(
-        f"- {path}: {contract}" for path, contract in interface_contracts.items()
-    ) if interface_contracts else "(인터페이스 계약 없음)"
+    # 계약 전체 목록 (한 줄) — 계약 본문은 파일별로 관련된 것만
+    catalogue_str = catalogue_index({}, interface_contracts)
 
-    for file_path, file_description in be_files.items():
-        print(f"  ⚙️  BE 생성 중: {file_path}")
-
-        existing_codes_context = ""
-        if codes:
-            existing_codes_context = "\n\n=== 이미 생성된 파일들 ===\n"
-            for existing_path, existing_code in codes.items():
-                if existing_path != "design_spec.json":
-                    existing_codes_context += f"\n--- {existing_path} ---\n{existing_code}\n"
-
-        current_contract = interface_contracts.get(file_path, "")
-
-        prompt = f"""
+    # 파일마다 바뀌지 않는 공유 접두부 — 한 번만 조립해 모든 파일 호출이 재사용
+    prompt_builder = PromptBuilder(f"""
 당신은 시니어 백엔드 개발자입니다.
-아래 기획서와 파일 구조를 바탕으로 "{file_path}" 파일의 완전한 코드를 작성하세요.
+아래 기획서와 파일 구조를 바탕으로, 마지막에 지정하는 파일의 완전한 코드를 작성하세요.
 
 === 기획서 (PRD) ===
 {prd}
 
 === 전체 파일 구조 ===
 {all_files}
-{existing_codes_context}
-
-=== 인터페이스 계약 (반드시 준수) ===
-이 파일이 반드시 구현해야 하는 API:
-{current_contract or '(이 파일에 대한 계약 없음)'}
 
-프로젝트 전체 인터페이스 계약:
-{all_contracts_str}
-
-=== 현재 작성할 파일 ===
-파일 경로: {file_path}
-파일 역할: {file_description}
+=== 인터페이스 계약 색인 ===
+{catalogue_str}
+(관련 파일 계약은 파일별로 아래에 제공)
 
 요구사항:
 1. 실제로 실행 가능한 완전한 코드를 작성하세요 (절대 생략 없이 전체 코드)
@@ -127,48 +107,119 @@ def backend_agent(state: dict) -> dict:
    ❌ 존재하지 않는 패키지(salt, ansible, sorten 등) 포함 금지
 6. Pydantic v2 문법: model_config = ConfigDict(from_attributes=True)
 7. SQLAlchemy 2.0 문법: from sqlalchemy.orm import DeclarativeBase
+""")
+    # 고도화 모드에서는 영향 범위 밖 파일을 골격(시그니처)만 보여 줌
+    code_context = CodeContext(impact_scope)
+    prefix_cache = PrefixCache(client, _BE_MODEL, prompt_builder, label="BE")
+
+    try:
+        # 신규 파일: 템플릿 → 작은 파일 묶음 생성 → 나머지는 아래 파일별 생성
+        pending = {
+            p: d for p, d in be_files.items()
+            if p not in editable_paths and not (p in done_files and p in codes)
+        }
+        emitted = set()   # 템플릿·묶음 생성으로 이미 만든 파일
+        # 보일러플레이트(빈 __init__.py, Vector2, index.html 뼈대 등)는 모델 호출 없이 템플릿으로 생성
+        for path, (template, code) in emit_templates(pending, state).items():
+            print(f"  🧩 BE 템플릿 생성: {path} ({template})")
+            codes[path] = code
+            emitted.add(path)
+            del pending[path]
+            record_file_done(state, path)
+        for batch in plan_batches(pending, interface_contracts):
+            batch_files = {p: pending[p] for p in batch}
+            print(f"  📦 BE 묶음 생성 중 ({len(batch)}개): {', '.join(batch)}")
+            batch_slices = slice_section(None, batch_files, interface_contracts)
+            batch_context = code_context.render(
+                codes, skip=("design_spec.json", *batch),
+                budget=remaining(_BE_MODEL, prompt_builder.prefix, batch_slices,
+                                 batch_section(batch_files, interface_contracts)),
+                model=_BE_MODEL,
+            )
+            try:
+                generated = generate_batch(prefix_cache.generate, batch_files, interface_contracts,
+                                           batch_context + batch_slices)
+            except Exception as e:
+                print(f"  ⚠️  묶음 생성 실패: {e} → 파일별 생성")
+                continue
+            for path, code in generated.items():
+                codes[path] = code
+                emitted.add(path)
+                record_file_done(state, path)
+            missing = [p for p in batch if p not in generated]
+            if missing:
+                print(f"  ↩️  묶음에서 빠졌거나 검증 실패 → 파일별 생성: {', '.join(missing)}")
+
+        for file_path, file_description in be_files.items():
+            if file_path in emitted:
+                continue
+            if file_path in done_files and file_path in codes:
+                print(f"  ♻️  체크포인트 재사용: {file_path}")
+                continue
+
+            edit_mode = file_path in editable_paths
+            print(f"  ⚙️  BE {'수정' if edit_mode else '생성'} 중: {file_path}")
+
+            current_contract = interface_contracts.get(file_path, "")
+
+            file_section = f"""
+=== 현재 작성할 파일 ===
+파일 경로: {file_path}
+파일 역할: {file_description}
 
-파일 확장자에 맞는 마크다운 코드 블록으로만 답변하세요. JSON 형식 사용 금지.
-출력 형식 예시 (Python 파일인 경우):
-```python
-# 전체 코드
-from fastapi import FastAPI
-...
-```
-
-[필수] 코드 블록 앞뒤에 다른 텍스트나 설명을 추가하지 마세요.
-[필수] 코드가 아무리 길어도 절대 생략하거나 잘라내지 마세요.
+=== 이 파일의 인터페이스 계약 (반드시 준수) ===
+이 파일이 반드시 구현해야 하는 API:
+{current_contract or '(이 파일에 대한 계약 없음)'}
+{slice_section(None, {file_path: file_description}, interface_contracts, codes if edit_mode else None)}
 """
 
-        response = None
-        try:
-            response = client.models.generate_content(
-                model=_BE_MODEL,
-                contents=prompt,
+            if edit_mode:
+                try:
+                    current_code = codes[file_path]
+                except KeyError:
+                    # 목록에는 있지만 읽을 수 없는 파일 (UTF-8이 아니거나 스캔 후 삭제됨) → 이 파일만 건너뜀
+                    print(f"  ⚠️  {file_path} 읽기 실패 → 수정 건너뜀")
+                    continue
+                current_section = f"\n=== 현재 파일 내용 ({file_path}) ===\n{current_code}\n"
+                fixed_sections = (file_section, current_section, edit_mode_section(file_path))
+            else:
+                fixed_sections = (file_section, _FULL_OUTPUT_RULES)
+
+            # 기존 파일 컨텍스트는 모델 한도에서 고정 부분을 뺀 예산 안에서만 (넘치면 골격 → 생략)
+            existing_codes_context = code_context.render(
+                codes, skip=("design_spec.json", file_path),
+                budget=remaining(_BE_MODEL, prompt_builder.prefix, *fixed_sections), model=_BE_MODEL,
             )
-            raw = response.text.strip()
-
-            # ── 1순위: 마크다운 코드 블록 추출 ──────────────────────────────
-            code_match = re.search(r"```(?:[\w+\-]*)\n(.*?)```", raw, re.DOTALL)
-            if code_match:
-                codes[file_path] = code_match.group(1).rstrip()
-                continue  # 성공 → 다음 파일로
+            suffix = (existing_codes_context, *fixed_sections)
 
-            # ── 2순위: JSON {"code": ...} 파싱 (하위 호환) ──────────────────
             try:
-                json_str = raw
-                if raw.startswith("```"):
-                    json_str = re.sub(r"^```(?:json)?\n?", "", raw)
-                    json_str = re.sub(r"\n?```$", "", json_str.strip())
-                result = json.loads(json_str)
-                codes[file_path] = result.get("code", raw)
-            except (json.JSONDecodeError, ValueError):
-                # ── 3순위: 응답 전체를 코드로 사용 ─────────────────────────
-                codes[file_path] = raw
-
-        except Exception as e:
-            print(f"  ⚠️  {file_path} 생성 실패: {e}")
-            codes[file_path] = f"# 생성 실패: {e}"
+                if edit_mode:
+                    raw = prefix_cache.generate(*suffix).text.strip()
+                    try:
+                        codes[file_path], block_count = apply_edit_response(file_path, current_code, raw)
+                        print(f"  ✂️  편집 블록 {block_count}개 적용: {file_path}")
+                    except EditApplyError as e:
+                        # 편집 블록을 안전하게 적용할 수 없으면 현재 내용을 보여 주고 전체 재생성
+                        print(f"  ⚠️  편집 블록 적용 실패 ({e}) → 전체 재생성")
+                        codes[file_path] = generate_complete(
+                            prefix_cache.generate, file_path,
+                            existing_codes_context, file_section, current_section, _FULL_OUTPUT_RULES,
+                        )
+                else:
+                    # 출력 한도에서 잘리면 마지막 완전한 줄부터 이어쓰기 요청
+                    codes[file_path] = generate_complete(prefix_cache.generate, file_path, *suffix)
+
+            except Exception as e:
+                print(f"  ⚠️  {file_path} 생성 실패: {e}")
+                if not edit_mode:
+                    codes[file_path] = f"# 생성 실패: {e}"
+                continue  # 실패 파일은 완료 처리하지 않음 → 재개 시 재생성
+
+            # 파일 단위 체크포인트 (중단 후 재개 시 이 파일은 다시 생성하지 않음)
+            record_file_done(state, file_path)
+    finally:
+        # 예외·Ctrl-C로 빠져나가도 과금되는 캐시를 남기지 않음
+        prefix_cache.close()
 
     state.update({
         "codes": codes,
@@ -0,0 +1,468 @@
+"""FE/BE 코드 생성 응답 처리 (전체 코드 추출 + 고도화용 검색/치환 편집 모드).
+
+고도화 모드에서 기존 파일을 "수정"할 때 파일 전체를 다시 생성하면 출력 토큰을 전부 다시
+지불하고, 요청과 무관한 코드가 빠질 위험도 있습니다. 편집 모드에서는 모델에게 현재 파일을
+보여 주고 아래 형식의 편집 블록만 받아, 로컬에서 검증한 뒤 적용합니다.
+
+    <<<<<<< SEARCH
+    (현재 파일에 그대로 존재하는 연속된 줄)
+    =======
+    (바꿀 내용)
+    >>>>>>> REPLACE
+
+SEARCH 내용은 파일에서 정확히 한 곳과 일치해야 합니다 (줄 끝 공백·들여쓰기 차이는 허용).
+적용할 수 없으면 EditApplyError가 발생하며, 호출측은 전체 재생성으로 되돌아갑니다.
+
+작은 파일(빈 __init__.py, 설명이 짧은 설정 파일)은 plan_batches()로 묶어 한 번의 요청으로
+여러 파일을 받습니다 (=== FILE: 경로 === 다음 코드 블록 형식). 파일별로 검증해 통과한 파일만
+채택하고, 빠졌거나 검증에 실패한 파일은 호출측이 개별 생성으로 처리합니다.
+
+전체 코드 생성 응답이 출력 한도에서 잘린 경우(finish_reason MAX_TOKENS, 닫히지 않은 코드 블록)에는
+generate_complete()가 마지막 완전한 줄 다음부터 이어 쓰도록 최대 CODEGEN_MAX_CONTINUATIONS(기본 3)번
+요청하고 결과를 이어 붙입니다. 닫히지 않은 괄호·JSON·HTML(looks_incomplete)은 근사치라 경고만 합니다.
+"""
+
+import ast
+import json
+import os
+import re
+
+_CODE_BLOCK_RE = re.compile(r"```(?:[\w+\-]*)\n(.*?)```", re.DOTALL)
+_EDIT_BLOCK_RE = re.compile(
+    r"^<{5,9} ?SEARCH[^\n]*\n(.*?)^={5,9}[ \t]*\n(.*?)^>{5,9} ?REPLACE[^\n]*$",
+    re.DOTALL | re.MULTILINE,
+)
+
+
+_MAX_CONTINUATIONS = int(os.getenv("CODEGEN_MAX_CONTINUATIONS", "3"))
+_CONTINUATION_TAIL_LINES = 30     # 이어쓰기 요청에 보여 줄 마지막 줄 수
+_MAX_OVERLAP_LINES = 40           # 이어 붙일 때 중복 제거를 위해 비교할 최대 줄 수
+_BRACE_EXTENSIONS = {".js", ".mjs", ".ts", ".tsx", ".jsx", ".css"}
+# 이 문자나 키워드 뒤의 "/"는 나눗셈이 아니라 정규식 리터럴의 시작
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "yield", "await"}
+
+# 작은 파일 묶음 생성
+_BATCH_SIZE = int(os.getenv("CODEGEN_BATCH_SIZE", "6"))          # 1 이하면 묶지 않음
+_SMALL_SPEC_CHARS = 120    # 설명 + 계약이 이보다 길면 작은 파일로 보지 않음 (빈 __init__.py 제외)
+_TRIVIAL_NAMES = {
+    "requirements.txt", ".gitignore", ".env", ".env.example",
+    "config.py", "settings.py", "constants.py", "config.js", "constants.js",
+}
+# 설정·데이터 형식만 — CSS나 util/helper 같은 경로 이름은 그것만으로 작다고 보지 않음
+_SMALL_EXTENSIONS = {".txt", ".toml", ".ini", ".cfg", ".env", ".yaml", ".yml"}
+_MULTI_FILE_RE = re.compile(
+    r"^=== FILE: (?P<path>[^\n=]+?) ===[ \t]*\n```[\w+\-]*\n(?P<code>.*?)```",
+    re.DOTALL | re.MULTILINE,
+)
+
+
+class EditApplyError(ValueError):
+    """편집 블록을 파일에 안전하게 적용할 수 없음."""
+
+
+def extract_code(raw: str) -> str:
+    """모델 응답에서 파일 코드를 추출 (코드 블록 → JSON {"code"} → 응답 전체 순)."""
+    # ── 1순위: 마크다운 코드 블록 추출 ──────────────────────────────
+    code_match = _CODE_BLOCK_RE.search(raw)
+    if code_match:
+        return code_match.group(1).rstrip()
+    # ── 2순위: JSON {"code": ...} 파싱 (하위 호환) ──────────────
+    try:
+        json_str = raw
+        if raw.startswith("```"):
+            json_str = re.sub(r"^```(?:json)?\n?", "", raw)
+            json_str = re.sub(r"\n?```$", "", json_str.strip())
+        result = json.loads(json_str)
+        return result.get("code", raw)
+    except (json.JSONDecodeError, ValueError, AttributeError):
+        # ── 3순위: 응답 전체를 코드로 사용 ─────────────────────
+        return raw
+
+
+def edit_mode_section(file_path: str) -> str:
+    """편집 모드 출력 규칙 (전체 코드 출력 규칙 대신 프롬프트 끝에 붙임)."""
+    return f"""
+=== [수정 모드] 출력 형식 ===
+"{file_path}"은(는) 이미 존재하는 파일입니다. 파일 전체를 다시 쓰지 말고,
+바꿔야 하는 부분만 아래 형식의 편집 블록으로 답변하세요.
+
+<<<<<<< SEARCH
+(현재 파일에 있는 그대로의 연속된 줄 — 한 글자도 바꾸지 말 것)
+=======
+(그 부분을 대체할 새 내용)
+>>>>>>> REPLACE
+
+규칙:
+1. SEARCH 내용은 현재 파일에서 정확히 한 곳과 일치해야 합니다. 모호하면 앞뒤 줄을 더 포함하세요.
+2. 변경할 곳이 여러 군데면 편집 블록을 여러 개 작성하세요 (파일 내 순서대로).
+3. 파일 끝에 코드를 추가할 때만 SEARCH를 비워 두세요.
+4. 편집 블록 외의 설명, 마크다운 코드 블록, 파일 전체 코드는 출력하지 마세요.
+"""
+
+
+def parse_edit_blocks(raw: str) -> list:
+    """응답 → [(search, replace), ...]. 블록이 없으면 빈 리스트."""
+    return [(m.group(1), m.group(2)) for m in _EDIT_BLOCK_RE.finditer(raw)]
+
+
+def _indent(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _find_loose(lines: list, search_lines: list) -> list:
+    """앞뒤 공백을 무시하고 search_lines와 일치하는 시작 줄 번호 목록."""
+    target = [l.strip() for l in search_lines]
+    n = len(target)
+    return [
+        i for i in range(len(lines) - n + 1)
+        if [l.strip() for l in lines[i:i + n]] == target
+    ]
+
+
+def _apply_one(content: str, search: str, replace: str) -> str:
+    if not search.strip():
+        sep = "" if not content or content.endswith("\n") else "\n"
+        return content + sep + replace
+
+    count = content.count(search)
+    if count == 1:
+        return content.replace(search, replace, 1)
+    if count > 1:
+        raise EditApplyError(f"SEARCH 블록이 {count}곳과 일치 (모호함): {search.strip()[:60]!r}")
+
+    # 들여쓰기·줄 끝 공백 차이 허용: 줄 단위로 비교하고, 들여쓰기 차이만큼 REPLACE를 보정
+    lines = content.split("\n")
+    search_lines = search.rstrip("\n").split("\n")
+    matches = _find_loose(lines, search_lines)
+    if len(matches) != 1:
+        reason = "일치하는 곳 없음" if not matches else f"{len(matches)}곳과 일치 (모호함)"
+        raise EditApplyError(f"SEARCH 블록 {reason}: {search.strip()[:60]!r}")
+
+    start = matches[0]
+    first = next((j for j, l in enumerate(search_lines) if l.strip()), 0)
+    actual_indent = _indent(lines[start + first])
+    search_indent = _indent(search_lines[first])
+    replaced = []
+    for line in replace.rstrip("\n").split("\n") if replace.strip() else []:
+        if line.startswith(search_indent):
+            line = actual_indent + line[len(search_indent):]
+        replaced.append(line)
+    return "\n".join(lines[:start] + replaced + lines[start + len(search_lines):])
+
+
+def _validate(file_path: str, original: str, updated: str) -> None:
+    """적용 결과가 원본보다 나빠지지 않았는지 확인 (Python 문법, JSON 형식)."""
+    if file_path.endswith(".py"):
+        try:
+            ast.parse(original)
+        except SyntaxError:
+            return  # 원본부터 깨져 있으면 비교 기준 없음
+        try:
+            ast.parse(updated)
+        except SyntaxError as e:
+            raise EditApplyError(f"적용 결과 Python 문법 오류 (line {e.lineno}): {e.msg}")
+    elif file_path.endswith(".json"):
+        try:
+            json.loads(updated)
+        except json.JSONDecodeError as e:
+            raise EditApplyError(f"적용 결과 JSON 형식 오류: {e}")
+
+
+def apply_edit_response(file_path: str, original: str, raw: str) -> tuple:
+    """편집 모드 응답을 원본에 적용 → (새 코드, 적용한 블록 수).
+
+    Raises:
+        EditApplyError: 편집 블록이 없거나, 일치하지 않거나, 결과가 검증을 통과하지 못함
+    """
+    blocks = parse_edit_blocks(raw)
+    if not blocks:
+        raise EditApplyError("편집 블록 없음")
+    updated = original
+    for search, replace in blocks:
+        updated = _apply_one(updated, search, replace)
+    _validate(file_path, original, updated)
+    return updated, len(blocks)
+
+
+# ── 잘린 응답 감지 & 이어쓰기 ─────────────────────────────────────────────────
+
+def _finish_truncated(response) -> bool:
+    """finish_reason이 MAX_TOKENS인지 (정보가 없으면 False)."""
+    for candidate in getattr(response, "candidates", None) or []:
+        reason = getattr(candidate, "finish_reason", None)
+        if reason is not None and "MAX_TOKENS" in str(getattr(reason, "name", reason)):
+            return True
+    return False
+
+
+def _fence_unclosed(raw: str) -> bool:
+    """코드 블록을 열고 닫지 않은 응답인지."""
+    return raw.lstrip().startswith("```") and _CODE_BLOCK_RE.search(raw) is None
+
+
+def _regex_allowed(code: str, i: int) -> bool:
+    """i 위치의 "/"가 나눗셈이 아니라 정규식 리터럴의 시작일 수 있는지 (앞 토큰 기준)."""
+    j = i - 1
+    while j >= 0 and code[j] in " \t\r\n":
+        j -= 1
+    if j < 0 or code[j] in _REGEX_PRECEDERS:
+        return True
+    end = j + 1
+    while j >= 0 and (code[j].isalnum() or code[j] in "_$"):
+        j -= 1
+    return code[j + 1:end] in _REGEX_KEYWORDS
+
+
+def _skip_regex(code: str, i: int) -> int:
+    """i의 "/"로 시작하는 정규식 리터럴 다음 위치 (줄 안에서 닫히지 않으면 -1)."""
+    in_class = False
+    j, n = i + 1, len(code)
+    while j < n and code[j] != "\n":
+        ch = code[j]
+        if ch == "\\":
+            j += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            j += 1
+            while j < n and code[j].isalpha():
+                j += 1   # 플래그
+            return j
+        j += 1
+    return -1
+
+
+def _brace_depth(code: str) -> int:
+    """문자열·주석·정규식 리터럴을 건너뛰고 센 여는 괄호 - 닫는 괄호 (JS/CSS용 근사치)."""
+    depth = 0
+    quote = None
+    i, n = 0, len(code)
+    while i < n:
+        ch = code[i]
+        if quote is not None:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote or (ch == "\n" and quote != "`"):
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        elif ch == "/" and _regex_allowed(code, i):
+            end = _skip_regex(code, i)
+            if end > 0:
+                i = end
+                continue
+        elif ch in "{[(":
+            depth += 1
+        elif ch in "}])":
+            depth -= 1
+        i += 1
+    return depth
+
+
+def looks_incomplete(file_path: str, code: str) -> bool:
+    """파일이 중간에서 끊긴 것으로 보이는지 (닫히지 않은 괄호·문자열, JSON·HTML 미완결)."""
+    ext = os.path.splitext(file_path)[1].lower()
+    stripped = code.rstrip()
+    if not stripped:
+        return False
+    if ext == ".py":
+        try:
+            ast.parse(code)
+        except SyntaxError as e:
+            message = str(e.msg)
+            return "never closed" in message or "EOF" in message or (e.lineno or 0) >= len(stripped.splitlines())
+        return False
+    if ext == ".json":
+        try:
+            json.loads(code)
+        except json.JSONDecodeError as e:
+            return e.pos >= len(stripped) - 1
+        return False
+    if ext == ".html":
+        lowered = stripped.lower()
+        return "<html" in lowered and not lowered.endswith("</html>")
+    if ext in _BRACE_EXTENSIONS:
+        return _brace_depth(code) > 0
+    return False
+
+
+def extract_partial(raw: str) -> str:
+    """잘린 응답에서 지금까지의 코드 (닫히지 않은 코드 블록의 여는 줄 제거).
+
+    코드 블록이 닫혀 있으면 마지막 줄도 완전한 줄이므로 줄바꿈으로 끝나게 돌려줍니다
+    (stitch가 마지막 줄을 끊긴 줄로 보고 버리지 않도록).
+    """
+    if _fence_unclosed(raw):
+        return raw.lstrip().split("\n", 1)[1] if "\n" in raw.lstrip() else ""
+    code = extract_code(raw)
+    return code + "\n" if code else code
+
+
+def continuation_section(file_path: str, partial: str) -> str:
+    """이어쓰기 요청 (프롬프트 끝에 붙임). partial의 마지막 완전한 줄 다음부터 받습니다."""
+    complete = _complete_lines(partial)
+    tail = "\n".join(complete.split("\n")[-_CONTINUATION_TAIL_LINES:])
+    return f"""
+=== [이어쓰기] ===
+"{file_path}"의 이전 응답이 출력 한도에서 잘렸습니다. 지금까지 작성된 코드는 {len(complete.splitlines())}줄이며,
+마지막 부분은 다음과 같습니다:
+```
+{tail}
+```
+위 마지막 줄의 "바로 다음 줄"부터 파일 끝까지 이어서 작성하세요.
+이미 작성된 줄을 반복하지 말고, 이어지는 코드만 마크다운 코드 블록 하나로 답변하세요.
+"""
+
+
+def _complete_lines(code: str) -> str:
+    """마지막 줄바꿈 이후의 끊긴 줄을 버린 코드 (줄바꿈으로 끝나면 그대로)."""
+    cut = code.rfind("\n")
+    return code[:cut + 1] if cut >= 0 else ""
+
+
+def stitch(partial: str, continuation: str) -> str:
+    """partial의 완전한 줄까지 + continuation (앞부분이 partial 끝과 겹치면 중복 제거)."""
+    head = _complete_lines(partial)
+    head_lines = head.rstrip("\n").split("\n") if head else []
+    cont_lines = continuation.split("\n")
+    for size in range(min(_MAX_OVERLAP_LINES, len(head_lines), len(cont_lines)), 0, -1):
+        if [l.rstrip() for l in head_lines[-size:]] == [l.rstrip() for l in cont_lines[:size]]:
+            cont_lines = cont_lines[size:]
+            break
+    return head + "\n".join(cont_lines)
+
+
+def generate_complete(generate, file_path: str, *suffix: str) -> str:
+    """generate(*suffix)로 전체 코드를 받고, 잘렸으면 이어쓰기 요청을 반복해 완성된 코드를 반환.
+
+    이어쓰기는 확실한 신호(finish_reason MAX_TOKENS, 닫히지 않은 코드 블록)가 있을 때만 합니다.
+    looks_incomplete()는 근사치라 완성된 파일도 미완결로 볼 수 있으므로 경고만 출력합니다.
+
+    Args:
+        generate: 프롬프트 접미부 조각들을 받아 모델 응답을 돌려주는 함수 (PrefixCache.generate 등)
+        file_path: 생성할 파일 경로 (미완결 판정용)
+        suffix: 프롬프트 접미부
+    """
+    response = generate(*suffix)
+    raw = (response.text or "").strip()
+    if not (_finish_truncated(response) or _fence_unclosed(raw)):
+        code = extract_code(raw)
+        if looks_incomplete(file_path, code):
+            print(f"  ⚠️  미완결로 보이지만 잘림 신호가 없어 그대로 사용: {file_path}")
+        return code
+    code = extract_partial(raw)
+
+    for attempt in range(1, _MAX_CONTINUATIONS + 1):
+        print(f"  ✂️  응답 잘림 감지 → 이어쓰기 {attempt}/{_MAX_CONTINUATIONS}: {file_path}")
+        response = generate(*suffix, continuation_section(file_path, code))
+        raw = (response.text or "").strip()
+        piece = extract_partial(raw)
+        if not piece.strip():
+            break
+        truncated = _finish_truncated(response) or _fence_unclosed(raw)
+        code = stitch(code, piece)
+        if not truncated:
+            if looks_incomplete(file_path, code):
+                print(f"  ⚠️  이어쓰기 후에도 미완결로 보임: {file_path}")
+            return code.rstrip()
+    print(f"  ⚠️  이어쓰기로 완성하지 못함 — 잘린 채로 저장: {file_path}")
+    return code.rstrip()
+
+
+# ── 작은 파일 묶음 생성 ───────────────────────────────────────────────────────
+
+def is_small_file(file_path: str, description: str = "", contract="") -> bool:
+    """PM 설명·계약·경로로 추정한 "짧은 파일" 여부 (계약 없는 __init__.py, 설명이 짧은 설정 파일)."""
+    name = file_path.replace("\\", "/").lower().rsplit("/", 1)[-1]
+    if name == "__init__.py" and not contract:
+        return True
+    if len(description or "") + len(str(contract or "")) > _SMALL_SPEC_CHARS:
+        return False
+    return name in _TRIVIAL_NAMES or os.path.splitext(name)[1] in _SMALL_EXTENSIONS
+
+
+def plan_batches(files: dict, contracts: dict = None) -> list:
+    """{경로: 설명} → 작은 파일 묶음 목록 [[경로, ...], ...] (2개 이상인 묶음만).
+
+    묶음에 들지 않은 파일은 호출측이 기존대로 파일별로 생성합니다.
+    """
+    if _BATCH_SIZE <= 1:
+        return []
+    contracts = contracts or {}
+    small = [p for p, desc in files.items() if is_small_file(p, desc, contracts.get(p, ""))]
+    batches = [small[i:i + _BATCH_SIZE] for i in range(0, len(small), _BATCH_SIZE)]
+    return [batch for batch in batches if len(batch) > 1]
+
+
+def batch_section(files: dict, contracts: dict = None) -> str:
+    """여러 파일을 한 번에 작성시키는 요청 + 출력 형식 (프롬프트 끝에 붙임)."""
+    contracts = contracts or {}
+    listing = "\n".join(
+        f"- {path}: {desc}" + (f"\n    계약: {contracts[path]}" if contracts.get(path) else "")
+        for path, desc in files.items()
+    )
+    first = next(iter(files))
+    return f"""
+=== 현재 작성할 파일 ({len(files)}개, 한 번에 작성) ===
+{listing}
+
+모든 파일을 아래 형식으로 빠짐없이 순서대로 출력하세요. 파일마다 제목 줄 다음에 코드 블록 하나.
+=== FILE: {first} ===
+```
+(파일 전체 코드 — 빈 파일이면 빈 코드 블록)
+```
+
+[필수] 제목 줄과 코드 블록 외의 설명은 쓰지 마세요.
+[필수] 각 파일은 생략 없이 전체 코드를 작성하세요.
+"""
+
+
+def parse_multi_file(raw: str) -> dict:
+    """=== FILE: 경로 === 형식 응답 → {경로: 코드}."""
+    return {
+        m.group("path").strip(): m.group("code").rstrip()
+        for m in _MULTI_FILE_RE.finditer(raw)
+    }
+
+
+def _valid_generated(file_path: str, code: str) -> bool:
+    if not code.strip():
+        return os.path.basename(file_path) == "__init__.py"
+    if looks_incomplete(file_path, code):
+        return False
+    if file_path.endswith(".py"):
+        try:
+            ast.parse(code)
+        except SyntaxError:
+            return False
+    return True
+
+
+def generate_batch(generate, files: dict, contracts: dict = None, context: str = "") -> dict:
+    """작은 파일 묶음을 한 번의 요청으로 생성 → 검증을 통과한 {경로: 코드}.
+
+    Args:
+        generate: 프롬프트 접미부 조각들을 받아 모델 응답을 돌려주는 함수 (PrefixCache.generate 등)
+        files: {경로: 설명}
+        contracts: 인터페이스 계약 {경로: 계약}
+        context: 배치 요청 앞에 둘 접미부 (기존 파일 컨텍스트 등)
+    """
+    response = generate(context, batch_section(files, contracts))
+    parsed = parse_multi_file((response.text or "").strip())
+    return {
+        path: code for path, code in parsed.items()
+        if path in files and _valid_generated(path, code)
+    }
@@ -0,0 +1,189 @@
+"""FE/BE 공유 프롬프트 접두부의 제공자 측 컨텍스트 캐시.
+
+파일별 호출마다 같은 PRD·디자인 스펙·파일 구조·계약 접두부(PromptBuilder.prefix)를 다시
+보냈습니다. PrefixCache는 단계(phase)마다 접두부를 한 번 캐시에 올리고, 이후 호출은
+캐시 참조 + 파일별 접미부만 보냅니다. 캐시는 두 번째 호출에서 만들어지므로 파일이
+하나뿐인 단계나 모두 체크포인트에서 재사용된 단계는 캐시를 만들지 않습니다.
+
+캐시 TTL(CONTEXT_CACHE_TTL_SEC)이 얼마 남지 않으면 호출 전에 연장하고, 그래도 캐시를 찾지
+못하는 오류가 나면 캐시를 버리고 전체 프롬프트로 한 번 다시 보냅니다 (단계 나머지도 전체 프롬프트).
+
+CONTEXT_CACHE 환경변수:
+  gemini  (기본) Gemini 명시적 컨텍스트 캐시 (client.caches). 생성에 실패하거나 접두부가
+          CONTEXT_CACHE_MIN_TOKENS보다 짧으면 전체 프롬프트를 보냄 — 접두부가 항상 같으므로
+          제공자의 암시적 프리픽스 캐시는 그대로 적용됩니다.
+  local   오프라인 시뮬레이션. 접두부를 프로세스 안에 TTL과 함께 보관하고 전체 프롬프트를 보내되,
+          캐시 적중·절감 토큰·만료를 Gemini와 같은 방식으로 처리합니다 (테스트용 가짜 client와 함께 사용).
+  off     캐시를 쓰지 않음
+"""
+
+import os
+import time
+
+from token_budget import ensure_fits, estimate_tokens, record_usage
+from vfs import content_hash
+
+try:
+    from google.genai import types
+except ImportError:
+    types = None
+
+_BACKEND = os.getenv("CONTEXT_CACHE", "gemini")
+_TTL_SEC = int(os.getenv("CONTEXT_CACHE_TTL_SEC", "900"))
+_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "1024"))
+_REFRESH_BEFORE_SEC = _TTL_SEC / 3   # 남은 TTL이 이보다 짧으면 호출 전에 연장
+
+_local_caches: dict = {}   # local 백엔드: 캐시 이름 → (접두부, 만료 시각)
+
+
+class CacheMissing(LookupError):
+    """캐시된 접두부를 찾을 수 없음 (만료·삭제)."""
+
+
+def _is_cache_error(e: Exception) -> bool:
+    """캐시 참조 때문에 실패한 호출로 보이는지 (만료·삭제된 cached_content 등)."""
+    if isinstance(e, CacheMissing):
+        return True
+    return "cache" in str(e).lower() or getattr(e, "code", None) in (403, 404)
+
+
+class PrefixCache:
+    """PromptBuilder의 접두부를 캐시에 올려 두고 파일별 접미부만 보내는 생성기.
+
+    Args:
+        client: genai.Client (또는 같은 인터페이스의 가짜 client)
+        model: 모델 이름
+        builder: 접두부를 제공하는 PromptBuilder
+        label: 로그용 단계 이름 (FE, BE ...)
+        backend: gemini | local | off (기본값은 CONTEXT_CACHE 환경변수)
+    """
+
+    def __init__(self, client, model: str, builder, label: str = "", backend: str = None):
+        self.client = client
+        self.model = model
+        self.builder = builder
+        self.label = label
+        self.backend = backend or _BACKEND
+        self.name = None
+        self.expires_at = 0.0
+        self.calls = 0
+        self.cache_hits = 0
+        self.cached_tokens = 0
+        self._disabled = self.backend == "off"
+
+    def _create(self) -> None:
+        prefix = self.builder.prefix
+        if estimate_tokens(prefix, model=self.model) < _MIN_TOKENS:
+            self._disabled = True
+            return
+        if self.backend == "local":
+            self.name = "local/" + content_hash(self.model + prefix)[:16]
+            self.expires_at = time.monotonic() + _TTL_SEC
+            _local_caches[self.name] = (prefix, self.expires_at)
+            return
+        if types is None:
+            self._disabled = True
+            return
+        try:
+            cached = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    contents=[prefix],
+                    ttl=f"{_TTL_SEC}s",
+                    display_name=f"factory-{self.label or 'prefix'}",
+                ),
+            )
+            self.name = cached.name
+            self.expires_at = time.monotonic() + _TTL_SEC
+        except Exception as e:
+            print(f"  ⚠️  컨텍스트 캐시 생성 실패 ({e}) → 전체 프롬프트 전송")
+            self._disabled = True
+
+    def _refresh(self) -> None:
+        """남은 TTL이 짧으면 캐시 만료 시각을 연장 (실패하면 그대로 두고 호출 오류 시 전체 프롬프트로)."""
+        if time.monotonic() < self.expires_at - _REFRESH_BEFORE_SEC:
+            return
+        if self.backend == "local":
+            entry = _local_caches.get(self.name)
+            if entry is not None:
+                self.expires_at = time.monotonic() + _TTL_SEC
+                _local_caches[self.name] = (entry[0], self.expires_at)
+            return
+        try:
+            self.client.caches.update(
+                name=self.name,
+                config=types.UpdateCachedContentConfig(ttl=f"{_TTL_SEC}s"),
+            )
+            self.expires_at = time.monotonic() + _TTL_SEC
+        except Exception as e:
+            print(f"  ⚠️  컨텍스트 캐시 TTL 연장 실패 ({e})")
+
+    def _send_cached(self, suffix: tuple):
+        if self.backend == "local":
+            entry = _local_caches.get(self.name)
+            if entry is None or time.monotonic() >= entry[1]:
+                _local_caches.pop(self.name, None)
+                raise CacheMissing(f"cached content {self.name} not found")
+            return self.client.models.generate_content(
+                model=self.model,
+                contents=entry[0] + "".join(suffix),
+            )
+        return self.client.models.generate_content(
+            model=self.model,
+            contents="".join(suffix),
+            config=types.GenerateContentConfig(cached_content=self.name),
+        )
+
+    def generate(self, *suffix: str):
+        """접두부 + suffix로 generate_content 호출 (캐시가 있으면 접미부만 전송).
+
+        캐시를 찾지 못해 실패하면 캐시를 버리고 전체 프롬프트로 한 번 다시 보냅니다.
+
+        Raises:
+            PromptTooLarge: 추정 토큰 수가 모델 한도를 넘음 (호출하지 않음)
+        """
+        ensure_fits(self.model, self.builder.prefix, *suffix)
+        self.calls += 1
+        if self.name is None and not self._disabled and self.calls >= 2:
+            self._create()
+
+        hit = False
+        if self.name is not None:
+            self._refresh()
+            try:
+                response = self._send_cached(suffix)
+                hit = True
+            except Exception as e:
+                if not _is_cache_error(e):
+                    raise
+                print(f"  ⚠️  {self.label} 컨텍스트 캐시 사용 불가 ({e}) → 남은 호출은 전체 프롬프트 전송")
+                self.name = None
+                self._disabled = True
+        if not hit:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=self.builder.build(*suffix),
+            )
+
+        record_usage(self.model, response, self.builder.prefix, *suffix)
+        if hit:
+            self.cache_hits += 1
+            usage = getattr(response, "usage_metadata", None)
+            reported = getattr(usage, "cached_content_token_count", None) if usage is not None else None
+            self.cached_tokens += reported or estimate_tokens(self.builder.prefix, model=self.model)
+        return response
+
+    def close(self) -> None:
+        """캐시를 삭제하고 사용 통계를 출력."""
+        if self.name is not None:
+            if self.backend == "local":
+                _local_caches.pop(self.name, None)
+            else:
+                try:
+                    self.client.caches.delete(name=self.name)
+                except Exception:
+                    pass  # TTL이 지나면 제공자 측에서 정리됨
+            self.name = None
+        if self.cache_hits:
+            print(f"  🧊 {self.label} 컨텍스트 캐시: {self.calls}회 호출 중 {self.cache_hits}회 적중 "
+                  f"(접두부 약 {self.cached_tokens:,} 토큰 재사용)")
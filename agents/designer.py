@@ -4,6 +4,8 @@ import json
 import re
 from dotenv import load_dotenv
 
+from token_budget import generate_checked
+
 load_dotenv()
 client = genai.Client(
     api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -251,10 +253,7 @@ Frontend 에이전트가 이 ui_components 데이터로 DOM 요소를 구성합
 
     response = None
     try:
-        response = client.models.generate_content(
-            model=_DESIGNER_MODEL,
-            contents=prompt,
-        )
+        response = generate_checked(client, _DESIGNER_MODEL, prompt)
         raw = response.text.strip()
         if raw.startswith("```"):
             raw = re.sub(r"^```(?:json)?\n?", "", raw)
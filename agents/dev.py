@@ -4,6 +4,10 @@ import json
 import re
 from dotenv import load_dotenv
 
+from blob_store import CodesView
+from checkpoint import record_file_done
+from token_budget import generate_checked
+
 load_dotenv()
 client = genai.Client(
     api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -21,7 +25,10 @@ def dev_agent(state: dict):
         })
         return state
 
-    codes = {}
+    # 체크포인트에서 재개한 경우 이미 완성된 파일은 유지하고 나머지만 생성
+    done_files = set(state.get("done_files", []))
+    codes = CodesView({p: c for p, c in state.get("codes", {}).items() if p in done_files})
+    state["codes"] = codes
 
     # 모든 파일 목록을 컨텍스트로 제공
     all_files = "\n".join(
@@ -29,6 +36,10 @@ def dev_agent(state: dict):
     )
 
     for file_path, file_description in file_tree.items():
+        if file_path in codes:
+            print(f"  ♻️  체크포인트 재사용: {file_path}")
+            continue
+
         print(f"  ✍️  생성 중: {file_path}")
 
         # 이미 생성된 코드들을 컨텍스트로 제공 (파일 간 일관성 유지)
@@ -103,10 +114,7 @@ def dev_agent(state: dict):
 
         response = None
         try:
-            response = client.models.generate_content(
-                model='gemini-2.5-flash-lite',
-                contents=prompt
-            )
+            response = generate_checked(client, 'gemini-2.5-flash-lite', prompt)
             result = json.loads(response.text)
             codes[file_path] = result.get("code", "")
 
@@ -128,6 +136,10 @@ def dev_agent(state: dict):
         except Exception as e:
             print(f"  ⚠️  {file_path} 생성 실패: {e}")
             codes[file_path] = f"# 생성 실패: {e}"
+            continue  # 실패 파일은 완료 처리하지 않음 → 재개 시 재생성
+
+        # 파일 단위 체크포인트
+        record_file_done(state, file_path)
 
     state.update({
         "codes": codes,
@@ -1,9 +1,22 @@
 from google import genai
 import os
 import json
-import re
 from dotenv import load_dotenv
 
+from agents.codegen import (
+    EditApplyError, apply_edit_response, batch_section, edit_mode_section,
+    generate_batch, generate_complete, plan_batches,
+)
+from agents.context_cache import PrefixCache
+from agents.prompt_builder import CodeContext, PromptBuilder
+from agents.prompt_slices import catalogue_index, shared_spec, slice_section
+from agents.spec_prompt import encode_spec
+from agents.templates import emit_templates
+from blob_store import CodesView
+from checkpoint import record_file_done
+from manifest import is_frontend
+from token_budget import remaining
+
 load_dotenv()
 client = genai.Client(
     api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -11,20 +24,26 @@ client = genai.Client(
 
 _FE_MODEL = os.getenv("FE_MODEL", "gemini-2.5-flash")
 
-_FRONTEND_EXTENSIONS = {".html", ".css", ".js", ".ts", ".tsx", ".jsx", ".vue", ".svelte"}
-_FRONTEND_DIR_PREFIXES = ("frontend", "static", "public", "src", "client", "web", "templates")
+# 신규 파일(전체 생성) 출력 규칙 — 고도화 수정 파일은 codegen.edit_mode_section으로 대체
+_FULL_OUTPUT_RULES = """
+파일 확장자에 맞는 마크다운 코드 블록으로만 답변하세요. JSON 형식 사용 금지.
+출력 형식 예시 (HTML 파일인 경우):
+```html
+<!DOCTYPE html>
+<html>
+... 전체 코드 ...
+</html>
+```
 
+출력 형식 예시 (JS 파일인 경우):
+```javascript
+// 전체 코드
+export class Game { ... }
+```
 
-def _is_frontend_file(file_path: str) -> bool:
-    """파일이 프론트엔드 담당인지 판별."""
-    normalized = file_path.replace("\\", "/").lower()
-    ext = os.path.splitext(normalized)[1]
-    if ext in _FRONTEND_EXTENSIONS:
-        return True
-    for prefix in _FRONTEND_DIR_PREFIXES:
-        if normalized.startswith(prefix + "/"):
-            return True
-    return False
+[필수] 코드 블록 앞뒤에 다른 텍스트나 설명을 추가하지 마세요.
+[필수] 코드가 아무리 길어도 절대 생략하거나 잘라내지 마세요.
+"""
 
 
 def _build_game_domain_section(design_spec: dict) -> str:
@@ -42,9 +61,11 @@ def _build_game_domain_section(design_spec: dict) -> str:
 // ── 픽셀 스프라이트 렌더러 (No-Image Engine) ──────────────────────────
 // design_spec.json의 pixel_sprites 데이터를 Canvas에 직접 그립니다.
 // 사용법: drawSprite(ctx, sprites.player, x, y, palette, scale)
+// 행은 숫자 배열이어야 하며, 압축 표기 행 문자열("0110")이 들어와도 숫자로 풀어서 그립니다.
 function drawSprite(ctx, sprite, x, y, palette, scale) {
     sprite.forEach((row, sy) => {
-        row.forEach((colorKey, sx) => {
+        const cells = typeof row === 'string' ? Array.from(row, ch => parseInt(ch, 36)) : row;
+        cells.forEach((colorKey, sx) => {
             const color = palette[String(colorKey)];
             if (!color || color === 'transparent') return;
             ctx.fillStyle = color;
@@ -64,7 +85,9 @@ Canvas 구현 가이드: {canvas_guide}
 
 [No-Image Pixel Sprites]
 design_spec.json의 pixel_sprites에는 이미 픽셀 데이터가 정의되어 있습니다.
-이미지 파일을 생성/참조하지 말고, 이 2D 배열 데이터를 Canvas에 직접 렌더링하세요.
+이미지 파일을 생성/참조하지 말고, 이 2D 숫자 배열 데이터를 Canvas에 직접 렌더링하세요.
+[중요] 프롬프트의 스프라이트 행은 문자열로 압축 표기되어 있습니다. 코드에 데이터를 넣을 때는
+반드시 숫자 배열로 풀어 쓰세요 (한 글자 = 숫자 하나, a-z는 10-35. 예: "01a0" → [0, 1, 10, 0]).
 
 사용 가능한 스프라이트: {sprite_list}
 컬러 팔레트: {json.dumps(color_palette, ensure_ascii=False)}
@@ -95,8 +118,9 @@ def _build_app_domain_section(design_spec: dict) -> str:
     ui_components = design_spec.get("ui_components", {})
     theme = design_spec.get("theme", {})
 
+    # tailwind 클래스·설명 등 상세는 파일별 접미부(prompt_slices.slice_section)에 필요한 것만
     components_desc = "\n".join(
-        f"  - {name}: icon={comp.get('icon','?')}, tailwind={comp.get('tailwind','')}, desc={comp.get('description','')}"
+        f"  - {name}: icon={comp.get('icon','?')}"
         for name, comp in ui_components.items()
         if isinstance(comp, dict)
     ) or "  (ui_components 없음)"
@@ -108,7 +132,7 @@ def _build_app_domain_section(design_spec: dict) -> str:
 절대 금지: Canvas API, requestAnimationFrame 게임 루프 — DOM 방식만 사용하세요
 
 [UI Components 명세]
-design_spec.json에 정의된 UI 컴포넌트를 DOM으로 구현하세요:
+design_spec.json에 정의된 UI 컴포넌트를 DOM으로 구현하세요 (상세는 파일별 '필요한 디자인 스펙' 참고):
 {components_desc}
 
 Lucide 아이콘 사용법 (CDN):
@@ -136,6 +160,10 @@ function createCard(title, content) {{
 """
 
 
+# GAME 도메인 섹션이 값을 전부 보여 주는 design_spec 항목 (디자인 스펙 표기에서는 생략)
+_GAME_SECTION_PATHS = (("pixel_sprites", "color_palette"), ("pixel_sprites", "sprite_scale"), ("canvas", "canvas_guide"))
+
+
 def frontend_agent(state: dict) -> dict:
     """프론트엔드 파일을 생성하는 전문 에이전트.
 
@@ -150,17 +178,23 @@ def frontend_agent(state: dict) -> dict:
     interface_contracts = state.get("interface_contracts", {})
     project_domain = state.get("project_domain", design_spec.get("project_domain", "APP"))
 
-    fe_files = {path: desc for path, desc in file_tree.items() if _is_frontend_file(path)}
+    fe_files = {path: desc for path, desc in file_tree.items() if is_frontend(path)}
 
     if not fe_files:
         state.update({"current_step": "BACKEND_DEVELOP"})
         return state
 
-    codes = state.get("codes", {})
+    codes = state.setdefault("codes", CodesView())
+    done_files = set(state.get("done_files", []))
+    impact_scope = state.get("impact_scope")
+    # 고도화 모드에서 이미 존재하는 파일은 편집 블록으로만 수정 (신규 파일은 전체 생성)
+    editable_paths = set(codes) if state.get("mode") == "upgrade" else set()
     all_files = "\n".join(f"- {path}: {desc}" for path, desc in file_tree.items())
-    design_spec_str = json.dumps(design_spec, ensure_ascii=False, indent=2)
 
     is_game = project_domain == "GAME"
+    # 공백 없는 JSON, 도메인 섹션에 이미 있는 항목은 생략. 스프라이트 데이터·컴포넌트 상세는
+    # 파일별 접미부에 필요한 것만 넣고 접두부에는 전체 목록 색인만 둠
+    design_spec_str = encode_spec(shared_spec(design_spec), omit=_GAME_SECTION_PATHS if is_game else ())
 
     # 도메인별 렌더링 가이드 섹션 빌드
     if is_game:
@@ -169,29 +203,14 @@ def frontend_agent(state: dict) -> dict:
         domain_section = _build_app_domain_section(design_spec)
 
     theme = design_spec.get("theme", {})
-    components = design_spec.get("components", {})
-
-    # 전체 인터페이스 계약 요약 (모든 파일)
-    all_contracts_str = "\n".join(
-        f"- {path}: {contract}" for path, contract in interface_contracts.items()
-    ) if interface_contracts else "(인터페이스 계약 없음)"
-
-    for file_path, file_description in fe_files.items():
-        print(f"  {'🎮' if is_game else '🎨'}  FE 생성 중: {file_path}")
 
-        existing_codes_context = ""
-        if codes:
-            existing_codes_context = "\n\n=== 이미 생성된 파일들 ===\n"
-            for existing_path, existing_code in codes.items():
-                if existing_path != "design_spec.json":
-                    existing_codes_context += f"\n--- {existing_path} ---\n{existing_code}\n"
+    # 스프라이트·컴포넌트·계약 전체 목록 (한 줄씩) — 상세는 파일별로 관련된 것만
+    catalogue_str = catalogue_index(design_spec, interface_contracts)
 
-        # 현재 파일의 인터페이스 계약
-        current_contract = interface_contracts.get(file_path, "")
-
-        prompt = f"""
+    # 파일마다 바뀌지 않는 공유 접두부 — 한 번만 조립해 모든 파일 호출이 재사용
+    prompt_builder = PromptBuilder(f"""
 당신은 시니어 프론트엔드 개발자입니다.
-아래 기획서와 디자인 스펙을 바탕으로 "{file_path}" 파일의 완전한 코드를 작성하세요.
+아래 기획서와 디자인 스펙을 바탕으로, 마지막에 지정하는 파일의 완전한 코드를 작성하세요.
 
 === 기획서 (PRD) ===
 {prd}
@@ -201,14 +220,10 @@ def frontend_agent(state: dict) -> dict:
 
 === 전체 파일 구조 ===
 {all_files}
-{existing_codes_context}
-
-=== 인터페이스 계약 (반드시 준수) ===
-이 파일이 반드시 구현해야 하는 API:
-{current_contract or '(이 파일에 대한 계약 없음 — 자유롭게 설계)'}
 
-프로젝트 전체 인터페이스 계약 (다른 파일에서 제공/기대하는 API):
-{all_contracts_str}
+=== 전체 목록 색인 (스프라이트·UI 컴포넌트·인터페이스 계약) ===
+{catalogue_str}
+(이 파일에 필요한 디자인 스펙과 관련 파일 계약은 파일별로 아래에 제공)
 
 [중요] 계약에 명시된 메서드/속성을 정확한 시그니처로 구현하세요.
 [중요] 다른 파일의 메서드를 호출할 때는 계약에 명시된 것만 호출하세요.
@@ -216,10 +231,6 @@ def frontend_agent(state: dict) -> dict:
   예) new Player(map, config) — map과 config를 직접 생성해서 전달
 {domain_section}
 
-=== 현재 작성할 파일 ===
-파일 경로: {file_path}
-파일 역할: {file_description}
-
 공통 요구사항:
 1. 실제로 실행 가능한 완전한 코드를 작성하세요 (절대 잘리거나 생략하지 마세요)
 2. [매우 중요] 이미지 파일(img 태그 src, background-image url()) 절대 사용 금지
@@ -233,55 +244,120 @@ def frontend_agent(state: dict) -> dict:
 {"6. Canvas 렌더링: pixel_sprites 데이터를 사용해 drawSprite 함수로 렌더링" if is_game else "6. Tailwind CDN + Lucide CDN 로드 후 lucide.createIcons() 호출"}
 {"7. requestAnimationFrame 기반 게임 루프 필수" if is_game else "7. 반응형 레이아웃 (모바일 우선, Tailwind 반응형 프리픽스 사용)"}
 {"8. 게임 루프 구조: update(dt) → render(ctx) → requestAnimationFrame" if is_game else "8. 컬러 팔레트: primary=" + theme.get("primary", "blue-500") + ", bg=" + theme.get("background", "gray-50")}
+""")
+    # 고도화 모드에서는 영향 범위 밖 파일을 골격(시그니처)만 보여 줌
+    code_context = CodeContext(impact_scope)
+    prefix_cache = PrefixCache(client, _FE_MODEL, prompt_builder, label="FE")
+
+    try:
+        # 신규 파일: 템플릿 → 작은 파일 묶음 생성 → 나머지는 아래 파일별 생성
+        pending = {
+            p: d for p, d in fe_files.items()
+            if p not in editable_paths and not (p in done_files and p in codes)
+        }
+        emitted = set()   # 템플릿·묶음 생성으로 이미 만든 파일
+        # 보일러플레이트(빈 __init__.py, Vector2, index.html 뼈대 등)는 모델 호출 없이 템플릿으로 생성
+        for path, (template, code) in emit_templates(pending, state).items():
+            print(f"  🧩 FE 템플릿 생성: {path} ({template})")
+            codes[path] = code
+            emitted.add(path)
+            del pending[path]
+            record_file_done(state, path)
+        for batch in plan_batches(pending, interface_contracts):
+            batch_files = {p: pending[p] for p in batch}
+            print(f"  📦 FE 묶음 생성 중 ({len(batch)}개): {', '.join(batch)}")
+            batch_slices = slice_section(design_spec, batch_files, interface_contracts)
+            batch_context = code_context.render(
+                codes, skip=("design_spec.json", *batch),
+                budget=remaining(_FE_MODEL, prompt_builder.prefix, batch_slices,
+                                 batch_section(batch_files, interface_contracts)),
+                model=_FE_MODEL,
+            )
+            try:
+                generated = generate_batch(prefix_cache.generate, batch_files, interface_contracts,
+                                           batch_context + batch_slices)
+            except Exception as e:
+                print(f"  ⚠️  묶음 생성 실패: {e} → 파일별 생성")
+                continue
+            for path, code in generated.items():
+                codes[path] = code
+                emitted.add(path)
+                record_file_done(state, path)
+            missing = [p for p in batch if p not in generated]
+            if missing:
+                print(f"  ↩️  묶음에서 빠졌거나 검증 실패 → 파일별 생성: {', '.join(missing)}")
+
+        for file_path, file_description in fe_files.items():
+            if file_path in emitted:
+                continue
+            if file_path in done_files and file_path in codes:
+                print(f"  ♻️  체크포인트 재사용: {file_path}")
+                continue
+
+            edit_mode = file_path in editable_paths
+            print(f"  {'🎮' if is_game else '🎨'}  FE {'수정' if edit_mode else '생성'} 중: {file_path}")
+
+            # 현재 파일의 인터페이스 계약
+            current_contract = interface_contracts.get(file_path, "")
+
+            file_section = f"""
+=== 현재 작성할 파일 ===
+파일 경로: {file_path}
+파일 역할: {file_description}
 
-파일 확장자에 맞는 마크다운 코드 블록으로만 답변하세요. JSON 형식 사용 금지.
-출력 형식 예시 (HTML 파일인 경우):
-```html
-<!DOCTYPE html>
-<html>
-... 전체 코드 ...
-</html>
-```
-
-출력 형식 예시 (JS 파일인 경우):
-```javascript
-// 전체 코드
-export class Game {{ ... }}
-```
-
-[필수] 코드 블록 앞뒤에 다른 텍스트나 설명을 추가하지 마세요.
-[필수] 코드가 아무리 길어도 절대 생략하거나 잘라내지 마세요.
+=== 이 파일의 인터페이스 계약 (반드시 준수) ===
+이 파일이 반드시 구현해야 하는 API:
+{current_contract or '(이 파일에 대한 계약 없음 — 자유롭게 설계)'}
+{slice_section(design_spec, {file_path: file_description}, interface_contracts, codes if edit_mode else None)}
 """
 
-        response = None
-        try:
-            response = client.models.generate_content(
-                model=_FE_MODEL,
-                contents=prompt,
+            if edit_mode:
+                try:
+                    current_code = codes[file_path]
+                except KeyError:
+                    # 목록에는 있지만 읽을 수 없는 파일 (UTF-8이 아니거나 스캔 후 삭제됨) → 이 파일만 건너뜀
+                    print(f"  ⚠️  {file_path} 읽기 실패 → 수정 건너뜀")
+                    continue
+                current_section = f"\n=== 현재 파일 내용 ({file_path}) ===\n{current_code}\n"
+                fixed_sections = (file_section, current_section, edit_mode_section(file_path))
+            else:
+                fixed_sections = (file_section, _FULL_OUTPUT_RULES)
+
+            # 기존 파일 컨텍스트는 모델 한도에서 고정 부분을 뺀 예산 안에서만 (넘치면 골격 → 생략)
+            existing_codes_context = code_context.render(
+                codes, skip=("design_spec.json", file_path),
+                budget=remaining(_FE_MODEL, prompt_builder.prefix, *fixed_sections), model=_FE_MODEL,
             )
-            raw = response.text.strip()
-
-            # ── 1순위: 마크다운 코드 블록 추출 ──────────────────────────────
-            code_match = re.search(r"```(?:[\w+\-]*)\n(.*?)```", raw, re.DOTALL)
-            if code_match:
-                codes[file_path] = code_match.group(1).rstrip()
-                continue  # 성공 → 다음 파일로
+            suffix = (existing_codes_context, *fixed_sections)
 
-            # ── 2순위: JSON {"code": ...} 파싱 (하위 호환) ──────────────────
             try:
-                json_str = raw
-                if raw.startswith("```"):
-                    json_str = re.sub(r"^```(?:json)?\n?", "", raw)
-                    json_str = re.sub(r"\n?```$", "", json_str.strip())
-                result = json.loads(json_str)
-                codes[file_path] = result.get("code", raw)
-            except (json.JSONDecodeError, ValueError):
-                # ── 3순위: 응답 전체를 코드로 사용 ─────────────────────────
-                codes[file_path] = raw
-
-        except Exception as e:
-            print(f"  ⚠️  {file_path} 생성 실패: {e}")
-            codes[file_path] = f"<!-- 생성 실패: {e} -->"
+                if edit_mode:
+                    raw = prefix_cache.generate(*suffix).text.strip()
+                    try:
+                        codes[file_path], block_count = apply_edit_response(file_path, current_code, raw)
+                        print(f"  ✂️  편집 블록 {block_count}개 적용: {file_path}")
+                    except EditApplyError as e:
+                        # 편집 블록을 안전하게 적용할 수 없으면 현재 내용을 보여 주고 전체 재생성
+                        print(f"  ⚠️  편집 블록 적용 실패 ({e}) → 전체 재생성")
+                        codes[file_path] = generate_complete(
+                            prefix_cache.generate, file_path,
+                            existing_codes_context, file_section, current_section, _FULL_OUTPUT_RULES,
+                        )
+                else:
+                    # 출력 한도에서 잘리면 마지막 완전한 줄부터 이어쓰기 요청
+                    codes[file_path] = generate_complete(prefix_cache.generate, file_path, *suffix)
+
+            except Exception as e:
+                print(f"  ⚠️  {file_path} 생성 실패: {e}")
+                if not edit_mode:
+                    codes[file_path] = f"<!-- 생성 실패: {e} -->"
+                continue  # 실패 파일은 완료 처리하지 않음 → 재개 시 재생성
+
+            # 파일 단위 체크포인트 (중단 후 재개 시 이 파일은 다시 생성하지 않음)
+            record_file_done(state, file_path)
+    finally:
+        # 예외·Ctrl-C로 빠져나가도 과금되는 캐시를 남기지 않음
+        prefix_cache.close()
 
     state.update({
         "codes": codes,
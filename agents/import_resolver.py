@@ -0,0 +1,154 @@
+"""배포판명(PyPI) → import 모듈명 오프라인 해석기.
+
+requirements.txt 정리(_fix_requirements_txt)에서 "이 패키지를 코드가 실제로 import 하는가"를
+판단하려면 배포판명과 import명의 대응이 필요합니다. 아래 세 소스를 순서대로 조합합니다.
+
+  1. agents/import_map.json — 번들된 버전 지정 매핑 스냅샷
+  2. importlib.metadata.packages_distributions() — 로컬 환경에 설치된 배포판
+  3. 이름 기반 추정 (python-dotenv → dotenv, py-xxx → xxx 등)
+
+스냅샷·로컬 환경에서 찾은 결과는 .agent_logs/cache/import_names.json에 메모이즈되며,
+스냅샷 버전·Python 버전·인터프리터 경로가 바뀌면 캐시는 자동 무효화됩니다. 이름 추정 결과는
+나중에 배포판이 설치되면 틀린 값이 되므로 메모하지 않고 매번 다시 해석합니다.
+"""
+
+import json
+import os
+import sys
+from importlib import metadata
+
+_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_map.json")
+_CACHE_PATH = ".agent_logs/cache/import_names.json"
+
+# 해석 소스 (우선순위 순)
+SOURCE_SNAPSHOT = "snapshot"
+SOURCE_LOCAL = "local"
+SOURCE_HEURISTIC = "heuristic"
+
+_snapshot: dict = {}
+_snapshot_version = ""
+_local_index: dict = {}        # 정규화 배포판명 → [import명, ...] (packages_distributions 역색인)
+_local_loaded = False
+_memo: dict = {}               # 정규화 배포판명 → {"modules": [...], "source": "..."}
+_memo_loaded = False
+_memo_dirty = False
+
+
+def normalize_dist_name(name: str) -> str:
+    """배포판명을 소문자 언더스코어 형식으로 정규화 (Foo-Bar.baz → foo_bar_baz)."""
+    return name.strip().lower().replace("-", "_").replace(".", "_")
+
+
+def is_stdlib_module(module_name: str) -> bool:
+    """최상위 모듈명이 Python 표준 라이브러리인지 판별."""
+    return module_name.split(".")[0] in sys.stdlib_module_names
+
+
+def _load_snapshot() -> None:
+    global _snapshot, _snapshot_version
+    if _snapshot_version:
+        return
+    try:
+        with open(_SNAPSHOT_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        _snapshot = {normalize_dist_name(k): list(v) for k, v in data.get("mapping", {}).items()}
+        _snapshot_version = data.get("snapshot_version", "0")
+    except (OSError, json.JSONDecodeError):
+        _snapshot = {}
+        _snapshot_version = "missing"
+
+
+def _cache_key() -> str:
+    _load_snapshot()
+    return f"{_snapshot_version}|{sys.version_info.major}.{sys.version_info.minor}|{sys.prefix}"
+
+
+def _load_memo() -> None:
+    global _memo, _memo_loaded
+    if _memo_loaded:
+        return
+    _memo_loaded = True
+    try:
+        with open(_CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("key") == _cache_key():
+            # 이전 버전이 기록한 이름 추정 항목은 버림 (설치 후에도 남아 로컬 색인을 가림)
+            _memo = {k: v for k, v in data.get("entries", {}).items() if v.get("source") != SOURCE_HEURISTIC}
+    except (OSError, json.JSONDecodeError):
+        _memo = {}
+
+
+def _load_local_index() -> None:
+    """packages_distributions()를 배포판 기준으로 뒤집어 색인 (프로세스당 1회)."""
+    global _local_index, _local_loaded
+    if _local_loaded:
+        return
+    _local_loaded = True
+    try:
+        for module_name, dists in metadata.packages_distributions().items():
+            if module_name.startswith("_") or not module_name.isidentifier():
+                continue
+            for dist in dists:
+                _local_index.setdefault(normalize_dist_name(dist), []).append(module_name)
+    except Exception:
+        _local_index = {}
+
+
+def _heuristic_names(dist_norm: str) -> list:
+    """이름 규칙만으로 추정한 import 후보."""
+    candidates = [dist_norm]
+    for prefix in ("python_", "py_", "django_", "flask_"):
+        if dist_norm.startswith(prefix) and len(dist_norm) > len(prefix):
+            candidates.append(dist_norm[len(prefix):])
+    for suffix in ("_binary", "_python", "_headless", "_py"):
+        if dist_norm.endswith(suffix) and len(dist_norm) > len(suffix):
+            candidates.append(dist_norm[: -len(suffix)])
+    base = dist_norm.split("_")[0]
+    if base not in candidates:
+        candidates.append(base)
+    return candidates
+
+
+def resolve_import_names(dist_name: str) -> tuple:
+    """배포판명 → (import 모듈명 집합, 해석 소스).
+
+    Returns:
+        (frozenset({"dotenv"}), "snapshot") 형태. 소스는 SOURCE_* 상수 중 하나.
+    """
+    global _memo_dirty
+    dist_norm = normalize_dist_name(dist_name)
+    _load_memo()
+
+    cached = _memo.get(dist_norm)
+    if cached is not None:
+        return frozenset(cached["modules"]), cached["source"]
+
+    _load_snapshot()
+    if dist_norm in _snapshot:
+        modules, source = _snapshot[dist_norm], SOURCE_SNAPSHOT
+    else:
+        _load_local_index()
+        if dist_norm in _local_index:
+            modules, source = sorted(set(_local_index[dist_norm])), SOURCE_LOCAL
+        else:
+            return frozenset(_heuristic_names(dist_norm)), SOURCE_HEURISTIC
+
+    _memo[dist_norm] = {"modules": list(modules), "source": source}
+    _memo_dirty = True
+    return frozenset(modules), source
+
+
+def flush_cache() -> None:
+    """새로 해석된 항목이 있으면 디스크 메모 캐시에 기록."""
+    global _memo_dirty
+    if not _memo_dirty:
+        return
+    try:
+        os.makedirs(os.path.dirname(_CACHE_PATH), exist_ok=True)
+        tmp_path = _CACHE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": _cache_key(), "entries": _memo}, f, ensure_ascii=False)
+        os.replace(tmp_path, _CACHE_PATH)
+        _memo_dirty = False
+    except OSError:
+        pass
@@ -4,12 +4,17 @@ import json
 import re
 from dotenv import load_dotenv
 
+from blob_store import CodesView
+from project_index import ProjectIndex, build_context
+from token_budget import generate_checked
+
 load_dotenv()
 client = genai.Client(
     api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 )
 
 _PM_MODEL = os.getenv("PM_MODEL", "gemini-2.5-flash")
+_UPGRADE_CONTEXT_TOKENS = int(os.getenv("PM_UPGRADE_CONTEXT_TOKENS", "6000"))
 
 
 def _flatten_file_tree(tree: dict, prefix: str = "") -> dict:
@@ -86,10 +91,7 @@ def pm_agent(state: dict):
 
     response = None
     try:
-        response = client.models.generate_content(
-            model=_PM_MODEL,
-            contents=prompt
-        )
+        response = generate_checked(client, _PM_MODEL, prompt)
         raw = response.text.strip()
 
         if raw.startswith("```"):
@@ -126,7 +128,7 @@ def pm_agent(state: dict):
             "prd": prd,
             "file_tree": file_tree,
             "interface_contracts": interface_contracts,
-            "codes": {},
+            "codes": CodesView(),
             "feedback": "",
             "current_step": "FE_DEVELOP"
         })
@@ -155,7 +157,7 @@ def pm_agent(state: dict):
                         "prd": prd,
                         "file_tree": file_tree,
                         "interface_contracts": result.get("interface_contracts", {}),
-                        "codes": {},
+                        "codes": CodesView(),
                         "feedback": "",
                         "current_step": "FE_DEVELOP"
                     })
@@ -170,7 +172,7 @@ def pm_agent(state: dict):
             "prd": response.text if response else "",
             "file_tree": {},
             "interface_contracts": {},
-            "codes": {},
+            "codes": CodesView(),
             "feedback": "JSON 파싱 실패",
             "current_step": "ERROR"
         })
@@ -185,7 +187,7 @@ def pm_agent(state: dict):
             "prd": "",
             "file_tree": {},
             "interface_contracts": {},
-            "codes": {},
+            "codes": CodesView(),
             "feedback": f"에러: {str(e)}",
             "current_step": "ERROR"
         })
@@ -206,33 +208,18 @@ def pm_upgrade_agent(state: dict, upgrade_request: str) -> dict:
 
     file_list = "\n".join(f"- {path}: {desc}" for path, desc in existing_file_tree.items())
 
+    # 심볼·키워드 색인 (프로젝트 디렉토리에 보관, 바뀐 파일만 재색인)
+    index = ProjectIndex.load(existing_codes, getattr(existing_codes, "root", None))
+
     # ── 기존 렌더링 방식 탐지 (Safe-Update를 위한 분석) ──────────────────────
     rendering_type = "unknown"
-    has_raf = any(
-        "requestAnimationFrame" in code or "gameLoop" in code or "game_loop" in code
-        for code in existing_codes.values()
-    )
-    has_canvas = any(
-        "getContext" in code or "ctx.draw" in code or "canvas" in code.lower()
-        for code in existing_codes.values()
-    )
-    has_event_listener = any(
-        "addEventListener" in code or "querySelector" in code
-        for code in existing_codes.values()
-    )
-    if has_raf or has_canvas:
+    if index.any_marker("raf") or index.any_marker("canvas") or index.any_marker("canvas_word"):
         rendering_type = "CANVAS_LOOP"
-    elif has_event_listener:
+    elif index.any_marker("dom_event"):
         rendering_type = "DOM_EVENT"
 
-    preview_files = [
-        p for p in existing_codes
-        if p.endswith((".py", ".js", ".html", ".ts")) and not p.startswith(".")
-    ][:8]
-    code_preview = ""
-    for path in preview_files:
-        lines = existing_codes[path].splitlines()[:25]
-        code_preview += f"\n--- {path} (첫 {len(lines)}줄) ---\n" + "\n".join(lines) + "\n"
+    # 요청과 관련도(BM25)가 높은 파일부터 토큰 예산 안에서 코드 컨텍스트 구성
+    code_preview = build_context(index, existing_codes, upgrade_request, _UPGRADE_CONTEXT_TOKENS)
 
     rendering_note = {
         "CANVAS_LOOP": "기존 프로젝트는 Canvas + requestAnimationFrame 기반 게임 루프를 사용합니다. "
@@ -259,7 +246,7 @@ def pm_upgrade_agent(state: dict, upgrade_request: str) -> dict:
 === 기존 파일 구조 ===
 {file_list or '(파일 없음)'}
 
-=== 코드 미리보기 ===
+=== 관련 코드 (요청과 관련도 순) ===
 {code_preview or '(없음)'}
 
 === 고도화 요청사항 ===
@@ -286,10 +273,7 @@ def pm_upgrade_agent(state: dict, upgrade_request: str) -> dict:
 
     response = None
     try:
-        response = client.models.generate_content(
-            model=_PM_MODEL,
-            contents=prompt
-        )
+        response = generate_checked(client, _PM_MODEL, prompt)
         raw = response.text.strip()
         if raw.startswith("```"):
             raw = re.sub(r'^```(?:json)?\n?', '', raw)
@@ -0,0 +1,98 @@
+"""FE/BE 파일별 프롬프트 조립 (사전 렌더링 세그먼트 재사용).
+
+파일 루프를 돌 때마다 PRD·디자인 스펙·파일 구조·전체 계약을 f-string에 다시 넣고,
+이미 생성된 파일 전체를 문자열로 다시 이어 붙였습니다. 이 모듈은 프롬프트를
+
+  [공유 접두부]  단계 동안 바뀌지 않는 세그먼트 — 한 번만 이어 붙여 모든 파일 호출이 공유
+  [코드 컨텍스트] 이미 생성된 파일 블록 — 파일마다 한 번만 렌더링해 캐시, 생성 순서대로 나열
+  [파일별 접미부] 현재 파일 경로·역할·계약, 출력 규칙
+
+순으로 조립합니다. 접두부가 항상 같은 바이트로 시작하므로 제공자 측 프리픽스 캐시에도 유리하고,
+신규 빌드에서는 코드 컨텍스트도 앞 파일 호출의 컨텍스트 뒤에 블록이 덧붙는 형태가 됩니다.
+"""
+
+from impact import file_block
+from token_budget import estimate_tokens, fit_blocks
+
+
+class PromptBuilder:
+    """공유 접두부 세그먼트 + 호출별 접미부로 프롬프트를 조립.
+
+    Args:
+        segments: 접두부 세그먼트 (순서대로 이어 붙임)
+    """
+
+    def __init__(self, *segments: str):
+        self._segments = [s for s in segments if s]
+        self._prefix = None
+
+    def add(self, segment: str) -> "PromptBuilder":
+        if segment:
+            self._segments.append(segment)
+            self._prefix = None
+        return self
+
+    @property
+    def prefix(self) -> str:
+        if self._prefix is None:
+            self._prefix = "".join(self._segments)
+        return self._prefix
+
+    def build(self, *suffix: str) -> str:
+        return self.prefix + "".join(suffix)
+
+
+class CodeContext:
+    """이미 생성된 파일들의 프롬프트 블록을 파일별로 한 번만 렌더링해 보관.
+
+    내용이 바뀐 파일만 다시 렌더링합니다 (CodesView는 같은 내용이면 같은 문자열 객체를
+    돌려주므로 대부분 동일성 비교로 끝남).
+
+    Args:
+        scope: 전체 코드를 보여 줄 경로 집합 (None이면 전체, 나머지는 골격)
+        header: 블록 목록 앞에 붙일 제목
+    """
+
+    def __init__(self, scope=None, header: str = "\n\n=== 이미 생성된 파일들 ===\n"):
+        self.scope = set(scope) if scope is not None else None
+        self.header = header
+        self._blocks: dict = {}   # 경로 → [코드, 렌더링된 블록, 골격 블록(필요할 때 생성)]
+
+    def _entry(self, file_path: str, code: str) -> list:
+        cached = self._blocks.get(file_path)
+        if cached is not None and (cached[0] is code or cached[0] == code):
+            return cached
+        rendered = file_block(file_path, code, self.scope is None or file_path in self.scope)
+        entry = self._blocks[file_path] = [code, rendered, None]
+        return entry
+
+    def block(self, file_path: str, code: str) -> str:
+        return self._entry(file_path, code)[1]
+
+    def skeleton_block(self, file_path: str, code: str) -> str:
+        entry = self._entry(file_path, code)
+        if entry[2] is None:
+            entry[2] = file_block(file_path, code, in_scope=False)
+        return entry[2]
+
+    def render(self, codes, skip=(), budget: int = None, model: str = None) -> str:
+        """codes 순서대로 블록을 나열 (skip 경로 제외, 파일이 없으면 빈 문자열).
+
+        budget(토큰)이 주어지면 token_budget.fit_blocks로 큰 파일부터 골격 → 생략 순으로 줄입니다.
+        """
+        items = [(p, c) for p, c in codes.items() if p not in skip]
+        if not items:
+            return ""
+        if budget is None:
+            return self.header + "".join(self.block(p, c) for p, c in items)
+
+        blocks = [
+            (self.block(p, c), lambda p=p, c=c: self.skeleton_block(p, c))
+            for p, c in items
+        ]
+        chosen, degraded, dropped = fit_blocks(blocks, budget - estimate_tokens(self.header), model)
+        note = ""
+        if degraded or dropped:
+            note = f"\n(컨텍스트 한도: {degraded}개 파일은 골격만, {dropped}개 파일은 생략)\n"
+            print(f"  ✂️  컨텍스트 축소: 골격 {degraded}개 / 생략 {dropped}개")
+        return self.header + "".join(chosen) + note
@@ -0,0 +1,171 @@
+"""FE/BE 파일별 디자인 스펙·인터페이스 계약 선별.
+
+파일별 프롬프트마다 디자인 스펙 전체(모든 스프라이트·컴포넌트)와 모든 파일의 계약이
+들어가, src/utils/vector2.js처럼 스프라이트를 쓰지 않고 계약 하나만 필요한 파일도 전부
+받았습니다. 이 모듈은
+
+  - 공유 접두부용: 스프라이트 데이터·컴포넌트 상세를 뺀 디자인 스펙과, 전체 목록의 한 줄 색인
+  - 파일별 접미부용: 그 파일에 필요한 스프라이트·컴포넌트와 관련 파일 계약
+
+을 만듭니다. 선별 근거는 파일 경로·PM 설명·자기 계약에 나오는 이름(파일 이름, 계약의 클래스·함수
+이름, 스프라이트·컴포넌트 이름)과, 이미 코드가 있는 파일이면 실제 import 대상입니다.
+여러 모듈을 조립하는 진입 파일(main/app/index/game/engine, HTML)과 렌더링 담당 파일은 전부 받습니다.
+"""
+
+import posixpath
+import re
+
+from agents.spec_prompt import encode_spec
+from manifest import extract_deps
+
+_SPRITE_META = ("color_palette", "sprite_scale")
+_ENTRY_STEMS = {"main", "app", "index", "game", "engine"}
+_SPRITE_CONSUMER_HINTS = ("sprite", "render", "draw", "canvas", "graphic", "asset")
+_COMPONENT_CONSUMER_HINTS = ("component", "layout", "ui", "view", "page", "render", "widget")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z0-9]+")
+_DEFINED_NAME_RE = re.compile(r"\b(?:class|function|def|interface|type|const)\s+([A-Za-z_$][\w$]*)")
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _vocabulary(*texts: str) -> set:
+    """텍스트에 나오는 이름 키 집합 (camelCase·snake_case 단어와 인접 두 단어 결합 포함)."""
+    vocabulary = set()
+    for text in texts:
+        for word in _WORD_RE.findall(text or ""):
+            vocabulary.add(word.lower())
+            parts = [p.lower() for p in _CAMEL_RE.findall(word)]
+            vocabulary.update(parts)
+        words = [w.lower() for w in _WORD_RE.findall(text or "")]
+        vocabulary.update(a + b for a, b in zip(words, words[1:]))
+    return vocabulary
+
+
+def _stem(path: str) -> str:
+    return posixpath.splitext(posixpath.basename(path))[0]
+
+
+def is_entry_file(file_path: str) -> bool:
+    """여러 모듈을 조립하는 진입 파일 여부 (계약·디자인 스펙을 전부 받음)."""
+    return file_path.endswith(".html") or _key(_stem(file_path)) in _ENTRY_STEMS
+
+
+def _consumer(file_path: str, description: str, hints) -> bool:
+    vocabulary = _vocabulary(file_path, description)
+    return is_entry_file(file_path) or any(w.startswith(hint) for w in vocabulary for hint in hints)
+
+
+def contract_names(contract) -> set:
+    """계약에 정의된 클래스·함수 이름."""
+    return set(_DEFINED_NAME_RE.findall(str(contract or "")))
+
+
+def related_contracts(file_path: str, description: str, contracts: dict, code: str = None,
+                      paths=()) -> dict:
+    """file_path가 사용할 것으로 보이는 다른 파일의 계약 {경로: 계약}.
+
+    Args:
+        file_path: 현재 파일
+        description: PM의 파일 설명
+        contracts: 전체 인터페이스 계약
+        code: 현재 파일의 기존 코드 (고도화 수정 시 — 실제 import 대상을 포함)
+        paths: 프로젝트 파일 경로 목록 (code의 import 해석용)
+    """
+    others = {p: c for p, c in contracts.items() if p != file_path and c}
+    if is_entry_file(file_path):
+        return others
+    deps = set(extract_deps(file_path, code, paths)) if code else set()
+    vocabulary = _vocabulary(file_path, description, str(contracts.get(file_path) or ""))
+    return {
+        path: contract for path, contract in others.items()
+        if path in deps or _key(_stem(path)) in vocabulary
+        or any(_key(name) in vocabulary for name in contract_names(contract))
+    }
+
+
+def _pick(names, file_path: str, description: str, contract, hints) -> list:
+    if _consumer(file_path, description, hints):
+        return list(names)
+    vocabulary = _vocabulary(file_path, description, str(contract or ""))
+    return [name for name in names if _key(name) in vocabulary]
+
+
+def sprite_names(design_spec: dict) -> list:
+    return [k for k in (design_spec.get("pixel_sprites") or {}) if k not in _SPRITE_META]
+
+
+def component_names(design_spec: dict) -> list:
+    components = design_spec.get("ui_components")
+    return list(components) if isinstance(components, dict) else []
+
+
+def shared_spec(design_spec: dict) -> dict:
+    """접두부용 디자인 스펙 — 스프라이트 데이터와 ui_components를 뺀 나머지 (팔레트·스케일은 유지)."""
+    shared = dict(design_spec)
+    if component_names(design_spec):
+        del shared["ui_components"]
+    sprites = design_spec.get("pixel_sprites")
+    if isinstance(sprites, dict):
+        shared["pixel_sprites"] = {k: v for k, v in sprites.items() if k in _SPRITE_META}
+    return shared
+
+
+def catalogue_index(design_spec: dict, contracts: dict) -> str:
+    """전체 스프라이트·컴포넌트·계약의 한 줄 색인 (접두부용)."""
+    lines = []
+    if sprite_names(design_spec):
+        lines.append(f"스프라이트 ({len(sprite_names(design_spec))}): {', '.join(sprite_names(design_spec))}")
+    if component_names(design_spec):
+        lines.append(f"UI 컴포넌트 ({len(component_names(design_spec))}): {', '.join(component_names(design_spec))}")
+    if contracts:
+        entries = [
+            f"{path}({', '.join(sorted(contract_names(c)))})" if contract_names(c) else path
+            for path, c in contracts.items()
+        ]
+        lines.append(f"계약 ({len(contracts)}): {', '.join(entries)}")
+    return "\n".join(lines) if lines else "(색인 없음)"
+
+
+def design_slice(design_spec: dict, files: dict, contracts: dict = None) -> str:
+    """files({경로: 설명})에 필요한 스프라이트·컴포넌트만 담은 디자인 스펙 표기 (없으면 빈 문자열)."""
+    contracts = contracts or {}
+    sprites, components = [], []
+    for path, description in files.items():
+        contract = contracts.get(path, "")
+        sprites += _pick(sprite_names(design_spec), path, description, contract, _SPRITE_CONSUMER_HINTS)
+        components += _pick(component_names(design_spec), path, description, contract, _COMPONENT_CONSUMER_HINTS)
+    part = {}
+    if sprites:
+        part["pixel_sprites"] = {name: design_spec["pixel_sprites"][name] for name in dict.fromkeys(sprites)}
+    if components:
+        part["ui_components"] = {name: design_spec["ui_components"][name] for name in dict.fromkeys(components)}
+    return encode_spec(part) if part else ""
+
+
+def slice_section(design_spec: dict, files: dict, contracts: dict, codes=None) -> str:
+    """파일별(또는 묶음별) 접미부에 넣을 '필요한 디자인 스펙' + '관련 파일 계약' 섹션.
+
+    Args:
+        design_spec: 디자인 스펙 (BE처럼 없으면 None)
+        files: 작성할 파일 {경로: 설명} — 이 파일들의 자기 계약은 제외 (file_section에 있음)
+        contracts: 전체 인터페이스 계약
+        codes: 프로젝트 코드 — files 중 이미 코드가 있는 파일은 실제 import 대상도 포함
+    """
+    contracts = contracts or {}
+    related = {}
+    for path, description in files.items():
+        code = codes.get(path) if codes is not None else None
+        related.update(related_contracts(path, description, contracts, code, codes or ()))
+    related = {p: c for p, c in related.items() if p not in files}
+
+    sections = []
+    spec_part = design_slice(design_spec, files, contracts) if design_spec else ""
+    if spec_part:
+        sections.append(f"=== 이 파일에 필요한 디자인 스펙 ===\n{spec_part}\n")
+    if related:
+        listing = "\n".join(f"- {path}: {c}" for path, c in related.items())
+        sections.append(f"=== 관련 파일 계약 (이 파일이 호출·생성하는 API) ===\n{listing}\n")
+    return "\n" + "\n".join(sections) if sections else ""
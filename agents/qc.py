@@ -4,15 +4,29 @@ import ast
 import json
 import re
 import subprocess
+import time
+import hashlib
 from dotenv import load_dotenv
 
+from agents.import_resolver import resolve_import_names, is_stdlib_module, flush_cache
+from agents.smoke_runner import run_backend_smoke_test, format_diagnostic
+import blob_store
+from impact import format_code_context
+from token_budget import PromptTooLarge, generate_checked, remaining
+from vfs import ProjectFS
+
 load_dotenv()
 client = genai.Client(
     api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
 )
 
 _QC_MODEL = os.getenv("QC_MODEL", "gemini-2.5-flash")
-MAX_FIX_ITERATIONS = 2
+
+# ── QC 반복 예산 (수렴하는 동안만 리뷰 호출을 계속 사용) ───────────────────────
+MAX_FIX_ITERATIONS = int(os.getenv("QC_MAX_ITERATIONS", "5"))          # 하드 상한
+QC_TOKEN_BUDGET = int(os.getenv("QC_TOKEN_BUDGET", "400000"))         # 리뷰 호출 누적 토큰 상한
+QC_TIME_BUDGET_SEC = float(os.getenv("QC_TIME_BUDGET_SEC", "600"))    # QC 루프 전체 시간 상한
+QC_STALL_PATIENCE = int(os.getenv("QC_STALL_PATIENCE", "1"))          # 오류 수가 줄지 않아도 버티는 횟수
 
 
 # ── 파일 타입별 정적 검사 ──────────────────────────────────────────────────────
@@ -34,7 +48,9 @@ def _check_js(file_path: str, full_path: str) -> list:
             capture_output=True, text=True, timeout=10
         )
         if result.returncode != 0:
-            return [f"[{file_path}] JS Error: {result.stderr.strip()}"]
+            # 임시 사본 경로 대신 프로젝트 상대경로로 표시
+            stderr = result.stderr.strip().replace(full_path, file_path)
+            return [f"[{file_path}] JS Error: {stderr}"]
         return []
     except FileNotFoundError:
         return []  # node 미설치 환경은 건너뜀
@@ -52,20 +68,17 @@ def _check_html(file_path: str, code: str) -> list:
     return errors
 
 
-def _run_syntax_checks(output_dir: str, codes: dict) -> list:
-    """output 디렉토리의 실제 파일을 대상으로 모든 정적 검사 실행."""
-    errors = []
-    for file_path in codes:
-        full_path = os.path.join(output_dir, file_path)
-        if not os.path.exists(full_path):
-            continue
-        with open(full_path, encoding="utf-8") as f:
-            code = f.read()
+def _run_syntax_checks(fs: ProjectFS) -> list:
+    """가상 파일시스템의 현재 내용을 대상으로 모든 정적 검사 실행.
 
+    실제 파일이 필요한 node --check만 fs.real_path()로 디스크 경로를 받습니다.
+    """
+    errors = []
+    for file_path, code in fs.items():
         if file_path.endswith(".py"):
             errors.extend(_check_python(file_path, code))
         elif file_path.endswith(".js"):
-            errors.extend(_check_js(file_path, full_path))
+            errors.extend(_check_js(file_path, fs.real_path(file_path)))
         elif file_path.endswith(".html"):
             errors.extend(_check_html(file_path, code))
     return errors
@@ -73,62 +86,6 @@ def _run_syntax_checks(output_dir: str, codes: dict) -> list:
 
 # ── requirements.txt 유효성 검증 ─────────────────────────────────────────────
 
-# PyPI 패키지명(소문자·언더스코어 정규화) → 코드 내 import 시 사용하는 최상위 모듈명
-_PYPI_TO_IMPORT: dict = {
-    "fastapi":                   "fastapi",
-    "uvicorn":                   "uvicorn",
-    "starlette":                 "starlette",
-    "pydantic":                  "pydantic",
-    "sqlalchemy":                "sqlalchemy",
-    "alembic":                   "alembic",
-    "websockets":                "websockets",
-    "python_multipart":          "multipart",
-    "aiofiles":                  "aiofiles",
-    "httpx":                     "httpx",
-    "requests":                  "requests",
-    "python_dotenv":             "dotenv",
-    "python_jose":               "jose",
-    "passlib":                   "passlib",
-    "pillow":                    "PIL",
-    "bcrypt":                    "bcrypt",
-    "cryptography":              "cryptography",
-    "itsdangerous":              "itsdangerous",
-    "jinja2":                    "jinja2",
-    "aiosqlite":                 "aiosqlite",
-    "asyncpg":                   "asyncpg",
-    "psycopg2":                  "psycopg2",
-    "psycopg2_binary":           "psycopg2",
-    "pymysql":                   "pymysql",
-    "motor":                     "motor",
-    "pymongo":                   "pymongo",
-    "redis":                     "redis",
-    "celery":                    "celery",
-    "boto3":                     "boto3",
-    "openai":                    "openai",
-    "anthropic":                 "anthropic",
-    "google_genai":              "google",
-    "google_generativeai":       "google",
-    "numpy":                     "numpy",
-    "pandas":                    "pandas",
-    "scipy":                     "scipy",
-    "matplotlib":                "matplotlib",
-    "scikit_learn":              "sklearn",
-    "torch":                     "torch",
-    "tensorflow":                "tensorflow",
-    "pytest":                    "pytest",
-    "pytest_asyncio":            "pytest_asyncio",
-    "httpx":                     "httpx",
-    "anyio":                     "anyio",
-    "email_validator":           "email_validator",
-    "python_slugify":            "slugify",
-    "pyyaml":                    "yaml",
-    "toml":                      "toml",
-    "click":                     "click",
-    "rich":                      "rich",
-    "loguru":                    "loguru",
-}
-
-
 def _normalize_pkg_name(raw: str) -> str:
     """PyPI 패키지명을 소문자 언더스코어 형식으로 정규화."""
     # extras 제거: uvicorn[standard] → uvicorn
@@ -171,14 +128,15 @@ _PYPI_TO_CODE_PATTERN: dict = {
 }
 
 
-def _fix_requirements_txt(output_dir: str, codes: dict) -> list:
+def _fix_requirements_txt(codes: dict) -> list:
     """requirements.txt에서 실제로 사용되지 않거나 존재하지 않는 패키지를 제거.
 
     전략:
       1. 생성된 Python 파일의 import 문에서 실제 사용 모듈명 수집
       2. _ALWAYS_KEEP_NORMALIZED 에 속하면 무조건 유지 (uvicorn 등 CLI 서버)
-      3. _PYPI_TO_IMPORT 매핑표에 있으면 → 해당 import명이 코드에 있을 때만 유지
-      4. 매핑표에 없으면 → pkg 이름 자체가 import에 보이면 유지, 그 외 제거
+      3. 표준 라이브러리 모듈명(asyncio, json 등)이 적혀 있으면 제거
+      4. import_resolver로 배포판명 → import명을 해석해 코드에 import가 있을 때만 유지
+         (번들 스냅샷 → 로컬 packages_distributions() → 이름 추정 순)
     """
     req_key = "requirements.txt"
     if req_key not in codes:
@@ -216,38 +174,30 @@ def _fix_requirements_txt(output_dir: str, codes: dict) -> list:
                 removed.append(stripped)  # 패턴 없음 → 제거
             continue
 
-        # ③ 알려진 매핑표에서 import명 조회
-        import_name = _PYPI_TO_IMPORT.get(pkg_norm)
+        # ③ 표준 라이브러리를 requirements에 적은 경우 → 제거
+        if is_stdlib_module(pkg_norm):
+            removed.append(stripped)
+            continue
 
-        if import_name is not None:
-            # 매핑표에 있는 패키지 → import 문에서 실제 사용 여부 확인
-            if import_name in imported:
-                new_lines.append(line)    # 사용됨 → 유지
-            else:
-                removed.append(stripped)  # 미사용 → 제거
+        # ④ 배포판명 → import명 해석 후 실제 import 여부 확인
+        import_names, _source = resolve_import_names(pkg_norm)
+        if import_names & imported:
+            new_lines.append(line)    # 사용됨 → 유지
         else:
-            # ④ 매핑표 미등록 패키지 → pkg 이름 자체가 import에 보이면 유지
-            pkg_base = pkg_norm.split("_")[0]  # e.g. psycopg2_binary → psycopg2
-            if pkg_norm in imported or pkg_base in imported:
-                new_lines.append(line)    # 유지
-            else:
-                removed.append(stripped)  # 알 수 없고 미사용 → 제거
+            removed.append(stripped)  # 미사용 또는 알 수 없음 → 제거
+
+    flush_cache()
 
     if not removed:
         return []
 
-    new_content = "\n".join(new_lines)
-    codes[req_key] = new_content
-    full_path = os.path.join(output_dir, req_key)
-    if os.path.exists(full_path):
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+    codes[req_key] = "\n".join(new_lines)
     return removed
 
 
 # ── Python import 경로 사전 보정 ──────────────────────────────────────────────
 
-def _fix_python_imports(output_dir: str, codes: dict) -> list:
+def _fix_python_imports(codes: dict) -> list:
     """모든 intra-project import를 절대경로로 변환하고 __init__.py를 자동 생성.
 
     처리 패턴:
@@ -303,13 +253,8 @@ def _fix_python_imports(output_dir: str, codes: dict) -> list:
         if dir_path not in py_containing_dirs:
             continue  # Python 파일 없는 디렉토리는 제외
         init_path = f"{dir_path}/__init__.py"
-        full_init = os.path.join(output_dir, init_path)
-        if not os.path.exists(full_init):
-            os.makedirs(os.path.dirname(full_init), exist_ok=True)
-            with open(full_init, "w", encoding="utf-8") as f:
-                f.write("")
-            if init_path not in codes:
-                codes[init_path] = ""
+        if init_path not in codes:
+            codes[init_path] = ""
             fixed.append(f"{init_path} (신규 생성)")
 
     # 3. 각 Python 파일의 import 구문 절대경로로 보정
@@ -410,12 +355,7 @@ def _fix_python_imports(output_dir: str, codes: dict) -> list:
             new_lines.append(line)
 
         if changed:
-            new_code = "\n".join(new_lines)
-            codes[file_path] = new_code
-            full_path = os.path.join(output_dir, file_path)
-            if os.path.exists(full_path):
-                with open(full_path, "w", encoding="utf-8") as f:
-                    f.write(new_code)
+            codes[file_path] = "\n".join(new_lines)
             fixed.append(file_path)
 
     return fixed
@@ -484,23 +424,46 @@ def _detect_missing_js_modules(codes: dict) -> list:
 
 # ── Gemini 코드 리뷰 & 수정 ───────────────────────────────────────────────────
 
+def _generate_with_context(head: str, tail: str, codes: dict, scope=None) -> tuple:
+    """head + 코드 컨텍스트 + tail 프롬프트로 호출 → (응답, 보낸 프롬프트).
+
+    코드 컨텍스트 예산은 실제로 만든 head·tail을 뺀 나머지입니다. 블록별 추정의 합과 이어 붙인
+    전체 추정이 어긋나 한도를 넘으면 넘친 만큼 예산을 줄여 다시 맞추고, 코드를 모두 생략해도
+    넘치면 PromptTooLarge를 그대로 올립니다.
+    """
+    budget = remaining(_QC_MODEL, head, tail)
+    while True:
+        files_block = format_code_context(codes, scope, budget=max(budget, 0), model=_QC_MODEL)
+        prompt = head + files_block + tail
+        try:
+            return generate_checked(client, _QC_MODEL, prompt), prompt
+        except PromptTooLarge:
+            overflow = -remaining(_QC_MODEL, prompt)
+            if budget <= 0 or overflow <= 0:
+                raise
+            budget -= overflow
+
+
 def _gemini_review_and_fix(
     prd: str,
     current_codes: dict,
     syntax_errors: list,
     project_domain: str = "APP",
+    scope=None,
 ) -> dict:
-    """전체 코드베이스를 Gemini로 리뷰하고, 이슈와 수정 코드 반환.
+    """코드베이스를 Gemini로 리뷰하고, (이슈·수정 코드 dict, 사용 토큰 수) 반환.
 
     project_domain에 따라 도메인 특화 리뷰 항목을 추가합니다:
     - GAME: Canvas 루프 무결성, 물리 연산, pixel_sprites 렌더링
     - APP: DOM 조작 안정성, 이벤트 핸들러, API 연동
+    scope가 주어지면 그 밖의 파일은 골격(시그니처)만 보여 주고 수정 대상에서 제외합니다.
     """
-    files_block = "\n".join(
-        f"\n--- {path} ---\n{code}" for path, code in current_codes.items()
+    scope_note = (
+        "\n[중요] '(골격)'으로 표시된 파일은 이번 변경의 영향 범위 밖입니다. 참고만 하고 fixed_files에 포함하지 마세요.\n"
+        if scope is not None else ""
     )
     errors_block = (
-        "\n=== 정적 검사에서 발견된 오류 ===\n" + "\n".join(syntax_errors)
+        "\n=== 정적 검사 / 런타임 스모크 테스트에서 발견된 오류 ===\n" + "\n".join(syntax_errors)
         if syntax_errors else ""
     )
 
@@ -555,7 +518,7 @@ A4. Lucide 아이콘 초기화
     - data-lucide 속성이 올바른 아이콘 이름을 사용하는지 확인
 """
 
-    prompt = f"""
+    head = f"""
 당신은 시니어 코드 리뷰어입니다.
 아래 코드베이스를 검토하고 문제를 발견하면 수정해주세요.
 
@@ -579,45 +542,43 @@ A4. Lucide 아이콘 초기화
 6. 기획서 대비 핵심 기능 누락
 
 === 전체 코드베이스 ===
-{files_block}
+{scope_note}"""
+    tail = """
 
 반드시 아래 JSON 형식으로만 답변하세요 (다른 텍스트 없이 JSON만):
-{{
+{
     "issues": ["발견된 문제 설명 1", "발견된 문제 설명 2"],
-    "fixed_files": {{
+    "fixed_files": {
         "수정이_필요한_파일경로": "수정된_전체_코드"
-    }},
-    "new_files": {{
+    },
+    "new_files": {
         "새로_생성할_파일경로": "파일_전체_코드"
-    }},
+    },
     "summary": "전체 QC 결과 한 줄 요약"
-}}
+}
 
 수정이 필요 없는 파일은 fixed_files에 포함하지 마세요.
 코드에서 import/require하지만 파일 목록에 없는 파일은 new_files에 생성해 주세요.
 수정할 문제가 전혀 없으면 issues를 빈 배열로, fixed_files와 new_files를 빈 객체로 반환하세요.
 """
 
-    response = client.models.generate_content(
-        model=_QC_MODEL,
-        contents=prompt
-    )
+    response, prompt = _generate_with_context(head, tail, current_codes, scope)
+    usage = getattr(response, "usage_metadata", None)
+    tokens_used = getattr(usage, "total_token_count", None) or (len(prompt) + len(response.text or "")) // 3
     raw = response.text.strip()
     if raw.startswith("```"):
         raw = re.sub(r'^```(?:json)?\n?', '', raw)
         raw = re.sub(r'\n?```$', '', raw.strip())
-    return json.loads(raw)
+    return json.loads(raw), tokens_used
 
 
 # ── README 생성 ───────────────────────────────────────────────────────────────
 
-def _generate_readme(state: dict, output_dir: str, codes: dict) -> None:
-    """QC 완료 후 output 디렉토리에 실행법이 담긴 README.md 생성."""
+def _generate_readme(state: dict, codes: dict) -> None:
+    """QC 완료 후 실행법이 담긴 README.md를 codes(가상 파일시스템)에 추가."""
 
     file_tree_block = "\n".join(f"- {path}: {desc}" for path, desc in state.get("file_tree", {}).items())
-    files_block = "\n".join(f"\n--- {path} ---\n{code}" for path, code in codes.items())
-
-    prompt = f"""
+    head = f"""
 당신은 기술 문서 작성 전문가입니다.
 아래 정보를 바탕으로 이 프로젝트를 처음 보는 개발자가 바로 실행할 수 있는 README.md를 작성해주세요.
 
@@ -628,7 +589,8 @@ def _generate_readme(state: dict, output_dir: str, codes: dict) -> None:
 {file_tree_block}
 
 === 전체 코드 ===
-{files_block}
+"""
+    tail = """
 
 README.md에 반드시 포함할 항목:
 1. 프로젝트 제목 및 한 줄 설명
@@ -645,29 +607,80 @@ README.md에 반드시 포함할 항목:
 """
 
     try:
-        response = client.models.generate_content(
-            model=_QC_MODEL,
-            contents=prompt
-        )
+        response, _ = _generate_with_context(head, tail, codes, state.get("impact_scope"))
         readme_content = response.text.strip()
         # 혹시 ```markdown 블록으로 감싸진 경우 제거
         if readme_content.startswith("```"):
             readme_content = re.sub(r'^```(?:markdown)?\n?', '', readme_content)
             readme_content = re.sub(r'\n?```$', '', readme_content.strip())
 
-        readme_path = os.path.join(output_dir, "README.md")
-        with open(readme_path, "w", encoding="utf-8") as f:
-            f.write(readme_content)
-        print(f"  📄 README.md 생성 완료 → {readme_path}")
+        codes["README.md"] = readme_content
+        print(f"  📄 README.md 생성 완료")
+    except PromptTooLarge as e:
+        print(f"  ⚠️  README.md 생성 건너뜀 — 코드를 모두 생략해도 프롬프트가 모델 한도를 넘음: {e}")
     except Exception as e:
         print(f"  ⚠️  README.md 생성 실패: {e}")
 
 
+# ── 수렴 판정 ─────────────────────────────────────────────────────────────────
+
+def _fingerprint(issue: str) -> str:
+    """이슈/오류 문자열 → 줄번호·공백 차이에 둔감한 지문."""
+    normalized = re.sub(r"\d+", "#", issue.lower())
+    normalized = re.sub(r"\s+", " ", normalized).strip()[:200]
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+class _ConvergenceTracker:
+    """반복별 이슈 지문 집합을 추적해 수렴·정체·진동을 판정.
+
+    - 진동: 이전에 사라졌던 지문이 다시 나타남 (수정이 예전 오류를 되살림)
+    - 정체: 지문 수가 QC_STALL_PATIENCE회 연속으로 줄지 않음
+    """
+
+    def __init__(self):
+        self.history: list = []     # [set(지문), ...] 반복 순서대로
+        self.resolved: set = set()  # 한 번 나타났다가 사라진 지문
+        self.stalls = 0
+
+    def reintroduced(self, fingerprints: set) -> set:
+        return fingerprints & self.resolved
+
+    def observe(self, fingerprints: set) -> str:
+        """이번 반복의 지문 집합을 기록하고 중단 사유를 반환 (계속 진행이면 빈 문자열)."""
+        stop_reason = ""
+        if self.history:
+            previous = self.history[-1]
+            if self.reintroduced(fingerprints):
+                stop_reason = f"진동 감지 (해결됐던 오류 {len(self.reintroduced(fingerprints))}건 재발)"
+            elif len(fingerprints) >= len(previous):
+                self.stalls += 1
+                if self.stalls >= QC_STALL_PATIENCE:
+                    stop_reason = f"수렴 정체 (오류 {len(previous)}건 → {len(fingerprints)}건)"
+            else:
+                self.stalls = 0
+            self.resolved |= previous - fingerprints
+        self.history.append(fingerprints)
+        return stop_reason
+
+
 # ── QC Agent 메인 ─────────────────────────────────────────────────────────────
 
+def _flush_to_disk(codes: ProjectFS) -> None:
+    """QC 중 변경된 파일을 output 디렉토리에 일괄 기록."""
+    written = codes.flush()
+    if written:
+        print(f"  💾 변경 파일 {len(written)}개 디스크 반영")
+
+
 def qc_agent(state: dict) -> dict:
+    """생성 코드를 검증·자동 수정하는 QC 에이전트.
+
+    QC 루프 전체는 인메모리 가상 파일시스템(ProjectFS) 위에서 동작하며,
+    변경된 파일은 마지막에 한 번만 output 디렉토리에 원자적으로 기록됩니다.
+    """
     output_dir = os.path.join("output", state["project_name"])
-    codes = dict(state.get("codes", {}))
+    codes = ProjectFS(output_dir, state.get("codes", {}))
     prd = state.get("prd", "")
     project_domain = state.get("project_domain", "APP")
 
@@ -676,31 +689,41 @@ def qc_agent(state: dict) -> dict:
         return state
 
     # 0-a. requirements.txt 유효성 검증 (존재하지 않거나 미사용 패키지 제거)
-    req_removed = _fix_requirements_txt(output_dir, codes)
+    req_removed = _fix_requirements_txt(codes)
     if req_removed:
         print(f"  🗑️  requirements.txt 유령 패키지 제거 ({len(req_removed)}건): {', '.join(req_removed)}")
 
     # 0-b. Python import 경로 사전 보정 (상대/bare → 절대경로, 중간 __init__.py 생성)
-    import_fixes = _fix_python_imports(output_dir, codes)
+    import_fixes = _fix_python_imports(codes)
     if import_fixes:
         print(f"  🔧 Import 경로 사전 보정 ({len(import_fixes)}건): {', '.join(import_fixes)}")
 
+    # 고도화 모드: 영향 범위 밖 파일은 리뷰 프롬프트에 골격만 넣고 수정하지 않음
+    scope = state.get("impact_scope")
+    scope = set(scope) if scope is not None else None
+
     all_issues = []
     total_fixed_files = set()
+    tracker = _ConvergenceTracker()
+    started_at = time.monotonic()
+    tokens_spent = 0
+    last_review_tokens = 0
+    stop_reason = ""
 
     for iteration in range(1, MAX_FIX_ITERATIONS + 1):
-        print(f"  🔍 QC 검증 {iteration}회차...")
+        # 예산 확인: 직전 리뷰 비용만큼 한 번 더 쓸 여유가 없으면 중단
+        elapsed = time.monotonic() - started_at
+        if iteration > 1 and tokens_spent + last_review_tokens > QC_TOKEN_BUDGET:
+            stop_reason = f"토큰 예산 소진 ({tokens_spent:,}/{QC_TOKEN_BUDGET:,})"
+            break
+        if iteration > 1 and elapsed > QC_TIME_BUDGET_SEC:
+            stop_reason = f"시간 예산 소진 ({elapsed:.0f}s/{QC_TIME_BUDGET_SEC:.0f}s)"
+            break
 
-        # 1. output 디렉토리의 실제 파일 내용 읽기
-        current_codes = {}
-        for file_path in codes:
-            full_path = os.path.join(output_dir, file_path)
-            if os.path.exists(full_path):
-                with open(full_path, encoding="utf-8") as f:
-                    current_codes[file_path] = f.read()
+        print(f"  🔍 QC 검증 {iteration}회차...")
 
-        # 2. 정적 문법 검사
-        syntax_errors = _run_syntax_checks(output_dir, codes)
+        # 1~2. 정적 문법 검사 (가상 파일시스템의 현재 내용 기준 — 디스크 재읽기 없음)
+        syntax_errors = _run_syntax_checks(codes)
 
         # 2-b. JS/TS 누락 모듈 탐지 (import하는데 파일이 없는 경우)
         js_missing = _detect_missing_js_modules(codes)
@@ -710,6 +733,14 @@ def qc_agent(state: dict) -> dict:
                 print(f"      {msg}")
             syntax_errors.extend(js_missing)
 
+        # 2-c. 런타임 스모크 테스트 (격리 워커에서 import + app 기동 + GET 라우트 호출)
+        #      Python 문법 오류가 남아 있으면 import 실패가 중복 보고되므로 건너뜀
+        if not any("SyntaxError" in e for e in syntax_errors):
+            runtime_diags = run_backend_smoke_test(codes)
+            if runtime_diags:
+                print(f"  💥 런타임 스모크 테스트 실패 {len(runtime_diags)}건")
+                syntax_errors.extend(format_diagnostic(d) for d in runtime_diags)
+
         if syntax_errors:
             print(f"  ⚠️  문법/구조 오류 {len(syntax_errors)}건 발견")
             for err in [e for e in syntax_errors if not e.startswith("[") or "JS import 누락" not in e]:
@@ -717,9 +748,23 @@ def qc_agent(state: dict) -> dict:
         else:
             print(f"  ✅ 문법 검사 통과")
 
+        # 2-d. 리뷰 전 진동 확인: 직전 수정이 이미 해결했던 정적 오류를 되살렸으면
+        #      같은 수정을 또 요청하는 리뷰 호출을 쓰지 않고 중단
+        static_fps = {_fingerprint(e) for e in syntax_errors}
+        if tracker.reintroduced(static_fps):
+            stop_reason = f"진동 감지 (해결됐던 정적 오류 {len(tracker.reintroduced(static_fps))}건 재발)"
+            break
+
         # 3. Gemini 코드 리뷰 (도메인 인지형)
+        review_scope = scope | total_fixed_files if scope is not None else None
         try:
-            result = _gemini_review_and_fix(prd, current_codes, syntax_errors, project_domain)
+            result, last_review_tokens = _gemini_review_and_fix(
+                prd, codes, syntax_errors, project_domain, review_scope
+            )
+            tokens_spent += last_review_tokens
+        except PromptTooLarge as e:
+            stop_reason = f"리뷰 프롬프트가 모델 한도 초과 — 코드 컨텍스트를 모두 줄여도 맞지 않음 ({e})"
+            break
         except (json.JSONDecodeError, Exception) as e:
             print(f"  ⚠️  Gemini 리뷰 파싱 실패: {e}")
             break
@@ -727,61 +772,80 @@ def qc_agent(state: dict) -> dict:
         issues = result.get("issues", [])
         fixed_files = result.get("fixed_files", {})
         summary = result.get("summary", "")
+        if review_scope is not None:
+            # 골격만 본 파일의 "수정본"은 원본을 잘라먹을 수 있으므로 버림
+            out_of_scope = sorted(p for p in fixed_files if p not in review_scope)
+            if out_of_scope:
+                print(f"  ⏭️  영향 범위 밖 수정 무시 ({len(out_of_scope)}건): {', '.join(out_of_scope)}")
+                fixed_files = {p: c for p, c in fixed_files.items() if p in review_scope}
+
+        new_files = result.get("new_files", {})
+        if review_scope is not None:
+            new_files = {p: c for p, c in new_files.items() if p not in codes or p in review_scope}
 
         if issues:
-            all_issues.extend(issues)
+            # 반복마다 같은 이슈가 다시 보고될 수 있으므로 리포트에는 지문 기준으로 한 번만 기록
+            reported = {_fingerprint(i) for i in all_issues}
+            all_issues.extend(i for i in issues if _fingerprint(i) not in reported)
             print(f"  📋 이슈 {len(issues)}건: {', '.join(issues[:2])}{'...' if len(issues) > 2 else ''}")
 
+        # 3-b. 수렴 판정 (정적 오류 + 리뷰 이슈 지문)
+        convergence_stop = tracker.observe(static_fps | {_fingerprint(i) for i in issues})
+        if convergence_stop.startswith("진동"):
+            # 되살아난 오류를 겨냥한 수정은 직전 수정을 되돌릴 가능성이 높으므로 적용하지 않음
+            stop_reason = convergence_stop
+            break
+
         # 4. 수정 파일 적용
-        new_files = result.get("new_files", {})
         if fixed_files or new_files:
             if fixed_files:
                 print(f"  🔧 {len(fixed_files)}개 파일 수정 적용 중...")
                 for file_path, fixed_code in fixed_files.items():
-                    full_path = os.path.join(output_dir, file_path)
-                    parent = os.path.dirname(full_path)
-                    if parent:
-                        os.makedirs(parent, exist_ok=True)
-                    with open(full_path, "w", encoding="utf-8") as f:
-                        f.write(fixed_code)
                     codes[file_path] = fixed_code
                     total_fixed_files.add(file_path)
 
             if new_files:
                 print(f"  ✨ {len(new_files)}개 누락 파일 신규 생성 중...")
                 for file_path, new_code in new_files.items():
-                    full_path = os.path.join(output_dir, file_path)
-                    parent = os.path.dirname(full_path)
-                    if parent:
-                        os.makedirs(parent, exist_ok=True)
-                    with open(full_path, "w", encoding="utf-8") as f:
-                        f.write(new_code)
                     codes[file_path] = new_code
                     total_fixed_files.add(file_path)
                     print(f"      ✅ {file_path}")
 
             print(f"  ✅ 적용 완료")
+            if convergence_stop:
+                stop_reason = convergence_stop  # 이번 수정까지만 반영하고 추가 리뷰는 생략
+                break
         else:
             print(f"  ✅ 추가 수정 필요 없음")
             # 이슈도 없고 수정/생성도 없으면 조기 종료
             if not issues and not syntax_errors and not new_files:
                 print(f"\n  📝 README.md 생성 중...")
-                _generate_readme(state, output_dir, codes)
+                _generate_readme(state, codes)
+                _flush_to_disk(codes)
                 state.update({
-                    "codes": codes,
+                    "codes": codes.snapshot(),
                     "feedback": summary or "모든 파일 QC 통과",
                     "current_step": "DONE"
                 })
+                blob_store.collect()
                 return state
-            break  # 이슈는 있었지만 이미 직전 iteration에서 수정 완료
+            break  # 이슈는 남았지만 수정안이 없음 → 더 반복해도 진전 없음
 
     # ── README 생성 & 최종 리포트 ─────────────────────────────────────────────
     print(f"\n  📝 README.md 생성 중...")
-    _generate_readme(state, output_dir, codes)
+    _generate_readme(state, codes)
+
+    final_errors = _run_syntax_checks(codes)
+    _flush_to_disk(codes)
 
-    final_errors = _run_syntax_checks(output_dir, codes)
+    if stop_reason:
+        print(f"  ⏹️  QC 반복 중단: {stop_reason}")
 
     report_lines = ["=== QC 최종 리포트 ==="]
+    report_lines.append(
+        f"\nQC 반복: {len(tracker.history)}회 리뷰 / 토큰 {tokens_spent:,} / "
+        f"{time.monotonic() - started_at:.0f}s" + (f" — 중단 사유: {stop_reason}" if stop_reason else "")
+    )
 
     if all_issues:
         report_lines.append(f"\n발견된 이슈 ({len(all_issues)}건):")
@@ -803,8 +867,9 @@ def qc_agent(state: dict) -> dict:
         report_lines.append("\n✅ 최종 문법 검사 통과")
 
     state.update({
-        "codes": codes,
+        "codes": codes.snapshot(),
         "feedback": "\n".join(report_lines),
         "current_step": "DONE"
     })
+    blob_store.collect()  # QC 중 덮어쓴 이전 버전 본문 정리
     return state
@@ -0,0 +1,253 @@
+"""생성된 FastAPI 백엔드의 런타임 import 스모크 테스트.
+
+AST 정적 검사로는 순환 import, 존재하지 않는 이름 import, 깨진 app 객체를 잡을 수 없습니다.
+이 모듈은 생성된 Python 파일을 임시 디렉토리에 옮겨 두고, 미리 띄워 둔(warm) 워커
+프로세스 풀에서 모듈별로 격리 import 한 뒤 app 객체를 만들어 모든 GET 라우트에
+로컬 요청을 보내 봅니다. 실패는 QC 수정 프롬프트에 넣을 구조화된 진단으로 반환됩니다.
+워커는 PATH·HOME·로캘·PYTHON* 등 최소 환경 변수만 받으며, API 키 같은 비밀 값은 넘기지 않습니다.
+
+환경 변수:
+  QC_SMOKE_TEST     "0"이면 비활성화 (기본 "1")
+  QC_SMOKE_WORKERS  워커 풀 크기 (기본 2)
+  QC_SMOKE_TIMEOUT  작업 1건당 제한 시간(초) (기본 20)
+  QC_SMOKE_MEM_MB   워커 주소 공간 상한(MB, POSIX 한정) (기본 1024)
+"""
+
+import atexit
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.import_resolver import resolve_import_names, is_stdlib_module
+from agents.smoke_worker import RESULT_MARKER
+
+_WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "smoke_worker.py")
+
+SMOKE_ENABLED = os.getenv("QC_SMOKE_TEST", "1") != "0"
+_POOL_SIZE = int(os.getenv("QC_SMOKE_WORKERS", "2"))
+_TIMEOUT_SEC = float(os.getenv("QC_SMOKE_TIMEOUT", "20"))
+_MEM_LIMIT_MB = int(os.getenv("QC_SMOKE_MEM_MB", "1024"))
+
+# import 시 서버 실행·마이그레이션 등 부작용이 큰 디렉토리는 제외
+_SKIP_DIRS = {"tests", "test", "alembic", "migrations", "scripts"}
+
+_APP_ASSIGN_RE = re.compile(r"^(\w+)\s*(?::\s*\w+\s*)?=\s*FastAPI\(", re.MULTILINE)
+
+# 워커(생성 코드를 실제로 실행)에 넘길 환경 변수 — 이 목록 밖의 값(.env로 읽은 API 키 등)은 넘기지 않음
+_ENV_ALLOW = {"PATH", "HOME", "LANG", "LANGUAGE", "TMPDIR", "TEMP", "TMP", "SYSTEMROOT", "VIRTUAL_ENV"}
+_ENV_ALLOW_PREFIXES = ("LC_", "PYTHON")
+_ENV_SECRET_SUFFIXES = ("_API_KEY", "_KEY", "_TOKEN", "_SECRET", "_PASSWORD")
+
+
+def _worker_env() -> dict:
+    """워커용 최소 환경: 실행에 필요한 변수만 남기고 비밀 값은 이름 규칙으로 한 번 더 제외."""
+    env = {
+        k: v for k, v in os.environ.items()
+        if (k in _ENV_ALLOW or k.startswith(_ENV_ALLOW_PREFIXES)) and not k.upper().endswith(_ENV_SECRET_SUFFIXES)
+    }
+    env.update(
+        PYTHONDONTWRITEBYTECODE="1", PYTHONUNBUFFERED="1",
+        SMOKE_WORKER_MEM_MB=str(_MEM_LIMIT_MB), SMOKE_WORKER_CPU_SEC=str(int(_TIMEOUT_SEC) + 5),
+    )
+    return env
+
+
+class WarmWorkerPool:
+    """작업 1건당 1회용 워커를 미리 띄워 두는 프로세스 풀.
+
+    워커를 하나 꺼내 쓰는 즉시 교체 워커를 띄워 두므로, 다음 작업은
+    Python 기동 + 의존성 import 비용 없이 바로 시작됩니다.
+    """
+
+    def __init__(self, size: int = _POOL_SIZE):
+        self._size = max(1, size)
+        self._idle: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(self._size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> subprocess.Popen:
+        # 자원 제한은 워커가 시작하자마자 스스로 적용 (교체 워커는 풀 스레드에서 띄우므로
+        # 스레드가 있는 프로세스에서 안전하지 않은 preexec_fn은 쓰지 않음)
+        return subprocess.Popen(
+            [sys.executable, _WORKER_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            env=_worker_env(),
+        )
+
+    def run(self, job: dict, timeout: float = _TIMEOUT_SEC) -> list:
+        """워커 하나에 작업을 맡기고 진단 목록을 반환."""
+        proc = self._idle.get()
+        with self._lock:
+            if not self._closed:
+                self._idle.put(self._spawn())
+
+        target = job.get("app_module") or ", ".join(job.get("modules", []))
+        try:
+            out, err = proc.communicate(json.dumps(job) + "\n", timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return [{
+                "kind": "timeout", "target": target, "error": "Timeout",
+                "message": f"{timeout:.0f}초 내에 import/요청이 끝나지 않음 (블로킹 코드 또는 서버 자동 실행 의심)",
+                "file": None, "line": None, "missing_module": None,
+            }]
+
+        for line in out.splitlines():
+            if line.startswith(RESULT_MARKER):
+                try:
+                    return json.loads(line[len(RESULT_MARKER):])
+                except json.JSONDecodeError:
+                    break
+
+        tail = (err or "").strip().splitlines()[-3:]
+        return [{
+            "kind": "crash", "target": target, "error": f"exit {proc.returncode}",
+            "message": " | ".join(tail) or "워커가 결과 없이 종료됨 (자원 제한 초과 의심)",
+            "file": None, "line": None, "missing_module": None,
+        }]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+        while not self._idle.empty():
+            proc = self._idle.get_nowait()
+            proc.kill()
+            proc.communicate()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> WarmWorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmWorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def _module_name(file_path: str):
+    """backend/api/users.py → backend.api.users (import 불가능한 경로는 None)."""
+    parts = file_path.replace("\\", "/")[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts or any(not p.isidentifier() for p in parts):
+        return None
+    if _SKIP_DIRS.intersection(parts[:-1]):
+        return None
+    return ".".join(parts)
+
+
+def _find_app(py_codes: dict):
+    """`app = FastAPI(...)`가 정의된 (모듈명, 변수명). main.py 계열을 우선."""
+    found = []
+    for file_path, code in py_codes.items():
+        m = _APP_ASSIGN_RE.search(code)
+        module = _module_name(file_path)
+        if m and module:
+            found.append((0 if file_path.endswith("main.py") else 1, module, m.group(1)))
+    if not found:
+        return None
+    found.sort()
+    return found[0][1], found[0][2]
+
+
+def _required_modules(codes: dict) -> set:
+    """requirements.txt에 선언된 배포판이 제공하는 import명 집합."""
+    modules: set = set()
+    for line in codes.get("requirements.txt", "").splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        name = re.split(r"[\[>=<!~;\s]", stripped)[0]
+        modules |= resolve_import_names(name)[0]
+    return modules
+
+
+def _classify(diagnostics: list, project_packages: set, required: set) -> list:
+    """설치 환경 문제(선언됐지만 이 머신에 없는 패키지)는 걸러내고 나머지만 반환."""
+    result = []
+    seen = set()
+    for diag in diagnostics:
+        missing = (diag.get("missing_module") or "").split(".")[0]
+        if missing and missing not in project_packages and not is_stdlib_module(missing):
+            if missing in required:
+                continue  # requirements.txt에 있으나 로컬 미설치 → 코드 문제 아님
+            diag = dict(diag, kind="requirement",
+                        message=f"'{missing}' 모듈을 import 하지만 requirements.txt에 없음")
+        key = (diag["kind"], diag.get("file"), diag.get("error"), diag.get("message"))
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(diag)
+    return result
+
+
+def format_diagnostic(diag: dict) -> str:
+    """진단 1건 → QC 프롬프트/로그용 한 줄 문자열."""
+    where = diag.get("file") or diag.get("target", "")
+    if diag.get("line"):
+        where += f":{diag['line']}"
+    return f"[{where}] Runtime {diag['error']} ({diag['kind']}: {diag.get('target', '')}): {diag['message']}"
+
+
+def run_backend_smoke_test(codes: dict) -> list:
+    """생성된 Python 백엔드를 격리된 워커에서 import·실행해 진단 목록을 반환.
+
+    Returns:
+        [{"kind", "target", "error", "message", "file", "line", "missing_module"}, ...]
+        문제가 없거나 검사 대상이 없으면 빈 리스트.
+    """
+    py_codes = {p: c for p, c in codes.items() if p.endswith(".py")}
+    if not SMOKE_ENABLED or not py_codes:
+        return []
+
+    modules = sorted({m for m in (_module_name(p) for p in py_codes) if m})
+    app_target = _find_app(py_codes)
+    if not modules:
+        return []
+
+    project_packages = {m.split(".")[0] for m in modules}
+    work_dir = tempfile.mkdtemp(prefix="qc_smoke_")
+    try:
+        for file_path, code in codes.items():
+            if not file_path.endswith((".py", ".json", ".txt", ".env")):
+                continue
+            full_path = os.path.join(work_dir, file_path)
+            os.makedirs(os.path.dirname(full_path) or work_dir, exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(code)
+
+        jobs = [{"project_dir": work_dir, "modules": [m]} for m in modules]
+        if app_target:
+            jobs.append({"project_dir": work_dir, "app_module": app_target[0], "app_attr": app_target[1]})
+
+        pool = _get_pool()
+        with ThreadPoolExecutor(max_workers=_POOL_SIZE) as executor:
+            results = list(executor.map(pool.run, jobs))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # 임시 디렉토리 경로는 프롬프트에 의미가 없으므로 프로젝트 상대경로로 치환
+    prefix = work_dir.rstrip(os.sep) + os.sep
+    diagnostics = [
+        dict(d, message=str(d.get("message", "")).replace(prefix, ""))
+        for batch in results for d in batch
+    ]
+    return _classify(diagnostics, project_packages, _required_modules(codes))
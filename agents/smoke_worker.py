@@ -0,0 +1,221 @@
+"""런타임 스모크 테스트 워커 프로세스.
+
+smoke_runner의 워커 풀이 미리 띄워 두는 프로세스입니다. 기동 시 FastAPI 등 무거운
+의존성을 먼저 import 해 두고(warm-up), stdin으로 작업 1건을 받아 처리한 뒤 종료합니다.
+작업마다 새 프로세스를 쓰므로 생성된 코드의 import 부작용이 서로 격리됩니다.
+
+작업 (stdin, JSON 한 줄):
+  {"project_dir": "...", "modules": ["backend.main", ...], "app_module": "backend.main", "app_attr": "app"}
+결과 (stdout, RESULT_MARKER 뒤 JSON 한 줄):
+  [{"kind": "import"|"app"|"route", "target": ..., "error": ..., "message": ..., "file": ..., "line": ...}, ...]
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows: 자원 제한 없이 타임아웃만 적용
+    resource = None
+
+RESULT_MARKER = "__SMOKE_RESULT__"
+
+_WARM_MODULES = ("fastapi", "starlette", "pydantic", "sqlalchemy")
+
+
+def _apply_limits() -> None:
+    """smoke_runner가 환경변수로 넘긴 자원 제한을 이 프로세스에 적용 (기동 직후, POSIX 한정)."""
+    if resource is None:
+        return
+    limits = (
+        (resource.RLIMIT_AS, int(os.getenv("SMOKE_WORKER_MEM_MB", "0")) * 1024 * 1024),
+        (resource.RLIMIT_CPU, int(os.getenv("SMOKE_WORKER_CPU_SEC", "0"))),
+    )
+    for kind, value in limits:
+        if value <= 0:
+            continue
+        try:
+            resource.setrlimit(kind, (value, value))
+        except (ValueError, OSError):
+            pass
+
+
+def _warm_up() -> None:
+    for name in _WARM_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+
+def _project_location(exc: BaseException, project_dir: str) -> tuple:
+    """traceback에서 프로젝트 내부의 가장 마지막 프레임 (상대경로, 줄번호)."""
+    location = (None, None)
+    for frame in traceback.extract_tb(exc.__traceback__):
+        if frame.filename.startswith(project_dir):
+            rel = os.path.relpath(frame.filename, project_dir).replace("\\", "/")
+            location = (rel, frame.lineno)
+    # SyntaxError는 프레임 대신 자체 위치 정보를 가짐
+    if isinstance(exc, SyntaxError) and exc.filename and exc.filename.startswith(project_dir):
+        location = (os.path.relpath(exc.filename, project_dir).replace("\\", "/"), exc.lineno)
+    return location
+
+
+def _entry(kind: str, target: str, exc: BaseException, project_dir: str) -> dict:
+    file, line = _project_location(exc, project_dir)
+    return {
+        "kind": kind,
+        "target": target,
+        "error": type(exc).__name__,
+        "message": str(exc),
+        "file": file,
+        "line": line,
+        "missing_module": exc.name if isinstance(exc, ModuleNotFoundError) else None,
+    }
+
+
+def _import_modules(modules: list, project_dir: str) -> list:
+    diagnostics = []
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+        except BaseException as e:  # SystemExit 등도 진단으로 수집
+            diagnostics.append(_entry("import", module_name, e, project_dir))
+    return diagnostics
+
+
+def _get_paths(app) -> list:
+    """경로 파라미터가 없는 GET 라우트 목록."""
+    paths = []
+    for route in getattr(app, "routes", []):
+        methods = getattr(route, "methods", None) or set()
+        path = getattr(route, "path", "")
+        if "GET" in methods and path and "{" not in path:
+            paths.append(path)
+    return paths
+
+
+async def _asgi_get(app, path: str) -> int:
+    """TestClient(httpx) 없이 ASGI 앱에 GET 요청 1건을 직접 전달."""
+    status = {}
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return status.get("code", 500)
+
+
+def _check_app(app_module: str, app_attr: str, project_dir: str) -> list:
+    target = f"{app_module}:{app_attr}"
+    try:
+        module = importlib.import_module(app_module)
+    except BaseException as e:
+        return [_entry("app", target, e, project_dir)]
+
+    app = getattr(module, app_attr, None)
+    if app is None or not callable(app):
+        return [{
+            "kind": "app", "target": target, "error": "AttributeError",
+            "message": f"'{app_attr}' ASGI 앱 객체를 찾을 수 없음",
+            "file": app_module.replace(".", "/") + ".py", "line": None, "missing_module": None,
+        }]
+
+    diagnostics = []
+    paths = _get_paths(app)
+    try:
+        from fastapi.testclient import TestClient
+    except Exception:
+        TestClient = None
+
+    if TestClient is not None:
+        try:
+            with TestClient(app, raise_server_exceptions=True) as client:
+                for path in paths:
+                    try:
+                        resp = client.get(path)
+                        if resp.status_code >= 500:
+                            diagnostics.append({
+                                "kind": "route", "target": f"GET {path}", "error": "HTTPError",
+                                "message": f"HTTP {resp.status_code}", "file": None, "line": None,
+                                "missing_module": None,
+                            })
+                    except BaseException as e:
+                        diagnostics.append(_entry("route", f"GET {path}", e, project_dir))
+            return diagnostics
+        except BaseException as e:
+            # lifespan(startup) 단계 실패
+            return [_entry("app", f"{target} (startup)", e, project_dir)]
+
+    for path in paths:
+        try:
+            code = asyncio.run(_asgi_get(app, path))
+            if code >= 500:
+                diagnostics.append({
+                    "kind": "route", "target": f"GET {path}", "error": "HTTPError",
+                    "message": f"HTTP {code}", "file": None, "line": None, "missing_module": None,
+                })
+        except BaseException as e:
+            diagnostics.append(_entry("route", f"GET {path}", e, project_dir))
+    return diagnostics
+
+
+def main() -> None:
+    _apply_limits()
+    sys.dont_write_bytecode = True
+    # 스크립트 디렉토리(agents/)가 생성 프로젝트의 모듈명(backend 등)을 가리지 않도록 제거
+    worker_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != worker_dir]
+    _warm_up()
+
+    line = sys.stdin.readline()
+    if not line.strip():
+        return
+    job = json.loads(line)
+    project_dir = os.path.abspath(job["project_dir"])
+    os.chdir(project_dir)
+    sys.path.insert(0, project_dir)
+
+    # 생성 코드의 print 출력이 결과 라인과 섞이지 않도록 stdout을 stderr로 돌림
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+
+    diagnostics = _import_modules(job.get("modules", []), project_dir)
+    if job.get("app_module"):
+        diagnostics.extend(_check_app(job["app_module"], job.get("app_attr", "app"), project_dir))
+
+    real_stdout.write(RESULT_MARKER + json.dumps(diagnostics, ensure_ascii=False) + "\n")
+    real_stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
+    # 생성 코드가 띄운 non-daemon 스레드 때문에 종료가 지연되지 않도록 즉시 종료
+    os._exit(0)
@@ -0,0 +1,137 @@
+"""프롬프트용 design_spec 압축 표기.
+
+frontend_agent는 json.dumps(design_spec, indent=2)를 그대로 프롬프트에 넣어, GAME 프로젝트의
+16×16 pixel_sprites 배열이 숫자 하나당 한 줄씩 찍혔습니다. encode_spec()은
+
+  - 공백 없는 JSON
+  - 스프라이트 행을 문자열로 (한 글자 = 팔레트 키 한 칸, 0-9 / a-z = 10-35)
+  - 도메인 섹션이 이미 전부 보여 주는 항목(팔레트, ui_components 등)은 자리 표시 문자열로 대체
+
+한 표기를 만듭니다. 키 순서를 유지하고, decode_spec()으로 디스크의 design_spec.json과 같은
+dict로 되돌릴 수 있을 때만 압축합니다 (되돌릴 수 없는 값이 있으면 해당 압축을 하지 않음).
+"""
+
+import json
+
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+_SPRITE_META = ("color_palette", "sprite_scale")
+SEE_DOMAIN = "(도메인 섹션 참고)"
+ROWS_HEADER = (
+    "(압축 표기: pixel_sprites의 각 스프라이트는 행 문자열 목록 — 한 글자가 팔레트 키 한 칸, a-z는 10-35. "
+    "코드에 넣을 때는 반드시 숫자 배열로 풀어 쓸 것: \"01a0\" → [0, 1, 10, 0])\n"
+)
+
+
+def _minify(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _encode_rows(sprite):
+    """2차원 정수 배열(0-35) → 행 문자열 목록. 표기할 수 없으면 None."""
+    if not isinstance(sprite, list):
+        return None
+    rows = []
+    for row in sprite:
+        if not isinstance(row, list):
+            return None
+        if not all(type(c) is int and 0 <= c < len(_DIGITS) for c in row):
+            return None
+        rows.append("".join(_DIGITS[c] for c in row))
+    return rows
+
+
+def _decode_rows(rows) -> list:
+    return [[_DIGITS.index(ch) for ch in row] for row in rows]
+
+
+def _get(spec: dict, path: tuple):
+    node = spec
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def _set(spec: dict, path: tuple, value) -> None:
+    node = spec
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+
+
+def _copy_path(spec: dict, path: tuple) -> dict:
+    """path를 따라 dict만 얕게 복사한 사본 (원본 spec은 그대로)."""
+    clone = dict(spec)
+    node = clone
+    for key in path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    return clone
+
+
+def _compress(spec: dict, omit, rows: bool) -> str:
+    encoded = spec
+    for path in omit:
+        value = _get(spec, path)
+        if value is None or len(_minify(value)) <= len(_minify(SEE_DOMAIN)):
+            continue
+        encoded = _copy_path(encoded, path)
+        _set(encoded, path, SEE_DOMAIN)
+
+    sprites = encoded.get("pixel_sprites")
+    if rows and isinstance(sprites, dict):
+        compact, packed_any = {}, False
+        for name, sprite in sprites.items():
+            packed = None if name in _SPRITE_META else _encode_rows(sprite)
+            compact[name] = sprite if packed is None else packed
+            packed_any = packed_any or packed is not None
+        if packed_any:
+            return ROWS_HEADER + _minify(dict(encoded, pixel_sprites=compact))
+    return _minify(encoded)
+
+
+def omitted_values(spec: dict, omit) -> dict:
+    """encode_spec(spec, omit)이 자리 표시로 바꾼 경로 → 원래 값 (decode_spec 복원용)."""
+    return {tuple(path): _get(spec, path) for path in omit if _get(spec, path) is not None}
+
+
+def decode_spec(text: str, omitted: dict = None) -> dict:
+    """encode_spec() 결과 → design_spec dict.
+
+    Args:
+        text: 압축 표기
+        omitted: {경로 튜플: 원래 값} — 도메인 섹션으로 대체한 항목을 되돌릴 때 (omitted_values 참고)
+    """
+    rows = text.startswith(ROWS_HEADER)
+    spec = json.loads(text[len(ROWS_HEADER):] if rows else text)
+    sprites = spec.get("pixel_sprites")
+    if rows and isinstance(sprites, dict):
+        for name, sprite in sprites.items():
+            if name not in _SPRITE_META and isinstance(sprite, list) and all(isinstance(r, str) for r in sprite):
+                sprites[name] = _decode_rows(sprite)
+    for path, value in (omitted or {}).items():
+        if _get(spec, path) == SEE_DOMAIN:
+            _set(spec, path, value)
+    return spec
+
+
+def encode_spec(spec: dict, omit=()) -> str:
+    """프롬프트에 넣을 design_spec 압축 표기.
+
+    Args:
+        spec: design_spec
+        omit: 도메인 섹션이 이미 보여 주는 항목의 경로 튜플 목록 (예: ("pixel_sprites", "color_palette"))
+    """
+    omit = [tuple(path) for path in omit]
+    expected = json.dumps(spec, ensure_ascii=False, indent=2)
+    restore = omitted_values(spec, omit)
+    for candidate_omit, rows in ((omit, True), (omit, False), ((), True), ((), False)):
+        text = _compress(spec, candidate_omit, rows)
+        try:
+            decoded = decode_spec(text, restore if candidate_omit else None)
+        except (ValueError, KeyError, TypeError):
+            continue
+        if json.dumps(decoded, ensure_ascii=False, indent=2) == expected:
+            return text
+    return _minify(spec)
@@ -0,0 +1,531 @@
+"""LLM 호출 없이 로컬에서 만드는 보일러플레이트 파일 템플릿.
+
+drawSprite 렌더러, 게임 루프, Vector2 유틸, 빈 __init__.py, CORS가 설정된 FastAPI main,
+Tailwind/Lucide를 불러오는 index.html 뼈대처럼 프로젝트마다 거의 같은 파일도 모델에게
+전체 코드를 받아 왔습니다. emit_templates()는 PM file_tree 항목을 템플릿에 대응시키고,
+디자인 스펙·계약·파일 구조만으로 코드를 만들어 돌려줍니다 (모델 호출 없음).
+
+템플릿을 쓰는 조건은 보수적입니다:
+  - 신규 파일만 (고도화 모드에서 이미 있는 파일은 호출측이 제외)
+  - 인터페이스 계약이 있으면, 계약에 나오는 클래스·함수·메서드가 모두 템플릿에 있고
+    인자 수도 맞아야 함 (하나라도 다르면 기존대로 모델이 생성)
+  - index.html / main.py는 파일 구조상 뼈대로 충분한 경우에만 (진입 모듈·라우터 모듈 확인)
+
+템플릿 파일은 다른 파일보다 먼저 codes에 들어가므로, 이후 모델 호출의 코드 컨텍스트에
+그대로 보입니다 (예: index.html의 #app / #gameCanvas, Vector2의 메서드 목록).
+
+CODEGEN_TEMPLATES=0 이면 템플릿을 쓰지 않습니다.
+"""
+
+import json
+import os
+import posixpath
+import re
+
+from manifest import is_backend, is_frontend
+
+_ENABLED = os.getenv("CODEGEN_TEMPLATES", "1") != "0"
+
+_CALL_RE = re.compile(r"\b([A-Za-z_$][\w$]*)\s*\(([^()]*)\)")
+_CLASS_RE = re.compile(r"\bclass\s+([A-Za-z_$][\w$]*)")
+_ROUTER_RE = re.compile(r"\brouter\b")
+_CONTRACT_KEYWORDS = {"function", "if", "for", "while", "return", "new", "Promise", "Array", "Record", "Map"}
+
+_SPRITE_NAME_RE = re.compile(r"^(pixel[_-]?)?(sprite|sprites)([_-]?(renderer|render|data))?\.js$|^pixel[_-]?renderer\.js$", re.IGNORECASE)
+_LOOP_NAME_RE = re.compile(r"^(game[_-]?)?loop\.js$", re.IGNORECASE)
+_VECTOR_NAMES = {"vector2.js", "vector.js", "vec2.js"}
+_ENTRY_NAMES = ("main.js", "app.js", "index.js", "game.js")
+_DB_NAMES = {"database.py", "db.py", "models.py"}
+_ROUTER_DIRS = ("routers", "routes", "api", "endpoints")
+# main.py 설명에 이런 단어가 있으면 뼈대만으로 부족하다고 보고 모델에게 맡김
+_MAIN_EXTRA_HINTS = ("static", "websocket", "startup", "lifespan", "database", "db", "정적", "스케줄", "웹소켓")
+
+
+# ── 계약 검사 ─────────────────────────────────────────────────────────────────
+
+def _arity(params: str) -> int:
+    """계약의 인자 목록 문자열 → 인자 수 ({...}·[...]·<...> 안의 쉼표는 무시)."""
+    if not params.strip():
+        return 0
+    depth, count = 0, 1
+    for ch in params:
+        if ch in "{[<":
+            depth += 1
+        elif ch in "}]>":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            count += 1
+    return count
+
+
+def contract_satisfied(contract, provides: dict) -> bool:
+    """계약에 나오는 클래스·함수가 모두 provides에 있고 인자 수가 맞는지.
+
+    Args:
+        contract: 인터페이스 계약 (문자열 또는 dict — 없으면 항상 True)
+        provides: {이름: (최소 인자 수, 최대 인자 수)} — 클래스 이름은 (0, 0)으로 표기
+    """
+    if not contract:
+        return True
+    text = contract if isinstance(contract, str) else json.dumps(contract, ensure_ascii=False)
+    for name in _CLASS_RE.findall(text):
+        if name not in provides:
+            return False
+    for name, params in _CALL_RE.findall(text):
+        if name in _CONTRACT_KEYWORDS:
+            continue
+        if name not in provides:
+            return False
+        low, high = provides[name]
+        if not low <= _arity(params) <= high:
+            return False
+    return True
+
+
+# ── 템플릿 본문 ───────────────────────────────────────────────────────────────
+
+_VECTOR2_PROVIDES = {
+    "Vector2": (0, 0), "constructor": (0, 2), "zero": (0, 0), "fromAngle": (1, 2),
+    "set": (2, 2), "clone": (0, 0), "add": (1, 1), "sub": (1, 1), "subtract": (1, 1),
+    "scale": (1, 1), "multiply": (1, 1), "divide": (1, 1), "dot": (1, 1), "cross": (1, 1),
+    "length": (0, 0), "lengthSq": (0, 0), "magnitude": (0, 0), "normalize": (0, 0),
+    "distance": (1, 1), "distanceTo": (1, 1), "angle": (0, 0), "rotate": (1, 1),
+    "lerp": (2, 2), "equals": (1, 2), "toString": (0, 0),
+}
+
+_VECTOR2_JS = """export class Vector2 {
+    constructor(x = 0, y = 0) {
+        this.x = x;
+        this.y = y;
+    }
+
+    static zero() {
+        return new Vector2(0, 0);
+    }
+
+    static fromAngle(angle, length = 1) {
+        return new Vector2(Math.cos(angle) * length, Math.sin(angle) * length);
+    }
+
+    set(x, y) {
+        this.x = x;
+        this.y = y;
+        return this;
+    }
+
+    clone() {
+        return new Vector2(this.x, this.y);
+    }
+
+    add(v) {
+        return new Vector2(this.x + v.x, this.y + v.y);
+    }
+
+    sub(v) {
+        return new Vector2(this.x - v.x, this.y - v.y);
+    }
+
+    subtract(v) {
+        return this.sub(v);
+    }
+
+    scale(s) {
+        return new Vector2(this.x * s, this.y * s);
+    }
+
+    multiply(s) {
+        return this.scale(s);
+    }
+
+    divide(s) {
+        return s === 0 ? new Vector2(0, 0) : new Vector2(this.x / s, this.y / s);
+    }
+
+    dot(v) {
+        return this.x * v.x + this.y * v.y;
+    }
+
+    cross(v) {
+        return this.x * v.y - this.y * v.x;
+    }
+
+    length() {
+        return Math.hypot(this.x, this.y);
+    }
+
+    lengthSq() {
+        return this.x * this.x + this.y * this.y;
+    }
+
+    magnitude() {
+        return this.length();
+    }
+
+    normalize() {
+        const len = this.length();
+        return len === 0 ? new Vector2(0, 0) : new Vector2(this.x / len, this.y / len);
+    }
+
+    distance(v) {
+        return Math.hypot(this.x - v.x, this.y - v.y);
+    }
+
+    distanceTo(v) {
+        return this.distance(v);
+    }
+
+    angle() {
+        return Math.atan2(this.y, this.x);
+    }
+
+    rotate(angle) {
+        const cos = Math.cos(angle);
+        const sin = Math.sin(angle);
+        return new Vector2(this.x * cos - this.y * sin, this.x * sin + this.y * cos);
+    }
+
+    lerp(v, t) {
+        return new Vector2(this.x + (v.x - this.x) * t, this.y + (v.y - this.y) * t);
+    }
+
+    equals(v, epsilon = 1e-9) {
+        return Math.abs(this.x - v.x) <= epsilon && Math.abs(this.y - v.y) <= epsilon;
+    }
+
+    toString() {
+        return `Vector2(${this.x}, ${this.y})`;
+    }
+}
+
+export default Vector2;
+"""
+
+_GAME_LOOP_PROVIDES = {
+    "GameLoop": (0, 0), "constructor": (2, 3), "start": (0, 0), "stop": (0, 0),
+    "isRunning": (0, 0), "tick": (1, 1), "update": (1, 1), "render": (0, 1),
+}
+
+_GAME_LOOP_JS = """export class GameLoop {
+    constructor(update, render, maxStep = 0.1) {
+        this.update = update;
+        this.render = render;
+        this.maxStep = maxStep;
+        this.running = false;
+        this.lastTime = 0;
+        this.frameId = null;
+        this.tick = this.tick.bind(this);
+    }
+
+    start() {
+        if (this.running) return;
+        this.running = true;
+        this.lastTime = performance.now();
+        this.frameId = requestAnimationFrame(this.tick);
+    }
+
+    stop() {
+        this.running = false;
+        if (this.frameId !== null) cancelAnimationFrame(this.frameId);
+        this.frameId = null;
+    }
+
+    isRunning() {
+        return this.running;
+    }
+
+    tick(timestamp) {
+        if (!this.running) return;
+        const dt = Math.min((timestamp - this.lastTime) / 1000, this.maxStep);
+        this.lastTime = timestamp;
+        this.update(dt);
+        this.render();
+        this.frameId = requestAnimationFrame(this.tick);
+    }
+}
+
+export default GameLoop;
+"""
+
+_SPRITE_PROVIDES = {
+    "drawSprite": (4, 6), "getSprite": (1, 1), "spriteSize": (1, 2),
+}
+
+_SPRITE_FUNCTIONS_JS = """
+export function getSprite(name) {
+    return SPRITES[name] || null;
+}
+
+export function drawSprite(ctx, sprite, x, y, palette = PALETTE, scale = SPRITE_SCALE) {
+    if (typeof sprite === 'string') sprite = SPRITES[sprite];
+    if (!sprite) return;
+    sprite.forEach((row, sy) => {
+        const cells = typeof row === 'string' ? Array.from(row, ch => parseInt(ch, 36)) : row;
+        cells.forEach((colorKey, sx) => {
+            const color = palette[String(colorKey)];
+            if (!color || color === 'transparent') return;
+            ctx.fillStyle = color;
+            ctx.fillRect(x + sx * scale, y + sy * scale, scale, scale);
+        });
+    });
+}
+
+export function spriteSize(sprite, scale = SPRITE_SCALE) {
+    if (typeof sprite === 'string') sprite = SPRITES[sprite];
+    if (!sprite || !sprite.length) return { width: 0, height: 0 };
+    return { width: sprite[0].length * scale, height: sprite.length * scale };
+}
+"""
+
+_FASTAPI_PROVIDES = {"health": (0, 0)}
+
+
+def _render_init(file_path: str, state: dict) -> str:
+    return ""
+
+
+def _render_vector2(file_path: str, state: dict) -> str:
+    return _VECTOR2_JS
+
+
+def _render_game_loop(file_path: str, state: dict) -> str:
+    return _GAME_LOOP_JS
+
+
+def _sprite_rows(sprite) -> list:
+    """스프라이트 데이터가 2차원 배열이면 그대로, 아니면 None."""
+    if not isinstance(sprite, list) or not sprite:
+        return None
+    if not all(isinstance(row, list) and all(isinstance(c, (int, str)) for c in row) for row in sprite):
+        return None
+    return sprite
+
+
+def _render_sprites(file_path: str, state: dict) -> str:
+    pixel_sprites = (state.get("design_spec") or {}).get("pixel_sprites") or {}
+    palette = pixel_sprites.get("color_palette") or {"0": "transparent", "1": "#4ade80"}
+    scale = pixel_sprites.get("sprite_scale", 8)
+    if not isinstance(scale, (int, float)) or scale <= 0:
+        scale = 8
+
+    entries = []
+    for name, sprite in pixel_sprites.items():
+        if name in ("color_palette", "sprite_scale"):
+            continue
+        rows = _sprite_rows(sprite)
+        if rows is None:
+            continue
+        body = ",\n".join(f"        {json.dumps(row)}" for row in rows)
+        entries.append(f"    {json.dumps(name)}: [\n{body}\n    ],")
+    sprites = "{\n" + "\n".join(entries) + "\n}" if entries else "{}"
+
+    return (
+        f"export const PALETTE = {json.dumps({str(k): v for k, v in palette.items()}, ensure_ascii=False)};\n"
+        f"export const SPRITE_SCALE = {json.dumps(scale)};\n"
+        f"export const SPRITES = {sprites};\n"
+        + _SPRITE_FUNCTIONS_JS
+    )
+
+
+def _html_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _entry_script(file_path: str, state: dict):
+    """index.html이 불러올 JS 진입 모듈 (main.js > app.js > index.js > game.js, 얕은 경로 우선)."""
+    scripts = [p for p in state.get("file_tree", {}) if p.endswith(".js") and is_frontend(p)]
+    for name in _ENTRY_NAMES:
+        candidates = sorted((p for p in scripts if posixpath.basename(p) == name), key=lambda p: (p.count("/"), p))
+        if candidates:
+            return candidates[0]
+    return None
+
+
+def _relative(target: str, from_file: str) -> str:
+    return posixpath.relpath(target, posixpath.dirname(from_file) or ".")
+
+
+def _render_index_html(file_path: str, state: dict) -> str:
+    design_spec = state.get("design_spec") or {}
+    theme = design_spec.get("theme") or {}
+    title = _html_escape(str(state.get("project_name") or "App"))
+    entry = _relative(_entry_script(file_path, state), file_path)
+    styles = "".join(
+        f'    <link rel="stylesheet" href="{_relative(p, file_path)}">\n'
+        for p in state.get("file_tree", {}) if p.endswith(".css") and is_frontend(p)
+    )
+
+    if state.get("project_domain", design_spec.get("project_domain")) == "GAME":
+        canvas = design_spec.get("canvas") or {}
+        width = canvas.get("width", 800) if isinstance(canvas.get("width"), int) else 800
+        height = canvas.get("height", 600) if isinstance(canvas.get("height"), int) else 600
+        background = theme.get("background", "#111827")
+        background = background if background.startswith("#") else "#111827"
+        return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        html, body {{ margin: 0; height: 100%; background: {background}; }}
+        body {{ display: flex; align-items: center; justify-content: center; }}
+        canvas {{ image-rendering: pixelated; max-width: 100%; max-height: 100%; }}
+    </style>
+{styles}</head>
+<body>
+    <canvas id="gameCanvas" width="{width}" height="{height}"></canvas>
+    <script type="module" src="{entry}"></script>
+</body>
+</html>
+"""
+
+    layout = design_spec.get("layout") or {}
+    body_class = f"bg-{theme.get('background', 'gray-50')} text-{theme.get('text_primary', 'gray-900')} min-h-screen"
+    app_class = f"{layout.get('max_width', 'max-w-7xl')} mx-auto p-4"
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <script src="https://unpkg.com/lucide@latest/dist/umd/lucide.min.js"></script>
+{styles}</head>
+<body class="{_html_escape(body_class)}">
+    <div id="app" class="{_html_escape(app_class)}"></div>
+    <script type="module" src="{entry}"></script>
+</body>
+</html>
+"""
+
+
+def _router_modules(file_path: str, state: dict) -> list:
+    """main.py가 include할 라우터 모듈 경로 목록 (없으면 빈 목록)."""
+    return sorted(
+        p for p in state.get("file_tree", {})
+        if p.endswith(".py") and is_backend(p) and posixpath.basename(p) != "__init__.py"
+        and any(part in _ROUTER_DIRS for part in p.split("/")[:-1])
+    )
+
+
+def _module_name(path: str) -> str:
+    return path[:-len(".py")].replace("/", ".")
+
+
+def _render_fastapi_main(file_path: str, state: dict) -> str:
+    routers = _router_modules(file_path, state)
+    aliases, imports = [], []
+    for path in routers:
+        alias = posixpath.basename(path)[:-len(".py")] + "_router"
+        if alias in aliases:
+            alias = _module_name(path).replace(".", "_") + "_router"
+        aliases.append(alias)
+        imports.append(f"from {_module_name(path)} import router as {alias}")
+    title = json.dumps(str(state.get("project_name") or "API"), ensure_ascii=False)
+    includes = "\n".join(f"app.include_router({alias})" for alias in aliases)
+    return f"""from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+{chr(10).join(imports)}
+
+app = FastAPI(title={title})
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=False,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+{includes}
+
+
+@app.get("/health")
+def health():
+    return {{"status": "ok"}}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
+"""
+
+
+# ── 매칭 ──────────────────────────────────────────────────────────────────────
+
+def _match_init(file_path: str, description: str, contract, state: dict) -> bool:
+    return (posixpath.basename(file_path) == "__init__.py" and not contract
+            and "import" not in (description or "").lower())
+
+
+def _match_vector2(file_path: str, description: str, contract, state: dict) -> bool:
+    return (posixpath.basename(file_path).lower() in _VECTOR_NAMES and is_frontend(file_path)
+            and contract_satisfied(contract, _VECTOR2_PROVIDES))
+
+
+def _match_game_loop(file_path: str, description: str, contract, state: dict) -> bool:
+    return (_LOOP_NAME_RE.match(posixpath.basename(file_path)) is not None and is_frontend(file_path)
+            and contract_satisfied(contract, _GAME_LOOP_PROVIDES))
+
+
+def _match_sprites(file_path: str, description: str, contract, state: dict) -> bool:
+    return (_SPRITE_NAME_RE.match(posixpath.basename(file_path)) is not None
+            and state.get("project_domain") == "GAME"
+            and contract_satisfied(contract, _SPRITE_PROVIDES))
+
+
+def _match_index_html(file_path: str, description: str, contract, state: dict) -> bool:
+    if posixpath.basename(file_path) != "index.html" or contract:
+        return False
+    html_files = [p for p in state.get("file_tree", {}) if p.endswith(".html")]
+    return html_files == [file_path] and _entry_script(file_path, state) is not None
+
+
+def _match_fastapi_main(file_path: str, description: str, contract, state: dict) -> bool:
+    if posixpath.basename(file_path) != "main.py" or not is_backend(file_path):
+        return False
+    if any(hint in (description or "").lower() for hint in _MAIN_EXTRA_HINTS):
+        return False
+    if not contract_satisfied(contract, _FASTAPI_PROVIDES):
+        return False
+    file_tree = state.get("file_tree", {})
+    if any(posixpath.basename(p) in _DB_NAMES for p in file_tree):
+        return False
+    routers = _router_modules(file_path, state)
+    contracts = state.get("interface_contracts") or {}
+    return bool(routers) and all(_ROUTER_RE.search(str(contracts.get(p, ""))) for p in routers)
+
+
+# (이름, 매칭 함수, 렌더링 함수) — 앞에서부터 처음 매칭되는 템플릿 사용
+_TEMPLATES = [
+    ("empty_init", _match_init, _render_init),
+    ("vector2", _match_vector2, _render_vector2),
+    ("game_loop", _match_game_loop, _render_game_loop),
+    ("pixel_sprites", _match_sprites, _render_sprites),
+    ("index_html", _match_index_html, _render_index_html),
+    ("fastapi_main", _match_fastapi_main, _render_fastapi_main),
+]
+
+
+def template_for(file_path: str, description: str, state: dict):
+    """file_path에 쓸 템플릿 이름 (없으면 None)."""
+    if not _ENABLED:
+        return None
+    contract = (state.get("interface_contracts") or {}).get(file_path, "")
+    for name, match, _ in _TEMPLATES:
+        if match(file_path, description, contract, state):
+            return name
+    return None
+
+
+def emit_templates(files: dict, state: dict) -> dict:
+    """{경로: 설명} 중 템플릿으로 만들 수 있는 파일 → {경로: (템플릿 이름, 코드)}."""
+    renderers = {name: render for name, _, render in _TEMPLATES}
+    emitted = {}
+    for file_path, description in files.items():
+        name = template_for(file_path, description, state)
+        if name is not None:
+            emitted[file_path] = (name, renderers[name](file_path, state))
+    return emitted
@@ -0,0 +1,142 @@
+"""프로세스 전역 내용 주소 기반 문자열 저장소와 copy-on-write 코드 뷰.
+
+생성 코드는 state["codes"], QC의 ProjectFS, 체크포인트 저장 단계마다 따로 해시되고
+사본이 만들어졌습니다. 이 모듈은 본문을 sha256 해시 기준으로 한 번만 보관하고,
+CodesView는 {경로: 해시} 참조만 들고 있는 {경로: 코드} 매핑으로 동작합니다.
+
+  - 같은 내용은 어디서 대입하든 하나의 문자열 객체를 공유합니다.
+  - CodesView.copy()는 참조 테이블까지 공유하고, 어느 한쪽이 처음 쓸 때 테이블만 복사합니다.
+  - 해시는 대입 시점에 한 번만 계산되며 ProjectFS·체크포인트는 digest()로 재사용합니다.
+
+어떤 뷰에서도 참조하지 않게 된 본문(덮어쓴 이전 버전)은 collect()로 정리합니다.
+저장소는 여러 프로젝트 실행이 스레드로 함께 쓰므로, 본문 등록과 뷰의 참조 변경, collect()는
+하나의 잠금 안에서 일어납니다 (collect가 등록 직후·참조 전의 본문을 지우지 않도록).
+"""
+
+import threading
+import weakref
+from collections.abc import MutableMapping
+
+import vfs
+
+_blobs: dict = {}                        # 해시 → 본문
+_views = weakref.WeakValueDictionary()   # id → 살아 있는 CodesView (collect 기준)
+_lock = threading.RLock()                # _blobs·_views·각 뷰의 _refs 변경 보호
+
+
+def intern(content: str, digest: str = None) -> str:
+    """본문을 저장소에 넣고 해시를 반환 (이미 있으면 기존 객체 유지)."""
+    digest = digest or vfs.content_hash(content)
+    with _lock:
+        _blobs.setdefault(digest, content)
+    return digest
+
+
+def get(digest: str) -> str:
+    return _blobs[digest]
+
+
+def collect() -> int:
+    """살아 있는 어떤 CodesView도 참조하지 않는 본문을 정리하고 정리한 개수를 반환."""
+    with _lock:
+        live = set()
+        for view in list(_views.values()):
+            live.update(view._refs.values())
+        dead = [digest for digest in _blobs if digest not in live]
+        for digest in dead:
+            del _blobs[digest]
+    return len(dead)
+
+
+def stats() -> tuple:
+    """(보관 중인 본문 수, 총 글자 수)."""
+    with _lock:
+        return len(_blobs), sum(len(content) for content in _blobs.values())
+
+
+class CodesView(MutableMapping):
+    """저장소 본문을 해시로 참조하는 {경로: 코드} 매핑 (copy-on-write).
+
+    Args:
+        codes: 초기 내용. CodesView면 참조 테이블을 공유합니다.
+    """
+
+    def __init__(self, codes=None):
+        self._refs: dict = {}
+        self._shared = False
+        if isinstance(codes, CodesView):
+            with _lock:
+                self._refs = codes._refs
+                self._shared = codes._shared = True
+                _views[id(self)] = self
+            return
+        items = [(path, content, vfs.content_hash(content)) for path, content in (codes or {}).items()]
+        with _lock:
+            for path, content, digest in items:
+                self._refs[path] = intern(content, digest)
+            _views[id(self)] = self
+
+    @classmethod
+    def from_digests(cls, digests: dict, load) -> "CodesView":
+        """{경로: 해시}로 뷰를 구성. 저장소에 없는 본문만 load(해시)로 읽어 옵니다."""
+        view = cls()
+        for path, digest in digests.items():
+            content = None if digest in _blobs else load(digest)
+            with _lock:
+                if digest not in _blobs:
+                    # 확인 뒤 collect로 지워졌으면 다시 읽음
+                    intern(content if content is not None else load(digest), digest)
+                view._refs[path] = digest
+        return view
+
+    def _own(self) -> None:
+        if self._shared:
+            self._refs = dict(self._refs)
+            self._shared = False
+
+    # ── Mapping 인터페이스 ─────────────────────────────────────────────────
+
+    def __getitem__(self, path: str) -> str:
+        return _blobs[self._refs[path]]
+
+    def __setitem__(self, path: str, content: str) -> None:
+        digest = vfs.content_hash(content)
+        with _lock:
+            intern(content, digest)
+            if self._refs.get(path) == digest:
+                return
+            self._own()
+            self._refs[path] = digest
+
+    def __delitem__(self, path: str) -> None:
+        with _lock:
+            if path not in self._refs:
+                raise KeyError(path)
+            self._own()
+            del self._refs[path]
+
+    def __contains__(self, path) -> bool:
+        return path in self._refs
+
+    def __iter__(self):
+        return iter(self._refs)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __repr__(self) -> str:
+        return f"CodesView({len(self._refs)} files)"
+
+    # ── 해시 참조 ─────────────────────────────────────────────────────────
+
+    def digest(self, path: str) -> str:
+        return self._refs[path]
+
+    def digests(self) -> dict:
+        """{경로: 해시} 사본."""
+        with _lock:
+            return dict(self._refs)
+
+    def copy(self) -> "CodesView":
+        """본문·참조 테이블을 복사하지 않는 사본 (처음 쓰는 쪽이 테이블을 복사)."""
+        return CodesView(self)
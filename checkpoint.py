@@ -5,17 +5,58 @@
 
 디렉토리 구조:
   .agent_logs/
-    active/      ← 진행 중인 작업 상태
-    completed/   ← 정상 종료된 작업 아카이브
+    active/      ← 진행 중인 작업 상태 (스칼라 상태 + 파일 해시 참조만 보관)
+    completed/   ← 정상 종료된 작업 아카이브 (압축, 보관 정책에 따라 정리)
+    blobs/       ← 내용 주소 기반(sha256) 파일 본문 저장소 — 같은 내용은 한 번만, 압축해서 기록
+
+체크포인트 I/O는 해당 단계에서 바뀐 파일 수에 비례합니다. 이미 기록된 본문은 다시 쓰지 않고,
+직전 체크포인트와 내용이 같으면 체크포인트 파일 자체도 다시 쓰지 않습니다.
+
+CHECKPOINT_BACKEND=sqlite 이면 같은 API 뒤에서 checkpoint_sqlite(WAL 모드 DB)를 사용합니다.
+이때 체크포인트 식별자는 파일 경로 대신 "sqlite:<run_id>" 형태이며, 실행마다 run_id가
+발급되므로 동시 빌드나 같은 project_name을 가진 서로 다른 실행도 충돌하지 않습니다.
+
+체크포인트 파일 형식 (format 3):
+  1번째 줄  헤더 JSON — 목록 표시용 메타데이터 (project_name, phase, timestamp, 완료 파일 수)
+  2번째 줄  상태 JSON — blob 참조로 치환된 AgentState
+목록 조회는 각 파일의 첫 줄만 읽고, 전체 상태는 재개할 실행 하나에 대해서만 load_checkpoint로 읽습니다.
+JSON은 공백 없이 직렬화하며(codec), 헤더를 바로 읽어야 하는 active 체크포인트만 무압축으로 둡니다.
+
+보관 정책 (아카이브 시 적용):
+  CHECKPOINT_KEEP_COMPLETED  프로젝트별로 남길 completed 아카이브 수 (기본 10, 0 = 무제한)
+  CHECKPOINT_RETENTION_DAYS  completed 아카이브 보관 기간(일) (기본 30, 0 = 무제한, 최신 1개는 항상 유지)
+정책에 따라 아카이브를 지운 뒤, 남은 체크포인트 어디에서도 참조하지 않는 blob을 정리(compaction)합니다.
 """
 
 import json
 import os
-import shutil
-from datetime import datetime
+import re
+import signal
+import time
+from datetime import datetime, timedelta
+
+import checkpoint_sqlite
+import codec
+from blob_store import CodesView
+from vfs import atomic_write, content_hash
 
 _ACTIVE_DIR = ".agent_logs/active"
 _COMPLETED_DIR = ".agent_logs/completed"
+_BLOB_DIR = ".agent_logs/blobs"
+
+CHECKPOINT_FORMAT = 3
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "file")   # "file" | "sqlite"
+_SQLITE_PREFIX = "sqlite:"
+
+_KEEP_COMPLETED = int(os.getenv("CHECKPOINT_KEEP_COMPLETED", "10"))
+_RETENTION_DAYS = float(os.getenv("CHECKPOINT_RETENTION_DAYS", "30"))
+_BLOB_GRACE_SEC = 3600   # 아직 체크포인트에 기록되기 전일 수 있는 최근 blob은 compaction에서 제외
+_ARCHIVE_RE = re.compile(r"^(?P<name>.+)_(?P<ts>\d{8}_\d{6})\.json(\.zst|\.gz)?$")
+
+_known_blobs: dict = {}       # 이번 프로세스에서 존재를 확인한 blob 해시 → 마지막 확인(mtime 갱신) 시각
+_BLOB_REFRESH_SEC = _BLOB_GRACE_SEC / 2   # 이보다 오래 전에 확인한 blob은 다시 확인하고 mtime 갱신
+_last_digest: dict = {}       # 체크포인트 식별자 → 마지막으로 기록한 (phase, state) 다이제스트
+_live: dict = {}              # 체크포인트 식별자 → (state, 마지막 완료 phase) — 파일 단위 저장·SIGINT flush용
 
 # 단계별 레이블 (화면 표시용)
 PHASE_LABELS = {
@@ -27,36 +68,248 @@ PHASE_LABELS = {
 }
 
 
+# ── 내용 주소 기반 blob 저장소 ────────────────────────────────────────────────
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(_BLOB_DIR, digest[:2], digest)
+
+
+def put_blob(content: str, digest: str = None) -> str:
+    """본문을 blob 저장소에 압축해 넣고 sha256 해시를 반환 (이미 있으면 쓰지 않음).
+
+    digest를 알고 있으면(CodesView) 해시를 다시 계산하지 않습니다.
+    이미 있는 blob은 mtime을 갱신해, 다른 프로세스의 compaction이 유예 시간(_BLOB_GRACE_SEC) 안에
+    이 blob을 지우지 못하게 합니다. _BLOB_REFRESH_SEC 안에 확인한 blob만 확인을 생략합니다.
+    """
+    digest = digest or content_hash(content)
+    now = time.time()
+    if now - _known_blobs.get(digest, float("-inf")) < _BLOB_REFRESH_SEC:
+        return digest
+    path = _blob_path(digest)
+    existing = codec.find_compressed(path)
+    try:
+        if existing is not None:
+            os.utime(existing)
+    except FileNotFoundError:
+        existing = None   # 확인 직후 compaction으로 삭제됨
+    if existing is None:
+        codec.write_compressed(path, content)
+    _known_blobs[digest] = now
+    return digest
+
+
+def get_blob(digest: str) -> str:
+    path = codec.find_compressed(_blob_path(digest))
+    if path is None:
+        raise FileNotFoundError(f"blob {digest} 없음")
+    return codec.read_compressed(path).decode("utf-8")
+
+
+# 대용량 필드는 blob 참조로 치환해 저장
+#   codes        {경로: 코드}  → {경로: 해시}  (CodesView면 보관 중인 해시를 그대로 사용)
+#   design_spec  dict          → 해시 (JSON 직렬화 본문)
+#   prd          str           → 해시
+def _dehydrate(state: dict, put=put_blob) -> dict:
+    stored = dict(state)
+    codes = state.get("codes", {})
+    if isinstance(codes, CodesView):
+        stored["codes"] = {path: put(codes[path], digest) for path, digest in codes.digests().items()}
+    else:
+        stored["codes"] = {path: put(code) for path, code in codes.items()}
+    stored["design_spec"] = put(codec.dumps(state.get("design_spec", {}), sort_keys=True))
+    stored["prd"] = put(state.get("prd", "") or "")
+    return stored
+
+
+def _hydrate(stored: dict, get=get_blob) -> dict:
+    state = dict(stored)
+    state["codes"] = CodesView.from_digests(stored.get("codes", {}), get)
+    state["design_spec"] = codec.loads(get(stored["design_spec"]))
+    state["prd"] = get(stored["prd"])
+    return state
+
+
+def _blob_refs(stored: dict) -> set:
+    """_dehydrate된 상태가 참조하는 blob 해시 집합."""
+    refs = set(stored.get("codes", {}).values())
+    for key in ("design_spec", "prd"):
+        if isinstance(stored.get(key), str):
+            refs.add(stored[key])
+    return refs
+
+
+def _read_header(file_path: str) -> dict:
+    """체크포인트의 헤더(첫 줄)만 읽어 목록용 메타데이터 반환."""
+    with open(file_path, encoding="utf-8") as f:
+        first_line = f.readline()
+    try:
+        header = codec.loads(first_line)
+    except json.JSONDecodeError:
+        header = None
+
+    if header is None or header.get("format") != CHECKPOINT_FORMAT:
+        # 구버전(헤더 없는 단일 JSON) 체크포인트 → 전체를 읽어 헤더 구성
+        data = _read_checkpoint_file(file_path)
+        state = data["state"]
+        return {
+            "project_name": state.get("project_name", "unknown"),
+            "phase_completed": data.get("phase_completed", "unknown"),
+            "timestamp": data.get("timestamp", ""),
+            "done_count": len(state.get("done_files", [])),
+        }
+    return header
+
+
+def _parse_checkpoint(raw: bytes) -> dict:
+    """체크포인트 원문 → {"phase_completed", "timestamp", "state"} (state는 blob 참조 상태 그대로).
+
+    format 키가 없으면 구버전(전체 상태 직렬화) 체크포인트이며, 이때 state에는 본문이 들어 있습니다.
+    """
+    first_line, _, rest = raw.partition(b"\n")
+    try:
+        header = codec.loads(first_line)
+    except json.JSONDecodeError:
+        header = None
+    if header is not None and header.get("format") == CHECKPOINT_FORMAT:
+        header["state"] = codec.loads(rest.partition(b"\n")[0])
+        return header
+    return codec.loads(raw)
+
+
+def _read_checkpoint_file(file_path: str) -> dict:
+    """체크포인트 파일 전체를 읽어 blob 참조를 풀어낸 {"phase_completed", "timestamp", "state"} 반환."""
+    data = _parse_checkpoint(codec.read_compressed(file_path))
+    if data.get("format") in (2, CHECKPOINT_FORMAT):
+        data["state"] = _hydrate(data["state"])
+    return data
+
+
+def _checkpoint_id(state: dict) -> str:
+    """state가 기록될 체크포인트 식별자 (파일 경로 또는 sqlite:<run_id>)."""
+    if CHECKPOINT_BACKEND == "sqlite":
+        return _SQLITE_PREFIX + (state.get("run_id") or "")
+    project_name = state.get("project_name") or "unknown"
+    return os.path.join(_ACTIVE_DIR, f"{project_name}.json")
+
+
+def _save_sqlite(state: dict, phase: str) -> str:
+    if not state.get("run_id"):
+        state["run_id"] = checkpoint_sqlite.new_run_id()
+    checkpoint_id = _checkpoint_id(state)
+
+    new_blobs: dict = {}
+    now = time.time()
+
+    def put(content: str, digest: str = None) -> str:
+        # 파일 저장소의 put_blob과 같은 규칙: 최근 확인한 blob만 생략, 나머지는 touched_at 갱신(없으면 기록)
+        digest = digest or content_hash(content)
+        if now - _known_blobs.get(digest, float("-inf")) >= _BLOB_REFRESH_SEC:
+            new_blobs[digest] = content
+        return digest
+
+    stored_state = _dehydrate(state, put)
+    state_json = codec.dumps(stored_state, sort_keys=True)
+    digest = content_hash(phase + state_json)
+    if _last_digest.get(checkpoint_id) == digest:
+        return checkpoint_id
+
+    checkpoint_sqlite.save(
+        state["run_id"], state.get("project_name") or "unknown", phase,
+        len(state.get("done_files", [])), state_json, new_blobs,
+    )
+    _known_blobs.update(dict.fromkeys(new_blobs, now))
+    _last_digest[checkpoint_id] = digest
+    _live[checkpoint_id] = (state, phase)
+    return checkpoint_id
+
+
 def save_checkpoint(state: dict, phase: str) -> str:
-    """현재 AgentState를 active 디렉토리에 JSON으로 저장.
+    """현재 AgentState를 active 디렉토리(또는 SQLite 저장소)에 저장.
 
-    같은 project_name이면 파일을 덮어씁니다 (항상 최신 상태 유지).
+    파일 본문·디자인 스펙·PRD는 blob 저장소에 한 번만 기록되고, 체크포인트에는
+    해시와 작은 스칼라 상태만 남습니다. 같은 project_name이면 파일을 덮어쓰며
+    (항상 최신 상태 유지), 직전 저장과 내용이 같으면 쓰기를 건너뜁니다.
     Returns:
-        저장된 체크포인트 파일 경로
+        저장된 체크포인트 식별자 (파일 경로 또는 sqlite:<run_id>)
     """
+    if CHECKPOINT_BACKEND == "sqlite":
+        return _save_sqlite(state, phase)
+
     os.makedirs(_ACTIVE_DIR, exist_ok=True)
 
     project_name = state.get("project_name") or "unknown"
     file_path = os.path.join(_ACTIVE_DIR, f"{project_name}.json")
 
-    checkpoint_data = {
-        "timestamp": datetime.now().isoformat(),
+    stored_state = _dehydrate(state)
+    state_json = codec.dumps(stored_state, sort_keys=True)
+    digest = content_hash(phase + state_json)
+    if _last_digest.get(file_path) == digest and os.path.exists(file_path):
+        return file_path
+
+    header = {
+        "format": CHECKPOINT_FORMAT,
+        "project_name": project_name,
         "phase_completed": phase,
-        "state": state,
+        "timestamp": datetime.now().isoformat(),
+        "done_count": len(state.get("done_files", [])),
     }
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(checkpoint_data, f, ensure_ascii=False, indent=2)
+    atomic_write(file_path, codec.dumps(header) + "\n" + state_json + "\n")
+    _last_digest[file_path] = digest
+    _live[file_path] = (state, phase)
 
     return file_path
 
 
+def record_file_done(state: dict, file_path: str) -> None:
+    """에이전트가 파일 하나를 완성할 때마다 호출 — 완료 목록에 추가하고 즉시 체크포인트.
+
+    phase는 마지막으로 완료된 단계 그대로 유지되며, 재개 시 에이전트는 done_files에 있는
+    파일을 건너뛰고 나머지만 생성합니다. 이 프로세스에서 체크포인트가 시작되지 않은
+    실행(고도화 모드 등)에서는 완료 목록만 갱신하고 디스크에는 쓰지 않습니다.
+    """
+    done_files = state.setdefault("done_files", [])
+    if file_path not in done_files:
+        done_files.append(file_path)
+
+    live = _live.get(_checkpoint_id(state))
+    if live is not None:
+        save_checkpoint(state, live[1])
+
+
+def _flush_live_checkpoints() -> None:
+    for state, phase in list(_live.values()):
+        try:
+            save_checkpoint(state, phase)
+        except Exception as e:
+            print(f"  ⚠️  체크포인트 flush 실패: {e}")
+
+
+def install_interrupt_handler() -> None:
+    """Ctrl+C(SIGINT) 시 진행 중인 체크포인트를 flush한 뒤 KeyboardInterrupt를 발생."""
+
+    def _handler(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        if _live:
+            print("\n  💾 중단 감지 — 완료된 파일까지 체크포인트 저장 중...")
+            _flush_live_checkpoints()
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGINT, _handler)
+
+
 def list_active_checkpoints() -> list[dict]:
-    """active 디렉토리의 체크포인트 목록을 최신 순으로 반환.
+    """active 디렉토리의 체크포인트 목록을 최신 순으로 반환 (헤더만 읽음).
 
+    전체 상태가 필요하면 load_checkpoint(file_path)를 사용하세요.
     Returns:
-        [{"file_path", "project_name", "phase_completed", "timestamp", "state"}, ...]
+        [{"file_path", "project_name", "phase_completed", "timestamp", "done_count"}, ...]
     """
+    if CHECKPOINT_BACKEND == "sqlite":
+        return [
+            {"file_path": _SQLITE_PREFIX + row.pop("run_id"), **row}
+            for row in checkpoint_sqlite.list_active()
+        ]
+
     if not os.path.isdir(_ACTIVE_DIR):
         return []
 
@@ -66,38 +319,162 @@ def list_active_checkpoints() -> list[dict]:
             continue
         fpath = os.path.join(_ACTIVE_DIR, fname)
         try:
-            with open(fpath, encoding="utf-8") as f:
-                data = json.load(f)
+            header = _read_header(fpath)
             checkpoints.append({
                 "file_path": fpath,
-                "project_name": data["state"].get("project_name", "unknown"),
-                "phase_completed": data.get("phase_completed", "unknown"),
-                "timestamp": data.get("timestamp", ""),
-                "state": data["state"],
+                "project_name": header.get("project_name", "unknown"),
+                "phase_completed": header.get("phase_completed", "unknown"),
+                "timestamp": header.get("timestamp", ""),
+                "done_count": header.get("done_count", 0),
             })
-        except (json.JSONDecodeError, KeyError):
-            pass
+        except (json.JSONDecodeError, KeyError, OSError):
+            pass  # 손상된 체크포인트는 건너뜀
 
     return sorted(checkpoints, key=lambda x: x["timestamp"], reverse=True)
 
 
+def load_checkpoint(file_path: str) -> dict:
+    """재개할 체크포인트 하나의 전체 상태를 로드.
+
+    Returns:
+        {"file_path", "project_name", "phase_completed", "timestamp", "state"}
+    """
+    if file_path.startswith(_SQLITE_PREFIX):
+        phase, timestamp, state_json = checkpoint_sqlite.load(file_path[len(_SQLITE_PREFIX):])
+        data = {
+            "phase_completed": phase,
+            "timestamp": timestamp,
+            "state": _hydrate(codec.loads(state_json), checkpoint_sqlite.get_blob),
+        }
+    else:
+        data = _read_checkpoint_file(file_path)
+    return {
+        "file_path": file_path,
+        "project_name": data["state"].get("project_name", "unknown"),
+        "phase_completed": data.get("phase_completed", "unknown"),
+        "timestamp": data.get("timestamp", ""),
+        "state": data["state"],
+    }
+
+
+def _forget(file_path: str) -> None:
+    """아카이브·삭제된 체크포인트를 프로세스 내 추적 목록에서 제거."""
+    _last_digest.pop(file_path, None)
+    _live.pop(file_path, None)
+
+
+# ── 보관 정책 / compaction ───────────────────────────────────────────────────
+
+def _prune_completed() -> list:
+    """보관 정책(프로젝트별 개수·기간)을 넘은 completed 아카이브를 삭제하고 삭제 경로 목록을 반환."""
+    if not os.path.isdir(_COMPLETED_DIR):
+        return []
+
+    by_project: dict = {}
+    for fname in os.listdir(_COMPLETED_DIR):
+        m = _ARCHIVE_RE.match(fname)
+        if m:
+            by_project.setdefault(m.group("name"), []).append((m.group("ts"), fname))
+
+    cutoff = ""
+    if _RETENTION_DAYS > 0:
+        cutoff = (datetime.now() - timedelta(days=_RETENTION_DAYS)).strftime("%Y%m%d_%H%M%S")
+
+    removed = []
+    for archives in by_project.values():
+        archives.sort(reverse=True)
+        for i, (ts, fname) in enumerate(archives):
+            if (_KEEP_COMPLETED and i >= _KEEP_COMPLETED) or (i > 0 and ts < cutoff):
+                path = os.path.join(_COMPLETED_DIR, fname)
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+
+def _compact_blobs() -> int:
+    """active·completed 체크포인트 어디에서도 참조하지 않는 blob을 삭제하고 삭제 개수를 반환."""
+    if not os.path.isdir(_BLOB_DIR):
+        return 0
+
+    referenced: set = set()
+    for directory, pattern in ((_ACTIVE_DIR, None), (_COMPLETED_DIR, _ARCHIVE_RE)):
+        if not os.path.isdir(directory):
+            continue
+        for fname in os.listdir(directory):
+            if not (pattern.match(fname) if pattern else fname.endswith(".json")):
+                continue
+            try:
+                data = _parse_checkpoint(codec.read_compressed(os.path.join(directory, fname)))
+            except FileNotFoundError:
+                continue  # 다른 프로세스가 방금 옮기거나 지운 파일
+            except Exception:
+                return 0  # 참조 관계를 확실히 알 수 없으면 아무것도 지우지 않음
+            if data.get("format") in (2, CHECKPOINT_FORMAT):
+                referenced |= _blob_refs(data["state"])
+
+    cutoff = time.time() - _BLOB_GRACE_SEC
+    removed = 0
+    for root, _, files in os.walk(_BLOB_DIR):
+        for fname in files:
+            digest = fname.split(".")[0]
+            if not digest or digest in referenced or digest in _known_blobs:
+                continue  # 빈 digest = 작성 중인 임시 파일(.tmp_*), _known_blobs = 이 프로세스의 실행이 쓰는 blob
+            path = os.path.join(root, fname)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+    return removed
+
+
+def _apply_retention() -> None:
+    if CHECKPOINT_BACKEND == "sqlite":
+        cutoff = ""
+        if _RETENTION_DAYS > 0:
+            cutoff = (datetime.now() - timedelta(days=_RETENTION_DAYS)).isoformat()
+        removed_runs = checkpoint_sqlite.prune_completed(_KEEP_COMPLETED, cutoff, _BLOB_GRACE_SEC)
+        if removed_runs:
+            print(f"  🧹 오래된 체크포인트 정리: 실행 {removed_runs}개")
+        return
+
+    removed = _prune_completed()
+    removed_blobs = _compact_blobs()
+    if removed or removed_blobs:
+        print(f"  🧹 오래된 체크포인트 정리: 아카이브 {len(removed)}개, blob {removed_blobs}개")
+
+
 def archive_checkpoint(file_path: str) -> None:
-    """정상 종료 시 active 체크포인트를 completed 디렉토리로 이동."""
-    if not file_path or not os.path.exists(file_path):
+    """정상 종료 시 active 체크포인트를 completed 디렉토리로 압축 이동하고 보관 정책을 적용."""
+    if file_path and file_path.startswith(_SQLITE_PREFIX):
+        if checkpoint_sqlite.set_status(file_path[len(_SQLITE_PREFIX):], "completed"):
+            print(f"  📦 체크포인트 아카이브: {file_path}")
+        _forget(file_path)
+        _apply_retention()
         return
 
-    os.makedirs(_COMPLETED_DIR, exist_ok=True)
+    if not file_path or not os.path.exists(file_path):
+        return
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     basename = os.path.basename(file_path)
     name, ext = os.path.splitext(basename)
-    dest = os.path.join(_COMPLETED_DIR, f"{name}_{ts}{ext}")
+    with open(file_path, "rb") as f:
+        raw = f.read()
+    dest = codec.write_compressed(os.path.join(_COMPLETED_DIR, f"{name}_{ts}{ext}"), raw)
 
-    shutil.move(file_path, dest)
+    os.remove(file_path)
+    _forget(file_path)
     print(f"  📦 체크포인트 아카이브: {dest}")
+    _apply_retention()
 
 
 def delete_checkpoint(file_path: str) -> None:
     """active 체크포인트 삭제 (재시도 포기 시 사용)."""
-    if file_path and os.path.exists(file_path):
+    if file_path and file_path.startswith(_SQLITE_PREFIX):
+        checkpoint_sqlite.delete(file_path[len(_SQLITE_PREFIX):])
+    elif file_path and os.path.exists(file_path):
         os.remove(file_path)
+    _forget(file_path)
@@ -0,0 +1,213 @@
+"""SQLite(WAL) 기반 체크포인트·실행 이력 저장소.
+
+checkpoint.py의 파일 기반 저장소는 project_name으로 파일을 덮어쓰므로, 여러 프로세스가
+동시에 빌드하거나 서로 다른 아이디어가 같은 project_name을 만들면 충돌합니다.
+이 모듈은 같은 API 뒤에서 쓰이는 선택적 저장소로, 실행마다 run_id를 발급하고
+단계별 행(phases)과 blob 참조를 하나의 WAL 모드 DB에 트랜잭션 단위로 기록합니다.
+
+사용: 환경 변수 CHECKPOINT_BACKEND=sqlite  (DB 경로: CHECKPOINT_DB, 기본 .agent_logs/checkpoints.db)
+
+스키마:
+  runs    (run_id PK, project_name, status, phase_completed, done_count, created_at, updated_at)
+  phases  (run_id, seq, phase, timestamp, state_json)  — 단계당 최신 행 하나, seq가 가장 큰 행이 최신 상태
+  blobs   (hash PK, content, touched_at)              — 내용 주소 기반 파일 본문, touched_at은 마지막 기록·확인 시각(epoch)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+DB_PATH = os.getenv("CHECKPOINT_DB", ".agent_logs/checkpoints.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          TEXT PRIMARY KEY,
+    project_name    TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'active',
+    phase_completed TEXT NOT NULL,
+    done_count      INTEGER NOT NULL DEFAULT 0,
+    created_at      TEXT NOT NULL,
+    updated_at      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_status_updated ON runs (status, updated_at);
+CREATE TABLE IF NOT EXISTS phases (
+    run_id      TEXT NOT NULL REFERENCES runs (run_id),
+    seq         INTEGER NOT NULL,
+    phase       TEXT NOT NULL,
+    timestamp   TEXT NOT NULL,
+    state_json  TEXT NOT NULL,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash        TEXT PRIMARY KEY,
+    content     TEXT NOT NULL,
+    touched_at  REAL NOT NULL DEFAULT 0
+);
+"""
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """스레드별 연결 (WAL 모드, 잠금 대기 30초)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        parent = os.path.dirname(DB_PATH)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(blobs)")}
+        if "touched_at" not in columns:   # touched_at 이전 DB
+            conn.execute("ALTER TABLE blobs ADD COLUMN touched_at REAL NOT NULL DEFAULT 0")
+        _local.conn = conn
+    return conn
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def get_blob(digest: str) -> str:
+    row = _connect().execute("SELECT content FROM blobs WHERE hash = ?", (digest,)).fetchone()
+    if row is None:
+        raise KeyError(f"blob {digest} 없음")
+    return row[0]
+
+
+def save(run_id: str, project_name: str, phase: str, done_count: int, state_json: str, new_blobs: dict) -> str:
+    """새 blob 기록 + 단계 행 교체 + runs 헤더 갱신을 단일 트랜잭션으로 수행. 타임스탬프를 반환.
+
+    같은 (run_id, phase)의 이전 행은 지우고 새 seq로 다시 씁니다. 파일 하나 끝날 때마다
+    저장해도 실행당 행 수는 단계 수를 넘지 않습니다. new_blobs 중 이미 있는 blob은 본문을
+    다시 쓰지 않고 touched_at만 갱신하므로, 유예 시간 안에는 prune_completed가 지우지 않습니다.
+    """
+    now = datetime.now().isoformat()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        touched = time.time()
+        conn.executemany(
+            "INSERT INTO blobs (hash, content, touched_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (hash) DO UPDATE SET touched_at = excluded.touched_at",
+            [(digest, content, touched) for digest, content in new_blobs.items()],
+        )
+        conn.execute(
+            "INSERT INTO runs (run_id, project_name, phase_completed, done_count, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (run_id) DO UPDATE SET phase_completed = excluded.phase_completed, "
+            "done_count = excluded.done_count, updated_at = excluded.updated_at, status = 'active'",
+            (run_id, project_name, phase, done_count, now, now),
+        )
+        seq = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) + 1 FROM phases WHERE run_id = ?", (run_id,)
+        ).fetchone()[0]
+        conn.execute("DELETE FROM phases WHERE run_id = ? AND phase = ?", (run_id, phase))
+        conn.execute(
+            "INSERT INTO phases (run_id, seq, phase, timestamp, state_json) VALUES (?, ?, ?, ?, ?)",
+            (run_id, seq, phase, now, state_json),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return now
+
+
+def list_active() -> list:
+    """진행 중인 실행 헤더 목록 (최신 순, 인덱스 조회)."""
+    rows = _connect().execute(
+        "SELECT run_id, project_name, phase_completed, updated_at, done_count FROM runs "
+        "WHERE status = 'active' ORDER BY updated_at DESC"
+    ).fetchall()
+    return [
+        {"run_id": r[0], "project_name": r[1], "phase_completed": r[2], "timestamp": r[3], "done_count": r[4]}
+        for r in rows
+    ]
+
+
+def load(run_id: str) -> tuple:
+    """최신 단계 행 → (phase, timestamp, state_json)."""
+    row = _connect().execute(
+        "SELECT phase, timestamp, state_json FROM phases WHERE run_id = ? ORDER BY seq DESC LIMIT 1",
+        (run_id,),
+    ).fetchone()
+    if row is None:
+        raise KeyError(f"run {run_id} 없음")
+    return row
+
+
+def set_status(run_id: str, status: str) -> bool:
+    """실행 상태 변경 (정상 종료 시 'completed'로 아카이브). 대상이 있었으면 True."""
+    cur = _connect().execute(
+        "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ? AND status = 'active'",
+        (status, datetime.now().isoformat(), run_id),
+    )
+    return cur.rowcount > 0
+
+
+def delete(run_id: str) -> None:
+    """실행과 단계 이력 삭제 (blob은 다른 실행과 공유될 수 있으므로 유지)."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM phases WHERE run_id = ?", (run_id,))
+        conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# state_json 안의 blob 참조 위치 (checkpoint._dehydrate 형식: codes 값, design_spec, prd)
+_REFERENCED_BLOBS = """
+SELECT j.value FROM phases, json_each(phases.state_json, '$.codes') AS j
+UNION SELECT json_extract(state_json, '$.design_spec') FROM phases
+UNION SELECT json_extract(state_json, '$.prd') FROM phases
+"""
+
+
+def prune_completed(keep: int, cutoff: str, blob_grace_sec: float = 0) -> int:
+    """보관 정책을 넘은 completed 실행과, 남은 단계 행 어디에서도 참조하지 않는 blob을 삭제.
+
+    Args:
+        keep: 프로젝트별로 남길 completed 실행 수 (0 = 무제한)
+        cutoff: 이 ISO 시각보다 오래된 completed 실행 삭제 ("" = 무제한, 프로젝트별 최신 1개는 유지)
+        blob_grace_sec: 최근 이 시간 안에 기록·확인된 blob은 참조가 없어도 유지
+            (다른 프로세스가 아직 커밋하지 않은 단계 행이 참조할 수 있음)
+    Returns:
+        삭제한 실행 수
+    """
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT run_id, project_name, updated_at FROM runs WHERE status = 'completed' "
+        "ORDER BY project_name, updated_at DESC"
+    ).fetchall()
+    expired = []
+    rank: dict = {}
+    for run_id, project_name, updated_at in rows:
+        i = rank.get(project_name, 0)
+        rank[project_name] = i + 1
+        if (keep and i >= keep) or (i > 0 and updated_at < cutoff):
+            expired.append((run_id,))
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("DELETE FROM phases WHERE run_id = ?", expired)
+        conn.executemany("DELETE FROM runs WHERE run_id = ?", expired)
+        conn.execute(
+            f"DELETE FROM blobs WHERE touched_at < ? AND hash NOT IN "
+            f"(SELECT value FROM ({_REFERENCED_BLOBS}) WHERE value IS NOT NULL)",
+            (time.time() - blob_grace_sec,),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return len(expired)
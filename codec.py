@@ -0,0 +1,106 @@
+"""체크포인트·메타데이터 직렬화 코덱.
+
+체크포인트와 .factory_meta.json은 매 저장마다 들여쓰기된 JSON으로 기록되던 구조였습니다.
+이 모듈은 공백 없는 JSON(orjson이 설치돼 있으면 orjson 사용)과 압축(zstandard가 있으면 zstd,
+없으면 gzip)을 한곳에 모아, 저장 경로가 파일 형식을 몰라도 되게 합니다.
+
+압축 파일은 확장자로 형식을 구분합니다 (.zst / .gz / 무압축). 읽을 때는 find_compressed()로
+실제로 존재하는 변형을 찾으므로, 압축 설정을 바꿔도 이전에 기록된 파일을 그대로 읽을 수 있습니다.
+
+환경 변수:
+  CHECKPOINT_COMPRESSION  "auto"(기본, zstd → gzip) | "zstd" | "gzip" | "none"
+"""
+
+import gzip
+import json
+import os
+
+from vfs import atomic_write
+
+try:
+    import orjson
+except ImportError:  # 표준 json으로 대체
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # gzip으로 대체
+    zstandard = None
+
+COMPRESSION = os.getenv("CHECKPOINT_COMPRESSION", "auto")
+
+_SUFFIXES = (".zst", ".gz", "")
+
+
+def dumps(obj, sort_keys: bool = False) -> str:
+    """공백 없는 JSON 문자열 (비ASCII 문자는 그대로 유지)."""
+    if orjson is not None:
+        try:
+            option = orjson.OPT_SORT_KEYS if sort_keys else 0
+            return orjson.dumps(obj, option=option).decode("utf-8")
+        except TypeError:
+            pass  # orjson이 지원하지 않는 값(비문자열 키 등) → 표준 json
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+
+def loads(data):
+    """dumps의 역변환. 잘못된 입력이면 json.JSONDecodeError (orjson 예외도 그 하위 클래스)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _suffix() -> str:
+    if COMPRESSION == "none":
+        return ""
+    if COMPRESSION in ("auto", "zstd") and zstandard is not None:
+        return ".zst"
+    return ".gz"  # zstd를 요청했지만 미설치인 경우도 gzip
+
+
+def compress(data: bytes) -> tuple:
+    """현재 설정으로 압축 → (압축된 바이트, 확장자)."""
+    suffix = _suffix()
+    if suffix == ".zst":
+        return zstandard.ZstdCompressor(level=3).compress(data), suffix
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=6, mtime=0), suffix
+    return data, suffix
+
+
+def decompress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 파일을 읽으려면 zstandard 패키지가 필요합니다")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+
+def write_compressed(base_path: str, data) -> str:
+    """base_path + 압축 확장자로 원자적으로 기록하고 실제 경로를 반환."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    payload, suffix = compress(data)
+    path = base_path + suffix
+    atomic_write(path, payload)
+    return path
+
+
+def find_compressed(base_path: str):
+    """base_path의 압축 변형 중 존재하는 파일 경로 (없으면 None)."""
+    for suffix in _SUFFIXES:
+        if os.path.exists(base_path + suffix):
+            return base_path + suffix
+    return None
+
+
+def read_compressed(path: str) -> bytes:
+    """확장자에 맞게 압축을 풀어 원본 바이트를 반환."""
+    with open(path, "rb") as f:
+        data = f.read()
+    for suffix in _SUFFIXES[:-1]:
+        if path.endswith(suffix):
+            return decompress(data, suffix)
+    return data
@@ -0,0 +1,99 @@
+"""고도화 변경의 영향 범위 분석.
+
+고도화 모드에서 FE/BE 에이전트는 기존 코드 전체를 컨텍스트로 받고, QC도 전체 코드베이스를
+리뷰했습니다. 이 모듈은 매니페스트의 의존성(deps)으로 프로젝트 import 그래프를 만들고,
+델타 파일과 그 역의존 파일(델타 파일을 직접·간접적으로 참조하는 파일), 델타 파일이 직접
+참조하는 파일만 "영향 범위"로 잡습니다. 범위 밖 파일은 심볼 시그니처만 남긴 골격으로 보여 줍니다.
+
+state["impact_scope"]가 None이면 (신규 빌드) 모든 파일이 범위 안으로 취급됩니다.
+"""
+
+from manifest import extract_deps
+from project_index import extract_symbols
+from token_budget import fit_blocks
+
+_SIGNATURE_MAX_CHARS = 160
+
+
+def dependency_graph(codes, manifest: dict = None, stale=()) -> dict:
+    """{경로: 참조하는 프로젝트 파일 집합}.
+
+    매니페스트 항목이 있고 stale에 없는 파일은 기록된 deps를 그대로 쓰고,
+    나머지(새 파일, 직접 수정된 파일)만 코드를 읽어 의존성을 추출합니다.
+    """
+    manifest = manifest or {}
+    stale = set(stale)
+    paths = set(codes)
+    graph = {}
+    for file_path in paths:
+        entry = manifest.get(file_path)
+        if entry is not None and file_path not in stale and "deps" in entry:
+            graph[file_path] = set(entry["deps"]) & paths
+            continue
+        try:
+            graph[file_path] = set(extract_deps(file_path, codes[file_path], paths))
+        except KeyError:
+            graph[file_path] = set()
+    return graph
+
+
+def impact_scope(graph: dict, delta_paths) -> set:
+    """델타 파일 + 역의존 파일(전이적) + 델타 파일이 직접 참조하는 파일."""
+    reverse: dict = {}
+    for file_path, deps in graph.items():
+        for dep in deps:
+            reverse.setdefault(dep, set()).add(file_path)
+
+    scope = set(delta_paths)
+    pending = list(scope)
+    while pending:
+        for dependent in reverse.get(pending.pop(), ()):
+            if dependent not in scope:
+                scope.add(dependent)
+                pending.append(dependent)
+    for file_path in delta_paths:
+        scope |= graph.get(file_path, set())
+    return scope
+
+
+def skeleton(file_path: str, code: str) -> str:
+    """심볼 정의 줄만 남긴 골격 (심볼이 없으면 줄 수만 표시)."""
+    lines = code.splitlines()
+    signatures = []
+    for _, _, line_no in extract_symbols(file_path, code):
+        if 0 < line_no <= len(lines):
+            signatures.append(f"L{line_no}: {lines[line_no - 1].strip()[:_SIGNATURE_MAX_CHARS]}")
+    body = "\n".join(signatures) if signatures else "(심볼 없음)"
+    return f"{body}\n... ({len(lines)}줄, 영향 범위 밖이라 골격만 표시)"
+
+
+def file_block(file_path: str, code: str, in_scope: bool = True) -> str:
+    """프롬프트용 파일 블록 하나 (범위 밖이면 골격)."""
+    if in_scope:
+        return f"\n--- {file_path} ---\n{code}\n"
+    return f"\n--- {file_path} (골격) ---\n{skeleton(file_path, code)}\n"
+
+
+def format_code_context(codes, scope=None, skip=(), budget: int = None, model: str = None) -> str:
+    """프롬프트용 파일 블록. 범위 안 파일은 전체 코드, 범위 밖 파일은 골격.
+
+    Args:
+        codes: {경로: 코드}
+        scope: 전체 코드를 보여 줄 경로 집합 (None이면 전체)
+        skip: 블록에서 제외할 경로
+        budget: 토큰 예산. 넘치면 큰 파일부터 골격 → 생략 (token_budget.fit_blocks)
+        model: 토큰 추정 보정에 쓸 모델 이름
+    """
+    items = [(p, c) for p, c in codes.items() if p not in skip]
+    if budget is None:
+        return "".join(file_block(p, c, scope is None or p in scope) for p, c in items)
+
+    blocks = [
+        (file_block(p, c, scope is None or p in scope), lambda p=p, c=c: file_block(p, c, in_scope=False))
+        for p, c in items
+    ]
+    chosen, degraded, dropped = fit_blocks(blocks, budget, model)
+    if not (degraded or dropped):
+        return "".join(chosen)
+    print(f"  ✂️  컨텍스트 축소: 골격 {degraded}개 / 생략 {dropped}개")
+    return "".join(chosen) + f"\n(컨텍스트 한도: {degraded}개 파일은 골격만, {dropped}개 파일은 생략)\n"
@@ -6,48 +6,62 @@ from agents.qc import qc_agent
 from checkpoint import (
     save_checkpoint,
     list_active_checkpoints,
+    load_checkpoint,
     archive_checkpoint,
     delete_checkpoint,
+    install_interrupt_handler,
     PHASE_LABELS,
 )
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 
+import codec
+from blob_store import CodesView
+from impact import dependency_graph, impact_scope
+from manifest import is_frontend, update_manifest, diff_manifest
+from project_loader import ProjectCodes
+from state_patch import apply_patch, run_agent
+from vfs import atomic_write
 
-_FRONTEND_EXTENSIONS = {".html", ".css", ".js", ".ts", ".tsx", ".jsx", ".vue", ".svelte"}
-_FRONTEND_DIR_PREFIXES = ("frontend", "static", "public", "src", "client", "web", "templates")
 
+# ── 파일 I/O 헬퍼 ──────────────────────────────────────────────────────────────
 
-def _is_frontend(file_path: str) -> bool:
-    normalized = file_path.replace("\\", "/").lower()
-    ext = os.path.splitext(normalized)[1]
-    if ext in _FRONTEND_EXTENSIONS:
-        return True
-    for prefix in _FRONTEND_DIR_PREFIXES:
-        if normalized.startswith(prefix + "/"):
-            return True
-    return False
+_WRITE_WORKERS = 8
 
 
-# ── 파일 I/O 헬퍼 ──────────────────────────────────────────────────────────────
+def _write_if_changed(output_dir: str, file_path: str, code: str) -> bool:
+    """디스크 내용과 다를 때만 원자적으로 기록. 기록했으면 True."""
+    full_path = os.path.join(output_dir, file_path)
+    data = code.encode("utf-8")
+    try:
+        # 크기가 같을 때만 실제 내용을 비교 (대부분의 변경은 크기 비교에서 걸러짐)
+        if os.path.getsize(full_path) == len(data):
+            with open(full_path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass  # 새 파일
+    atomic_write(full_path, data)
+    return True
+
 
-def _save_codes_to_disk(output_dir: str, codes: dict) -> None:
-    """생성된 코드를 output 디렉토리에 저장."""
+def _save_codes_to_disk(output_dir: str, codes: dict) -> list:
+    """생성된 코드를 output 디렉토리에 저장하고, 실제로 바뀐 파일 경로 목록을 반환.
+
+    디스크 내용과 같은 파일은 다시 쓰지 않으므로 mtime이 유지됩니다.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    for file_path, code in codes.items():
-        full_path = os.path.join(output_dir, file_path)
-        parent_dir = os.path.dirname(full_path)
-        if parent_dir:
-            os.makedirs(parent_dir, exist_ok=True)
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(code)
+    items = list(codes.items())
+    with ThreadPoolExecutor(max_workers=_WRITE_WORKERS) as executor:
+        written = list(executor.map(lambda item: _write_if_changed(output_dir, *item), items))
+    return sorted(path for (path, _), changed in zip(items, written) if changed)
 
 
 def _save_factory_meta(project_dir: str, meta: dict) -> None:
-    """프로젝트 메타데이터를 .factory_meta.json에 저장."""
+    """프로젝트 메타데이터를 .factory_meta.json에 저장 (공백 없는 JSON, 원자적 교체)."""
     meta_path = os.path.join(project_dir, ".factory_meta.json")
-    with open(meta_path, "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
+    atomic_write(meta_path, codec.dumps(meta))
 
 
 def _load_factory_meta(project_dir: str) -> dict:
@@ -59,21 +73,16 @@ def _load_factory_meta(project_dir: str) -> dict:
     return {}
 
 
-def _read_project_codes(project_dir: str) -> dict:
-    """프로젝트 디렉토리에서 모든 텍스트 파일을 읽어옴."""
-    codes = {}
-    skip_dirs = {".git", "__pycache__", "venv", ".venv", "node_modules"}
-    for root, dirs, files in os.walk(project_dir):
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-        for file in files:
-            full_path = os.path.join(root, file)
-            rel_path = os.path.relpath(full_path, project_dir).replace("\\", "/")
-            try:
-                with open(full_path, encoding="utf-8") as f:
-                    codes[rel_path] = f.read()
-            except UnicodeDecodeError:
-                pass
-    return codes
+def _refresh_manifest(project_dir: str, codes: dict, agent: str) -> None:
+    """디스크 반영 이후 .factory_meta.json의 매니페스트를 갱신 (바뀐 파일은 agent가 만든 것으로 기록)."""
+    meta = _load_factory_meta(project_dir)
+    meta["manifest"] = update_manifest(meta.get("manifest", {}), project_dir, codes, dict.fromkeys(codes, agent))
+    _save_factory_meta(project_dir, meta)
+
+
+def _read_project_codes(project_dir: str) -> ProjectCodes:
+    """프로젝트 디렉토리의 텍스트 파일 매핑 (목록만 만들고 내용은 접근 시 읽음)."""
+    return ProjectCodes(project_dir)
 
 
 # ── 신규 빌드 공통 후반부 (Phase 2~5) ─────────────────────────────────────────
@@ -95,7 +104,7 @@ def _run_phases_2_to_5(state: dict, log_path: str, from_phase: str = "PM_DONE")
         print("🎨 [Phase 2/5] Designer Agent - UI/UX 디자인 스펙 설계 중...")
         print("-" * 60)
 
-        state = designer_agent(state)
+        state = apply_patch(state, run_agent(designer_agent, state))
 
         design_spec = state.get("design_spec", {})
         theme = design_spec.get("theme", {})
@@ -123,13 +132,13 @@ def _run_phases_2_to_5(state: dict, log_path: str, from_phase: str = "PM_DONE")
         print("💻 [Phase 3/5] Frontend Agent - 프론트엔드 코드 생성 중...")
         print("-" * 60)
 
-        state = frontend_agent(state)
+        state = apply_patch(state, run_agent(frontend_agent, state))
 
         if state["current_step"] == "ERROR":
             print(f"\n❌ 오류 발생: {state['feedback']}")
             return
 
-        fe_files = [p for p in state["codes"] if _is_frontend(p)]
+        fe_files = [p for p in state["codes"] if is_frontend(p)]
         print(f"\n✅ FE 코드 생성 완료! ({len(fe_files)}개 파일)")
 
         log_path = save_checkpoint(state, "FRONTEND_DONE")
@@ -142,13 +151,13 @@ def _run_phases_2_to_5(state: dict, log_path: str, from_phase: str = "PM_DONE")
         print("⚙️  [Phase 4/5] Backend Agent - 백엔드 코드 생성 중...")
         print("-" * 60)
 
-        state = backend_agent(state)
+        state = apply_patch(state, run_agent(backend_agent, state))
 
         if state["current_step"] == "ERROR":
             print(f"\n❌ 오류 발생: {state['feedback']}")
             return
 
-        be_files = [p for p in state["codes"] if not _is_frontend(p)]
+        be_files = [p for p in state["codes"] if not is_frontend(p)]
         print(f"\n✅ BE 코드 생성 완료! ({len(be_files)}개 파일)")
 
         log_path = save_checkpoint(state, "BACKEND_DONE")
@@ -166,6 +175,7 @@ def _run_phases_2_to_5(state: dict, log_path: str, from_phase: str = "PM_DONE")
             "prd": state["prd"],
             "file_tree": state["file_tree"],
             "interface_contracts": state.get("interface_contracts", {}),
+            "manifest": update_manifest({}, output_dir, state["codes"]),
         })
         log_path = save_checkpoint(state, "DISK_SAVED")
 
@@ -174,7 +184,7 @@ def _run_phases_2_to_5(state: dict, log_path: str, from_phase: str = "PM_DONE")
         print("-" * 60)
         for file_path, code in state["codes"].items():
             lines = len(code.splitlines())
-            role = "🎨 FE" if _is_frontend(file_path) else "⚙️  BE"
+            role = "🎨 FE" if is_frontend(file_path) else "⚙️  BE"
             print(f"  {role}  {file_path} ({lines} lines)")
     else:
         # disk에서 codes 재로드 (QC 용)
@@ -187,11 +197,12 @@ def _run_phases_2_to_5(state: dict, log_path: str, from_phase: str = "PM_DONE")
     print("🔍 [Phase 5/5] QC Agent - 코드 검증 및 자동 수정 중...")
     print("-" * 60)
 
-    state = qc_agent(state)
+    state = apply_patch(state, run_agent(qc_agent, state))
 
     if state["current_step"] == "ERROR":
         print(f"\n❌ 오류 발생: {state['feedback']}")
         return
+    _refresh_manifest(output_dir, state["codes"], "qc")
 
     print("\n" + state["feedback"])
 
@@ -219,11 +230,14 @@ def run_new_build() -> None:
         "file_tree": {},
         "interface_contracts": {},
         "design_spec": {},
-        "codes": {},
+        "codes": CodesView(),
         "feedback": "",
         "current_step": "PLANNING",
         "mode": "new",
         "log_path": None,
+        "run_id": None,
+        "impact_scope": None,
+        "done_files": [],
     }
 
     # ── Phase 1: PM Agent ─────────────────────────────────────────────────────
@@ -231,7 +245,7 @@ def run_new_build() -> None:
     print("📋 [Phase 1/5] PM Agent - 기획 및 구조 설계 중...")
     print("-" * 60)
 
-    state = pm_agent(state)
+    state = apply_patch(state, run_agent(pm_agent, state))
 
     if state["current_step"] == "ERROR":
         print(f"\n❌ 오류 발생: {state['feedback']}")
@@ -260,7 +274,7 @@ def run_new_build() -> None:
 # ── 체크포인트 복구 ───────────────────────────────────────────────────────────
 
 def run_resume(checkpoint: dict) -> None:
-    """중단된 파이프라인을 체크포인트에서 재가동."""
+    """중단된 파이프라인을 체크포인트에서 재가동 (checkpoint는 load_checkpoint 결과)."""
     state = checkpoint["state"]
     phase = checkpoint["phase_completed"]
     log_path = checkpoint["file_path"]
@@ -270,6 +284,13 @@ def run_resume(checkpoint: dict) -> None:
 
     print(f"\n  🔄 '{project_name}' 프로젝트 복구 시작")
     print(f"  📍 재개 지점: {PHASE_LABELS.get(phase, phase)}")
+    done_files = state.setdefault("done_files", [])
+    if done_files:
+        print(f"  ♻️  파일 단위 체크포인트: {len(done_files)}개 파일 생성 완료 (재생성 안 함)")
+
+    # 이 프로세스에서 체크포인트를 다시 추적 → 이후 파일 단위 저장·SIGINT flush 대상
+    if phase in PHASE_LABELS:
+        save_checkpoint(state, phase)
 
     if phase == "PM_DONE":
         _run_phases_2_to_5(state, log_path, from_phase="PM_DONE")
@@ -292,8 +313,10 @@ def run_resume(checkpoint: dict) -> None:
         print("🔍 [Phase 5/5] QC Agent - 코드 검증 및 자동 수정 중...")
         print("-" * 60)
 
-        state = qc_agent(state)
+        state = apply_patch(state, run_agent(qc_agent, state))
         print("\n" + state["feedback"])
+        if state["current_step"] != "ERROR":
+            _refresh_manifest(output_dir, state["codes"], "qc")
         archive_checkpoint(log_path)
 
         print("\n" + "=" * 60)
@@ -349,6 +372,15 @@ def run_upgrade() -> None:
 
     print(f"\n  ✅ '{project_name}' 프로젝트 로드 완료 ({len(existing_codes)}개 파일)")
 
+    # 마지막 생성 이후 사람이 직접 고친 파일 (매니페스트가 없는 구버전 프로젝트는 건너뜀)
+    manual_paths = []
+    if meta.get("manifest"):
+        disk_diff = diff_manifest(meta["manifest"], existing_codes)
+        manual_paths = disk_diff["added"] + disk_diff["modified"]
+        if manual_paths:
+            print(f"  ✋ 직접 수정된 파일 {len(manual_paths)}개: {', '.join(manual_paths[:5])}"
+                  + (" ..." if len(manual_paths) > 5 else ""))
+
     upgrade_request = input("\n✨ 어떤 기능을 추가하거나 수정할까요?\n   → ").strip()
     if not upgrade_request:
         print("⚠️  요청사항을 입력하세요.")
@@ -368,6 +400,9 @@ def run_upgrade() -> None:
         "current_step": "UPGRADE_PLANNING",
         "mode": "upgrade",
         "log_path": None,
+        "run_id": None,
+        "impact_scope": None,
+        "done_files": [],
     }
 
     # ── Phase 1: PM Upgrade Agent ─────────────────────────────────────────────
@@ -375,7 +410,7 @@ def run_upgrade() -> None:
     print("📋 [Phase 1/5] PM Upgrade Agent - 변경 계획 수립 중...")
     print("-" * 60)
 
-    state = pm_upgrade_agent(state, upgrade_request)
+    state = apply_patch(state, run_agent(pm_upgrade_agent, state, upgrade_request))
 
     if state["current_step"] == "ERROR":
         print(f"\n❌ 오류 발생: {state['feedback']}")
@@ -396,6 +431,13 @@ def run_upgrade() -> None:
         print(f"  {icon}  {path}")
         print(f"        └─ {desc}")
 
+    # ── 영향 범위 분석: 델타 파일 + 역의존 파일만 전체 코드로 FE/BE/QC에 전달 ──
+    graph = dependency_graph(existing_codes, meta.get("manifest"), stale=manual_paths)
+    scope = impact_scope(graph, delta_file_tree)
+    state["impact_scope"] = sorted(scope)
+    total = len(set(graph) | set(delta_file_tree))
+    print(f"\n🎯 영향 범위: {len(scope)}/{total}개 파일 (나머지는 골격만 전달)")
+
     # ── Phase 2: Designer - 기존 design_spec 재사용 또는 새로 생성 ─────────────
     print("\n" + "-" * 60)
     print("🎨 [Phase 2/5] Designer - 디자인 스펙 확인 중...")
@@ -414,22 +456,22 @@ def run_upgrade() -> None:
             domain = state.get("project_domain", "APP")
             print(f"  🌐 Domain: {domain} ({'🎮 Canvas+Pixel' if domain == 'GAME' else '🖥️  DOM+Tailwind'})")
         except (json.JSONDecodeError, KeyError):
-            state = designer_agent(state)
+            state = apply_patch(state, run_agent(designer_agent, state))
             print("\n  🎨 디자인 스펙 새로 생성")
     else:
-        state = designer_agent(state)
+        state = apply_patch(state, run_agent(designer_agent, state))
         print("\n  🎨 디자인 스펙 새로 생성")
 
     # ── Phase 3 & 4: 델타 파일 FE/BE 생성 ────────────────────────────────────
-    fe_delta = {p: d for p, d in delta_file_tree.items() if _is_frontend(p)}
-    be_delta = {p: d for p, d in delta_file_tree.items() if not _is_frontend(p)}
+    fe_delta = {p: d for p, d in delta_file_tree.items() if is_frontend(p)}
+    be_delta = {p: d for p, d in delta_file_tree.items() if not is_frontend(p)}
 
     if fe_delta:
         print("\n" + "-" * 60)
         print(f"💻 [Phase 3/5] Frontend Agent - {len(fe_delta)}개 FE 파일 업데이트 중...")
         print("-" * 60)
         state["file_tree"] = fe_delta
-        state = frontend_agent(state)
+        state = apply_patch(state, run_agent(frontend_agent, state))
     else:
         print("\n  ⏭️  FE 변경 없음 (Phase 3 건너뜀)")
 
@@ -438,14 +480,15 @@ def run_upgrade() -> None:
         print(f"⚙️  [Phase 4/5] Backend Agent - {len(be_delta)}개 BE 파일 업데이트 중...")
         print("-" * 60)
         state["file_tree"] = be_delta
-        state = backend_agent(state)
+        state = apply_patch(state, run_agent(backend_agent, state))
     else:
         print("\n  ⏭️  BE 변경 없음 (Phase 4 건너뜀)")
 
     # ── 기존 코드 + 델타 코드 병합 & 저장 ────────────────────────────────────
-    _save_codes_to_disk(project_dir, state["codes"])
+    changed_paths = _save_codes_to_disk(project_dir, state["codes"])
 
     merged_file_tree = {**meta.get("file_tree", {}), **delta_file_tree}
+    manual_agents = {p: "manual" for p in manual_paths if p not in delta_file_tree}
     _save_factory_meta(project_dir, {
         "idea": meta.get("idea", ""),
         "project_name": project_name,
@@ -454,11 +497,12 @@ def run_upgrade() -> None:
         "prd": state["prd"],
         "file_tree": merged_file_tree,
         "interface_contracts": state.get("interface_contracts", meta.get("interface_contracts", {})),
+        "manifest": update_manifest(meta.get("manifest", {}), project_dir, state["codes"], manual_agents),
     })
 
     state["file_tree"] = merged_file_tree
 
-    print(f"\n📁 '{project_dir}/' 디렉토리 업데이트 완료.")
+    print(f"\n📁 '{project_dir}/' 디렉토리 업데이트 완료. (실제 변경 {len(changed_paths)}개 파일)")
     print(f"\n📝 변경/추가된 파일:")
     for path in delta_file_tree:
         lines = len(state["codes"].get(path, "").splitlines())
@@ -469,9 +513,11 @@ def run_upgrade() -> None:
     print("🔍 [Phase 5/5] QC Agent - 코드 검증 및 자동 수정 중...")
     print("-" * 60)
 
-    state = qc_agent(state)
+    state = apply_patch(state, run_agent(qc_agent, state))
 
     print("\n" + state["feedback"])
+    if state["current_step"] != "ERROR":
+        _refresh_manifest(project_dir, state["codes"], "qc")
 
     print("\n" + "=" * 60)
     print("🎉 프로젝트 고도화 완료!")
@@ -495,7 +541,9 @@ def _check_and_offer_resume() -> bool:
     for i, cp in enumerate(checkpoints, 1):
         ts = cp["timestamp"][:19].replace("T", " ")
         label = PHASE_LABELS.get(cp["phase_completed"], cp["phase_completed"])
-        print(f"  {i}. [{ts}] {cp['project_name']} — {label}")
+        done_count = cp.get("done_count", 0)
+        progress = f" (+{done_count}개 파일 완료)" if done_count else ""
+        print(f"  {i}. [{ts}] {cp['project_name']} — {label}{progress}")
 
     print()
     print("r. 중단된 작업 재개")
@@ -507,17 +555,28 @@ def _check_and_offer_resume() -> bool:
 
     if choice == "r":
         # 여러 개면 선택
-        if len(checkpoints) == 1:
-            run_resume(checkpoints[0])
-        else:
+        idx = 0
+        if len(checkpoints) > 1:
+            # 숫자 파싱만 감쌈 — 재개 중 에이전트에서 올라온 ValueError(PromptTooLarge 등)를 입력 오류로 오인하지 않도록
             try:
                 idx = int(input("재개할 번호: ").strip()) - 1
-                if 0 <= idx < len(checkpoints):
-                    run_resume(checkpoints[idx])
-                else:
-                    print("⚠️  올바른 번호를 입력하세요.")
             except ValueError:
                 print("⚠️  숫자를 입력하세요.")
+                return True
+            if not 0 <= idx < len(checkpoints):
+                print("⚠️  올바른 번호를 입력하세요.")
+                return True
+        cp = checkpoints[idx]
+        # 목록은 헤더만 읽으므로 본문·blob 손상은 여기서 처음 드러남
+        try:
+            resumed = load_checkpoint(cp["file_path"])
+        except (OSError, EOFError, KeyError, ValueError) as e:   # EOFError: 잘린 gzip blob
+            print(f"⚠️  체크포인트를 읽을 수 없습니다 ({cp['project_name']}): {e}")
+            if input("손상된 체크포인트를 삭제할까요? (y/N): ").strip().lower() == "y":
+                delete_checkpoint(cp["file_path"])
+                print("  🗑️  체크포인트 삭제 완료.")
+            return False
+        run_resume(resumed)
         return True
 
     elif choice == "d":
@@ -535,6 +594,9 @@ def run_team() -> None:
     print("🤖 MVP AI Factory - Idea to MVP Pipeline")
     print("=" * 60)
 
+    # Ctrl+C 시 완료된 파일까지 체크포인트를 남기고 종료
+    install_interrupt_handler()
+
     # ── 체크포인트 복구 확인 ──────────────────────────────────────────────────
     if _check_and_offer_resume():
         return
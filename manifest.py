@@ -0,0 +1,225 @@
+"""프로젝트 매니페스트와 파일 역할 분류.
+
+파일 역할(FE/BE) 판별이 main.py·frontend.py·backend.py에 각각 문자열 검사로 흩어져 있었고,
+어떤 파일을 에이전트가 생성했고 어떤 파일을 사람이 고쳤는지 기록이 없었습니다.
+이 모듈은 역할 분류를 한곳으로 모으고, .factory_meta.json의 "manifest" 항목을 관리합니다.
+
+매니페스트 항목 (경로별):
+  {"role", "language", "hash", "size", "mtime_ns", "agent", "deps"}
+  role      frontend | backend | spec | other
+  agent     파일을 마지막으로 만든 주체 (frontend, backend, designer, qc, manual ...)
+  deps      이 파일이 참조하는 프로젝트 내부 파일 경로 목록 (import / script src 등)
+
+디스크와의 비교는 (mtime, size)가 같으면 파일을 읽지 않고 넘어가므로, 바뀐 파일 수에 비례합니다.
+"""
+
+import os
+import posixpath
+import re
+
+from vfs import content_hash
+
+ROLE_FRONTEND = "frontend"
+ROLE_BACKEND = "backend"
+ROLE_SPEC = "spec"
+ROLE_OTHER = "other"
+
+_FRONTEND_EXTENSIONS = {".html", ".css", ".js", ".ts", ".tsx", ".jsx", ".vue", ".svelte"}
+_FRONTEND_DIR_PREFIXES = ("frontend", "static", "public", "src", "client", "web", "templates")
+_BACKEND_EXTENSIONS = {".py", ".txt", ".cfg", ".ini", ".toml", ".yaml", ".yml"}
+
+_LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".mjs": "javascript", ".jsx": "jsx",
+    ".ts": "typescript", ".tsx": "tsx", ".html": "html", ".css": "css",
+    ".vue": "vue", ".svelte": "svelte", ".json": "json", ".md": "markdown",
+    ".yaml": "yaml", ".yml": "yaml", ".toml": "toml", ".ini": "ini", ".cfg": "ini",
+    ".sh": "shell", ".sql": "sql", ".env": "dotenv",
+}
+
+_PY_IMPORT_RE = re.compile(r"^\s*(?:from\s+(\.*[\w.]*)\s+import\s+([\w*, ()]+)|import\s+([\w., ]+))", re.MULTILINE)
+_JS_IMPORT_RE = re.compile(
+    r"""(?:import\s[^'"]*?from\s*|import\s*\(?\s*|require\s*\(\s*|export\s[^'"]*?from\s*)['"]([^'"]+)['"]"""
+)
+_HTML_REF_RE = re.compile(r"""<(?:script|link|img)\b[^>]*?\b(?:src|href)\s*=\s*['"]([^'"]+)['"]""", re.IGNORECASE)
+_CSS_IMPORT_RE = re.compile(r"""@import\s+(?:url\()?\s*['"]?([^'")\s;]+)""")
+_JS_SUFFIXES = ("", ".js", ".ts", ".jsx", ".tsx", ".mjs", "/index.js", "/index.ts")
+
+
+# ── 역할 분류 ─────────────────────────────────────────────────────────────────
+
+def classify_role(file_path: str) -> str:
+    """파일 경로 → 담당 역할 (ROLE_* 상수)."""
+    normalized = file_path.replace("\\", "/").lower()
+    ext = os.path.splitext(normalized)[1]
+    if ext in _FRONTEND_EXTENSIONS:
+        return ROLE_FRONTEND
+    for prefix in _FRONTEND_DIR_PREFIXES:
+        if normalized.startswith(prefix + "/"):
+            return ROLE_FRONTEND
+    if normalized == "design_spec.json":
+        return ROLE_SPEC
+    if ext in _BACKEND_EXTENSIONS or not ext:
+        return ROLE_BACKEND
+    return ROLE_OTHER
+
+
+def is_frontend(file_path: str) -> bool:
+    return classify_role(file_path) == ROLE_FRONTEND
+
+
+def is_backend(file_path: str) -> bool:
+    return classify_role(file_path) == ROLE_BACKEND
+
+
+def detect_language(file_path: str) -> str:
+    name = os.path.basename(file_path).lower()
+    if name.startswith(".env"):
+        return "dotenv"
+    return _LANGUAGES.get(os.path.splitext(name)[1], "text")
+
+
+def _default_agent(file_path: str, role: str) -> str:
+    if file_path == "README.md":
+        return "qc"
+    return {ROLE_FRONTEND: "frontend", ROLE_BACKEND: "backend", ROLE_SPEC: "designer"}.get(role, "pm")
+
+
+# ── 의존성 추출 ───────────────────────────────────────────────────────────────
+
+def _resolve_python(module: str, names: str, file_path: str, paths) -> list:
+    level = len(module) - len(module.lstrip("."))
+    base = module[level:].replace(".", "/")
+    if level:
+        package_dir = posixpath.dirname(file_path)
+        for _ in range(level - 1):
+            package_dir = posixpath.dirname(package_dir)
+        base = posixpath.join(package_dir, base) if base else package_dir
+    candidates = [base]
+    # from pkg import mod → pkg/mod.py 도 후보
+    for name in re.split(r"[\s,()]+", names or ""):
+        if name and name != "*":
+            candidates.append(posixpath.join(base, name) if base else name)
+    found = []
+    for candidate in candidates:
+        for path in (candidate + ".py", candidate + "/__init__.py"):
+            if path in paths and path != file_path:
+                found.append(path)
+                break
+    return found
+
+
+def _resolve_relative(ref: str, file_path: str, paths, suffixes=("",)) -> list:
+    ref = ref.split("?")[0].split("#")[0]
+    if not ref or "://" in ref or ref.startswith(("data:", "//", "mailto:")):
+        return []
+    if ref.startswith("/"):
+        base = ref.lstrip("/")
+    else:
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(file_path), ref))
+    for suffix in suffixes:
+        if base + suffix in paths:
+            return [base + suffix]
+    return []
+
+
+def extract_deps(file_path: str, code: str, paths) -> list:
+    """코드가 참조하는 프로젝트 내부 파일 경로 목록 (정규식 기반, 외부 패키지는 제외)."""
+    language = detect_language(file_path)
+    deps = []
+    if language == "python":
+        for m in _PY_IMPORT_RE.finditer(code):
+            if m.group(1) is not None:
+                deps += _resolve_python(m.group(1), m.group(2), file_path, paths)
+            else:
+                for module in m.group(3).split(","):
+                    module = module.strip().split(" ")[0]
+                    if module:
+                        deps += _resolve_python(module, "", file_path, paths)
+    elif language in ("javascript", "typescript", "jsx", "tsx", "vue", "svelte"):
+        for m in _JS_IMPORT_RE.finditer(code):
+            if m.group(1).startswith((".", "/")):
+                deps += _resolve_relative(m.group(1), file_path, paths, _JS_SUFFIXES)
+    elif language == "html":
+        for m in _HTML_REF_RE.finditer(code):
+            deps += _resolve_relative(m.group(1), file_path, paths)
+    elif language == "css":
+        for m in _CSS_IMPORT_RE.finditer(code):
+            deps += _resolve_relative(m.group(1), file_path, paths)
+    return sorted(set(deps) - {file_path})
+
+
+# ── 매니페스트 ────────────────────────────────────────────────────────────────
+
+def _stat(root: str, file_path: str):
+    try:
+        st = os.stat(os.path.join(root, file_path))
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def update_manifest(previous: dict, root: str, codes, agents: dict = None) -> dict:
+    """codes 기준으로 매니페스트를 갱신한 새 dict를 반환.
+
+    해시가 이전 항목과 같은 파일은 항목을 그대로 재사용하고(분류·의존성 재계산 없음),
+    바뀌었거나 새로 생긴 파일만 다시 계산합니다. codes에 없는 경로는 제거됩니다.
+
+    Args:
+        previous: 이전 매니페스트 (없으면 {})
+        root: 프로젝트 디렉토리 (mtime 기록용, 디스크 반영 이후에 호출)
+        codes: {경로: 코드}
+        agents: 변경 파일의 생성 주체 {경로: agent}. 없으면 역할로 추정
+    """
+    previous = previous or {}
+    agents = agents or {}
+    paths = set(codes)
+    manifest = {}
+    for file_path, code in codes.items():
+        digest = content_hash(code)
+        entry = previous.get(file_path)
+        stat = _stat(root, file_path)
+        if entry is not None and entry.get("hash") == digest:
+            entry = dict(entry)
+            if stat is not None:
+                entry["mtime_ns"] = stat[0]
+            manifest[file_path] = entry
+            continue
+        role = classify_role(file_path)
+        manifest[file_path] = {
+            "role": role,
+            "language": detect_language(file_path),
+            "hash": digest,
+            "size": len(code.encode("utf-8")),
+            "mtime_ns": stat[0] if stat else None,
+            "agent": agents.get(file_path) or _default_agent(file_path, role),
+            "deps": extract_deps(file_path, code, paths),
+        }
+    return manifest
+
+
+def diff_manifest(manifest: dict, codes) -> dict:
+    """디스크 프로젝트(codes)와 매니페스트 비교 → {"added", "modified", "removed"}.
+
+    codes가 stat(path)를 제공하면(ProjectCodes) (mtime, size)가 같은 파일은 읽지 않습니다.
+    """
+    added, modified = [], []
+    stat_of = getattr(codes, "stat", None)
+    for file_path in codes:
+        entry = manifest.get(file_path)
+        if entry is None:
+            added.append(file_path)
+            continue
+        stat = stat_of(file_path) if stat_of else None
+        if stat is not None:
+            if stat == (entry.get("mtime_ns"), entry.get("size")):
+                continue
+            if stat[1] != entry.get("size"):
+                modified.append(file_path)
+                continue
+        try:
+            if content_hash(codes[file_path]) != entry.get("hash"):
+                modified.append(file_path)
+        except KeyError:
+            continue
+    removed = [p for p in manifest if p not in codes]
+    return {"added": sorted(added), "modified": sorted(modified), "removed": sorted(removed)}
@@ -0,0 +1,246 @@
+"""고도화 모드용 로컬 심볼·키워드 색인과 BM25 검색.
+
+pm_upgrade_agent는 확장자가 맞는 앞쪽 8개 파일의 첫 25줄을 그대로 프롬프트에 넣고,
+렌더링 방식 판별을 위해 모든 파일을 여러 번 문자열 검색했습니다. 이 모듈은 파일별로
+  - 심볼 (Python 클래스/함수, JS 함수/클래스/export, HTML id)
+  - 렌더링 마커 (requestAnimationFrame, canvas, addEventListener 등)
+  - 키워드 빈도 (식별자를 camelCase/snake_case 단위로 분해, 한글은 2글자 단위)
+를 한 번 추출해 프로젝트 디렉토리의 .factory_index.json에 보관하고, 고도화 요청과의
+BM25 점수가 높은 파일부터 토큰 예산 안에서 컨텍스트를 구성합니다.
+
+색인은 (mtime, size)가 바뀐 파일만 다시 읽어 갱신합니다.
+"""
+
+import ast
+import math
+import os
+import re
+from collections import Counter
+
+import codec
+from token_budget import estimate_tokens
+from vfs import atomic_write, content_hash
+
+INDEX_FILENAME = ".factory_index.json"
+_INDEX_VERSION = 1
+
+# BM25 파라미터
+_K1 = 1.5
+_B = 0.75
+_SYMBOL_WEIGHT = 3      # 심볼·경로에 나온 단어는 본문보다 가중
+
+# 렌더링 방식 판별용 마커 (이름 → 본문에서 찾을 부분 문자열, 소문자 비교 여부)
+_MARKERS = {
+    "raf": (("requestAnimationFrame", "gameLoop", "game_loop"), False),
+    "canvas": (("getContext", "ctx.draw"), False),
+    "canvas_word": (("canvas",), True),
+    "dom_event": (("addEventListener", "querySelector"), False),
+}
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*|[가-힣]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+_PY_DEF_RE = re.compile(r"^\s*(?:async\s+)?(def|class)\s+(\w+)", re.MULTILINE)
+_JS_SYMBOL_RES = (
+    ("function", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)", re.MULTILINE)),
+    ("class", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?class\s+(\w+)", re.MULTILINE)),
+    ("const", re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=", re.MULTILINE)),
+    ("method", re.compile(r"^\s+(?:async\s+|static\s+)*(\w+)\s*\([^)]*\)\s*\{", re.MULTILINE)),
+)
+_JS_KEYWORDS = {"if", "for", "while", "switch", "catch", "function", "return", "else", "with"}
+_HTML_ID_RE = re.compile(r"""\bid\s*=\s*['"]([\w-]+)['"]""")
+
+
+def tokenize(text: str) -> list:
+    """검색용 토큰 목록 (영문 식별자는 소문자 하위 단어, 한글은 2글자 단위)."""
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+            continue
+        parts = _CAMEL_RE.findall(word)
+        tokens.extend(p.lower() for p in parts if len(p) > 1)
+        if len(parts) > 1:
+            tokens.append(word.lower())
+    return tokens
+
+
+def _line_of(code: str, offset: int) -> int:
+    return code.count("\n", 0, offset) + 1
+
+
+def extract_symbols(file_path: str, code: str) -> list:
+    """파일의 심볼 목록 → [[이름, 종류, 줄번호], ...]."""
+    ext = os.path.splitext(file_path)[1].lower()
+    symbols = []
+    if ext == ".py":
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            for m in _PY_DEF_RE.finditer(code):
+                symbols.append([m.group(2), m.group(1), _line_of(code, m.start())])
+            return symbols
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                symbols.append([node.name, "class", node.lineno])
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append([node.name, "def", node.lineno])
+    elif ext in (".js", ".mjs", ".ts", ".tsx", ".jsx", ".vue", ".svelte"):
+        for kind, pattern in _JS_SYMBOL_RES:
+            for m in pattern.finditer(code):
+                if m.group(1) not in _JS_KEYWORDS:
+                    symbols.append([m.group(1), kind, _line_of(code, m.start())])
+    elif ext == ".html":
+        for m in _HTML_ID_RE.finditer(code):
+            symbols.append([m.group(1), "id", _line_of(code, m.start())])
+    return sorted(symbols, key=lambda s: s[2])
+
+
+def _markers(code: str) -> list:
+    found = []
+    lowered = None
+    for name, (needles, ignore_case) in _MARKERS.items():
+        if ignore_case:
+            lowered = lowered if lowered is not None else code.lower()
+            haystack = lowered
+        else:
+            haystack = code
+        if any(n in haystack for n in needles):
+            found.append(name)
+    return found
+
+
+def _index_file(file_path: str, code: str) -> dict:
+    symbols = extract_symbols(file_path, code)
+    tf = Counter(tokenize(code))
+    for term in tokenize(file_path) + [t for s in symbols for t in tokenize(s[0])]:
+        tf[term] += _SYMBOL_WEIGHT
+    return {
+        "hash": content_hash(code),
+        "symbols": symbols,
+        "markers": _markers(code),
+        "tf": dict(tf),
+        "len": sum(tf.values()),
+    }
+
+
+class ProjectIndex:
+    """프로젝트 파일별 심볼·마커·키워드 빈도 색인.
+
+    Args:
+        files: {경로: 색인 항목}
+    """
+
+    def __init__(self, files: dict):
+        self.files = files
+        self._df = Counter(term for entry in files.values() for term in entry["tf"])
+        self._avg_len = (sum(e["len"] for e in files.values()) / len(files)) if files else 0.0
+
+    @classmethod
+    def load(cls, codes, root: str = None) -> "ProjectIndex":
+        """codes 기준으로 색인을 만들거나, root의 기존 색인에서 바뀐 파일만 갱신해 저장.
+
+        codes가 stat(path)를 제공하면(ProjectCodes) (mtime, size)가 같은 파일은 읽지 않습니다.
+        """
+        index_path = os.path.join(root, INDEX_FILENAME) if root else None
+        cached = {}
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, "rb") as f:
+                    data = codec.loads(f.read())
+                if data.get("version") == _INDEX_VERSION:
+                    cached = data.get("files", {})
+            except (OSError, ValueError):
+                cached = {}
+
+        stat_of = getattr(codes, "stat", None)
+        files = {}
+        changed = False
+        for file_path in list(codes):
+            stat = stat_of(file_path) if stat_of else None
+            entry = cached.get(file_path)
+            if entry is not None and stat is not None and [entry.get("mtime_ns"), entry.get("size")] == list(stat):
+                files[file_path] = entry
+                continue
+            try:
+                code = codes[file_path]
+            except KeyError:
+                continue
+            if entry is not None and entry.get("hash") == content_hash(code):
+                entry = dict(entry)
+            else:
+                entry = _index_file(file_path, code)
+            entry["mtime_ns"], entry["size"] = stat if stat is not None else (None, None)
+            files[file_path] = entry
+            changed = True
+
+        if index_path and (changed or set(files) != set(cached)):
+            atomic_write(index_path, codec.dumps({"version": _INDEX_VERSION, "files": files}))
+        return cls(files)
+
+    def any_marker(self, name: str) -> bool:
+        return any(name in entry["markers"] for entry in self.files.values())
+
+    def search(self, query: str, limit: int = None) -> list:
+        """BM25 점수 순 [(경로, 점수), ...] (점수 0인 파일은 제외)."""
+        terms = set(tokenize(query))
+        n = len(self.files)
+        scores = []
+        for file_path, entry in self.files.items():
+            score = 0.0
+            tf = entry["tf"]
+            norm = _K1 * (1 - _B + _B * entry["len"] / self._avg_len) if self._avg_len else _K1
+            for term in terms:
+                freq = tf.get(term)
+                if not freq:
+                    continue
+                df = self._df[term]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                score += idf * freq * (_K1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((file_path, score))
+        scores.sort(key=lambda x: (-x[1], x[0]))
+        return scores[:limit] if limit else scores
+
+    def outline(self, file_path: str) -> str:
+        """심볼 목록 요약 (줄번호 포함)."""
+        symbols = self.files.get(file_path, {}).get("symbols", [])
+        return "\n".join(f"  L{line}: {kind} {name}" for name, kind, line in symbols)
+
+
+def build_context(index: ProjectIndex, codes, query: str, token_budget: int) -> str:
+    """query와 관련도가 높은 파일부터 token_budget 안에서 프롬프트용 코드 컨텍스트를 구성.
+
+    예산 안에 들어가면 파일 전체를, 넘치면 심볼 개요를 넣습니다. 관련 파일이 없으면
+    진입점 파일(index.html, main.py 등)의 개요로 대신합니다.
+    """
+    ranked = [path for path, _ in index.search(query)]
+    if not ranked:
+        entry_names = ("index.html", "main.py", "app.py", "main.js", "app.js", "game.js")
+        ranked = [p for p in index.files if os.path.basename(p) in entry_names]
+
+    sections = []
+    remaining = token_budget
+    for file_path in ranked:
+        try:
+            code = codes[file_path]
+        except KeyError:
+            continue
+        full = f"\n--- {file_path} (전체) ---\n{code}\n"
+        if estimate_tokens(full) <= remaining:
+            sections.append(full)
+            remaining -= estimate_tokens(full)
+            continue
+        outline = index.outline(file_path)
+        if not outline:
+            continue
+        summary = f"\n--- {file_path} (심볼 개요, {len(code.splitlines())}줄) ---\n{outline}\n"
+        if estimate_tokens(summary) <= remaining:
+            sections.append(summary)
+            remaining -= estimate_tokens(summary)
+        if remaining < 50:
+            break
+    return "".join(sections)
@@ -0,0 +1,231 @@
+"""기존 프로젝트 디렉토리의 지연(lazy) 로더.
+
+고도화 모드는 시작할 때 output 프로젝트 전체를 읽어 메모리에 올리던 구조였습니다.
+ProjectCodes는 {경로: 코드} 매핑처럼 동작하지만, 생성 시에는 디렉토리 목록과
+stat 정보만 모으고 각 파일 내용은 처음 접근할 때 읽습니다.
+
+목록 단계에서 걸러내는 항목:
+  - 가상환경·캐시·VCS 디렉토리, 프로젝트 루트 .gitignore에 해당하는 경로
+  - 바이너리·데이터 확장자, 잠금 파일, .factory_meta.json / .factory_index.json
+  - PROJECT_MAX_FILE_KB(기본 256KB)보다 큰 파일
+  - 앞부분(8KB)이 UTF-8 텍스트가 아닌 파일 (CP949 소스, 확장자 없는 바이너리 등)
+앞부분 검사를 통과했지만 뒤쪽이 UTF-8이 아닌 드문 파일과 목록 이후 삭제된 파일은 처음
+접근할 때 매핑에서 빠지며, in 검사도 실제로 읽어 본 결과를 따릅니다.
+
+읽은 내용은 (mtime, size) 기준으로 프로세스 전역 LRU 캐시(PROJECT_CONTENT_CACHE_MB, 기본 64MB)에
+보관되므로, 같은 프로젝트를 여러 번 열어도 바뀌지 않은 파일은 다시 읽지 않습니다.
+"""
+
+import codecs
+import fnmatch
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+_MAX_FILE_BYTES = int(os.getenv("PROJECT_MAX_FILE_KB", "256")) * 1024
+_CACHE_MAX_BYTES = int(os.getenv("PROJECT_CONTENT_CACHE_MB", "64")) * 1024 * 1024
+_SNIFF_BYTES = 8192
+
+_SKIP_DIRS = {".git", "__pycache__", "venv", ".venv", "node_modules", ".mypy_cache", ".pytest_cache"}
+_SKIP_NAMES = {".factory_meta.json", ".factory_index.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock"}
+_SKIP_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".bmp", ".mp3", ".wav", ".ogg", ".mp4", ".webm",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot", ".zip", ".gz", ".tar", ".7z", ".pdf",
+    ".pyc", ".pyo", ".so", ".dll", ".exe", ".db", ".sqlite", ".sqlite3", ".pkl", ".npy", ".parquet",
+}
+
+_content_cache: OrderedDict = OrderedDict()   # 절대경로 → (mtime_ns, size, 내용), 최근 사용 순
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _cache_get(full_path: str, key: tuple):
+    with _cache_lock:
+        cached = _content_cache.get(full_path)
+        if cached is None or cached[:2] != key:
+            return None
+        _content_cache.move_to_end(full_path)
+        return cached[2]
+
+
+def _cache_put(full_path: str, key: tuple, content: str) -> None:
+    global _cache_bytes
+    if key[1] > _CACHE_MAX_BYTES:
+        return
+    with _cache_lock:
+        previous = _content_cache.pop(full_path, None)
+        if previous is not None:
+            _cache_bytes -= previous[1]
+        _content_cache[full_path] = (*key, content)
+        _cache_bytes += key[1]
+        while _cache_bytes > _CACHE_MAX_BYTES:
+            _, evicted = _content_cache.popitem(last=False)
+            _cache_bytes -= evicted[1]
+
+
+def _looks_like_text(full_path: str) -> bool:
+    """앞부분이 NUL 없는 UTF-8이면 True (잘린 멀티바이트 문자는 허용)."""
+    try:
+        with open(full_path, "rb") as f:
+            head = f.read(_SNIFF_BYTES)
+        if b"\0" in head:
+            return False
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return True
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def _load_gitignore(root: str) -> list:
+    """루트 .gitignore의 패턴 목록 → [(패턴, 디렉토리 전용 여부, 루트 고정 여부), ...].
+
+    부정 패턴(!)과 중첩 .gitignore는 지원하지 않습니다.
+    """
+    patterns = []
+    try:
+        with open(os.path.join(root, ".gitignore"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return patterns
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(("#", "!")):
+            continue
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        patterns.append((line.lstrip("/"), dir_only, anchored))
+    return patterns
+
+
+def _ignored(rel_path: str, is_dir: bool, patterns: list) -> bool:
+    name = rel_path.rsplit("/", 1)[-1]
+    for pattern, dir_only, anchored in patterns:
+        if dir_only and not is_dir:
+            continue
+        if fnmatch.fnmatch(rel_path if anchored else name, pattern):
+            return True
+    return False
+
+
+class ProjectCodes(MutableMapping):
+    """프로젝트 파일을 처음 접근할 때 읽는 {상대경로: 코드} 매핑.
+
+    대입한 값은 메모리에만 보관되며 디스크에는 쓰지 않습니다 (저장은 _save_codes_to_disk 담당).
+
+    Args:
+        root: 프로젝트 디렉토리
+        max_bytes: 이보다 큰 파일은 목록에서 제외
+    """
+
+    def __init__(self, root: str, max_bytes: int = _MAX_FILE_BYTES):
+        self.root = root
+        self._stats: dict = {}      # 디스크 파일 상대경로 → (mtime_ns, size)
+        self._memory: dict = {}     # 대입된 내용 (디스크 내용보다 우선)
+        self._scan(max_bytes)
+
+    def _scan(self, max_bytes: int) -> None:
+        patterns = _load_gitignore(self.root)
+        for dirpath, dirs, files in os.walk(self.root):
+            rel_dir = os.path.relpath(dirpath, self.root).replace("\\", "/")
+            rel_dir = "" if rel_dir == "." else rel_dir + "/"
+            dirs[:] = [
+                d for d in dirs
+                if d not in _SKIP_DIRS and not _ignored(rel_dir + d, True, patterns)
+            ]
+            for name in files:
+                rel_path = rel_dir + name
+                if name in _SKIP_NAMES or os.path.splitext(name)[1].lower() in _SKIP_EXTENSIONS:
+                    continue
+                if _ignored(rel_path, False, patterns):
+                    continue
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                if st.st_size > max_bytes or not _looks_like_text(os.path.join(dirpath, name)):
+                    continue
+                self._stats[rel_path] = (st.st_mtime_ns, st.st_size)
+
+    def _read(self, rel_path: str) -> str:
+        full_path = os.path.abspath(os.path.join(self.root, rel_path))
+        st = os.stat(full_path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _cache_get(full_path, key)
+        if cached is not None:
+            return cached
+        with open(full_path, encoding="utf-8") as f:
+            content = f.read()
+        _cache_put(full_path, key, content)
+        return content
+
+    def stat(self, path: str):
+        """디스크 파일의 목록 시점 (mtime_ns, size). 메모리에서 대입된 경로나 없는 경로면 None."""
+        if path in self._memory:
+            return None
+        return self._stats.get(path)
+
+    def assigned(self) -> dict:
+        """메모리에서 대입된 {경로: 코드} (디스크 내용과 다를 수 있는 항목)."""
+        return dict(self._memory)
+
+    def copy(self) -> "ProjectCodes":
+        """디렉토리를 다시 훑지 않는 사본 (목록·대입 내용만 복사, 파일 내용은 캐시 공유)."""
+        clone = ProjectCodes.__new__(ProjectCodes)
+        clone.root = self.root
+        clone._stats = dict(self._stats)
+        clone._memory = dict(self._memory)
+        return clone
+
+    # ── Mapping 인터페이스 ─────────────────────────────────────────────────
+
+    def __getitem__(self, path: str) -> str:
+        if path in self._memory:
+            return self._memory[path]
+        if path not in self._stats:
+            raise KeyError(path)
+        try:
+            return self._read(path)
+        except (OSError, UnicodeDecodeError):
+            del self._stats[path]  # 삭제됐거나 텍스트가 아닌 파일 → 매핑에서 제외
+            raise KeyError(path)
+
+    def __setitem__(self, path: str, content: str) -> None:
+        self._memory[path] = content
+
+    def __delitem__(self, path: str) -> None:
+        found = self._memory.pop(path, None) is not None
+        found = self._stats.pop(path, None) is not None or found
+        if not found:
+            raise KeyError(path)
+
+    def __contains__(self, path) -> bool:
+        if path in self._memory:
+            return True
+        if path not in self._stats:
+            return False
+        try:
+            self[path]   # 읽을 수 없으면 목록에서 빠지므로 in 결과와 [] 결과가 어긋나지 않음
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        yield from self._memory
+        yield from (p for p in list(self._stats) if p not in self._memory)
+
+    def __len__(self) -> int:
+        return len(self._memory) + sum(1 for p in self._stats if p not in self._memory)
+
+    def items(self):
+        """(경로, 코드) 쌍. 읽을 수 없는 파일은 건너뜁니다."""
+        for path in list(self):
+            try:
+                yield path, self[path]
+            except KeyError:
+                continue
+
+    def values(self):
+        for _, content in self.items():
+            yield content
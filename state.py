@@ -1,4 +1,4 @@
-from typing import TypedDict, Dict, Any, Optional
+from typing import TypedDict, Dict, Any, List, Mapping, Optional
 
 
 class AgentState(TypedDict):
@@ -10,8 +10,11 @@ class AgentState(TypedDict):
     file_tree: Dict[str, str]              # 파일명과 파일 설명
     interface_contracts: Dict[str, str]    # 파일별 공개 API 계약 (메서드 시그니처 + 의존성 주입)
     design_spec: Dict[str, Any]            # Designer가 생성한 UI/UX 디자인 스펙
-    codes: Dict[str, str]                  # 실제 생성된 파일별 코드 {파일명: 코드내용}
+    codes: Mapping[str, str]               # 실제 생성된 파일별 코드 {파일명: 코드내용} (보통 blob_store.CodesView)
     feedback: str                          # QC의 피드백
     current_step: str                      # 현재 진행 단계
     mode: str                              # 실행 모드: "new" | "upgrade"
     log_path: Optional[str]               # 체크포인트 로그 파일 경로
+    run_id: Optional[str]                  # 실행 식별자 (SQLite 체크포인트 저장소에서 발급)
+    impact_scope: Optional[List[str]]      # 고도화 영향 범위 (전체 코드를 보여 줄 파일, None이면 전체)
+    done_files: List[str]                  # 생성 완료된 파일 (파일 단위 체크포인트 → 재개 시 건너뜀)
@@ -0,0 +1,183 @@
+"""에이전트 실행 결과를 상태 패치로 받아 병합 (충돌 감지).
+
+에이전트는 공유 state dict를 state.update(...)로 직접 고치고 그대로 반환하는 구조라,
+두 에이전트를 동시에 돌릴 수 없고 무엇이 바뀌었는지도 알 수 없었습니다.
+run_agent()는 에이전트를 state의 사본(fork) 위에서 실행하고, 결과를 원래 state와 비교해
+StatePatch(추가·변경·삭제된 파일, 바뀐 필드)로 돌려줍니다. 원래 state는 건드리지 않습니다.
+apply_patch()는 오케스트레이터(단일 writer)에서 패치를 병합하며, 패치가 만들어진 뒤
+같은 파일·필드가 다른 값으로 바뀌어 있으면 PatchConflict를 발생시킵니다.
+
+fork는 codes를 본문 복사 없이 복제하고(CodesView.copy / ProjectCodes.copy),
+나머지 dict·list 필드는 한 단계만 복사합니다.
+
+병합 규칙:
+  codes          파일 단위 — 시작 시점 해시와 현재 해시가 다르면 충돌 (같은 내용으로 바꾼 경우 제외)
+  done_files     합집합 (순서 유지)
+  current_step   마지막에 병합한 패치가 우선 (진행 표시용)
+  feedback       마지막에 병합한 패치가 우선
+  그 외 필드      시작 시점 값과 현재 값이 다르면 충돌
+"""
+
+from blob_store import CodesView
+from vfs import content_hash
+
+_LAST_WRITER_WINS = {"current_step", "feedback"}
+_APPEND_ONLY = {"done_files"}
+
+
+class PatchConflict(RuntimeError):
+    """패치가 기준으로 삼은 값이 병합 시점에 이미 다른 값으로 바뀌어 있음."""
+
+
+class StatePatch:
+    """에이전트 한 번의 실행이 state에 남긴 변경분.
+
+    Args:
+        agent: 패치를 만든 에이전트 이름
+        codes: 추가·변경된 파일 {경로: 코드}
+        removed: 삭제된 파일 경로 목록
+        fields: codes 외에 바뀐 필드 {키: 새 값} (codes를 통째로 교체한 경우 "codes" 포함)
+        base_hashes: 변경·삭제 파일의 시작 시점 해시 (없던 파일은 None)
+        base_fields: 바뀐 필드의 시작 시점 값
+    """
+
+    __slots__ = ("agent", "codes", "removed", "fields", "base_hashes", "base_fields")
+
+    def __init__(self, agent: str, codes: dict = None, removed=(), fields: dict = None,
+                 base_hashes: dict = None, base_fields: dict = None):
+        self.agent = agent
+        self.codes = codes or {}
+        self.removed = list(removed)
+        self.fields = fields or {}
+        self.base_hashes = base_hashes or {}
+        self.base_fields = base_fields or {}
+
+    def changed_paths(self) -> list:
+        return sorted(set(self.codes) | set(self.removed))
+
+    def is_empty(self) -> bool:
+        return not (self.codes or self.removed or self.fields)
+
+    def __repr__(self) -> str:
+        return (f"StatePatch({self.agent}: 파일 {len(self.codes)}개 변경, {len(self.removed)}개 삭제, "
+                f"필드 {sorted(self.fields)})")
+
+
+def _lookup(codes, path: str):
+    """codes[path], 없거나 읽을 수 없으면 None (ProjectCodes는 목록에 있어도 읽기에 실패할 수 있음)."""
+    if codes is None:
+        return None
+    try:
+        return codes[path]
+    except KeyError:
+        return None
+
+
+def _hash_of(codes, path: str):
+    if isinstance(codes, CodesView):
+        return codes.digest(path) if path in codes else None
+    content = _lookup(codes, path)
+    return None if content is None else content_hash(content)
+
+
+def fork(state: dict) -> dict:
+    """에이전트 실행용 state 사본 (codes는 본문 복사 없이, dict·list 필드는 한 단계 복사)."""
+    work = dict(state)
+    for key, value in state.items():
+        if key == "codes" and value is not None:
+            work[key] = value.copy()
+        elif isinstance(value, dict):
+            work[key] = dict(value)
+        elif isinstance(value, list):
+            work[key] = list(value)
+    return work
+
+
+def diff(agent: str, base: dict, work: dict, forked_codes=None) -> StatePatch:
+    """base(원래 state)와 work(에이전트가 고친 사본)의 차이 → StatePatch.
+
+    forked_codes는 fork 시점의 work["codes"] 객체입니다. 에이전트가 codes를 다른 객체로
+    교체했다면 파일 단위 비교 대신 "codes" 필드 교체로 기록합니다.
+    """
+    base_codes = base.get("codes")
+    work_codes = work.get("codes")
+    fields, base_fields = {}, {}
+    codes, removed, base_hashes = {}, [], {}
+
+    if work_codes is forked_codes and work_codes is not None:
+        if isinstance(work_codes, CodesView) and isinstance(base_codes, CodesView):
+            before = base_codes.digests()
+            codes = {p: work_codes[p] for p, d in work_codes.digests().items() if before.get(p) != d}
+        else:
+            assigned = getattr(work_codes, "assigned", None)
+            candidates = assigned() if assigned else dict(work_codes.items())
+            codes = {
+                p: c for p, c in candidates.items()
+                if _lookup(base_codes, p) != c
+            }
+        removed = [p for p in (base_codes or ()) if p not in work_codes]
+        base_hashes = {p: _hash_of(base_codes, p) for p in list(codes) + removed}
+    elif work_codes is not base_codes:
+        fields["codes"] = work_codes
+        base_fields["codes"] = base_codes
+
+    for key, value in work.items():
+        if key == "codes":
+            continue
+        if key not in base or base[key] != value:
+            fields[key] = value
+            base_fields[key] = base.get(key)
+
+    return StatePatch(agent, codes, removed, fields, base_hashes, base_fields)
+
+
+def run_agent(agent, state: dict, *args) -> StatePatch:
+    """state의 사본에서 agent(state, *args)를 실행하고 변경분을 패치로 반환 (state는 그대로)."""
+    work = fork(state)
+    forked_codes = work.get("codes")
+    result = agent(work, *args)
+    return diff(getattr(agent, "__name__", "agent"), state, result, forked_codes)
+
+
+def apply_patch(state: dict, patch: StatePatch) -> dict:
+    """patch를 state에 병합하고 state를 반환.
+
+    Raises:
+        PatchConflict: 패치의 기준 값이 이미 다른 값으로 바뀐 파일·필드가 있을 때 (아무것도 병합하지 않음)
+    """
+    codes = state.get("codes")
+    conflicts = []
+    for path in patch.changed_paths():
+        current = _hash_of(codes, path)
+        new = content_hash(patch.codes[path]) if path in patch.codes else None
+        if current not in (patch.base_hashes.get(path), new):
+            conflicts.append(path)
+    for key, value in patch.fields.items():
+        if key in _LAST_WRITER_WINS or key in _APPEND_ONLY:
+            continue
+        current, base = state.get(key), patch.base_fields.get(key)
+        if key == "codes":
+            ok = current is base or current is value
+        else:
+            ok = current == base or current == value
+        if not ok:
+            conflicts.append(key)
+    if conflicts:
+        raise PatchConflict(f"{patch.agent} 패치 충돌: {', '.join(conflicts)}")
+
+    for key, value in patch.fields.items():
+        if key in _APPEND_ONLY:
+            merged = list(state.get(key) or [])
+            merged += [item for item in value if item not in merged]
+            state[key] = merged
+        else:
+            state[key] = value
+    codes = state.get("codes")
+    if patch.codes or patch.removed:
+        if codes is None:
+            codes = state["codes"] = CodesView()
+        for path, content in patch.codes.items():
+            codes[path] = content
+        for path in patch.removed:
+            codes.pop(path, None)
+    return state
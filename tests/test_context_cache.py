@@ -0,0 +1,89 @@
+"""PrefixCache local 백엔드 테스트 (가짜 client, 네트워크 없음)."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agents import context_cache
+from agents.context_cache import PrefixCache
+from agents.prompt_builder import PromptBuilder
+
+PREFIX = "공유 접두부 " + "x" * 8000
+
+
+class FakeModels:
+    def __init__(self, fail_with=None):
+        self.contents = []
+        self.fail_with = fail_with
+
+    def generate_content(self, model, contents, config=None):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.contents.append(contents)
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+
+class FakeClient:
+    def __init__(self):
+        self.models = FakeModels()
+
+
+def _cache():
+    return PrefixCache(FakeClient(), "test-model", PromptBuilder(PREFIX), label="T", backend="local")
+
+
+def test_local_counts_hits_from_second_call():
+    cache = _cache()
+    for i in range(3):
+        cache.generate(f"파일 {i}")
+
+    assert cache.calls == 3
+    assert cache.cache_hits == 2
+    assert cache.cached_tokens > 0
+    assert cache.client.models.contents == [PREFIX + f"파일 {i}" for i in range(3)]
+    name = cache.name
+    cache.close()
+    assert name not in context_cache._local_caches
+
+
+def test_missing_cache_falls_back_to_full_prompt():
+    cache = _cache()
+    cache.generate("a")
+    cache.generate("b")
+    context_cache._local_caches.pop(cache.name)   # 만료·삭제된 캐시
+
+    response = cache.generate("c")
+    cache.generate("d")
+
+    assert response.text == "ok"
+    assert cache.name is None
+    assert cache.cache_hits == 1
+    assert cache.client.models.contents[-2:] == [PREFIX + "c", PREFIX + "d"]
+
+
+def test_ttl_is_refreshed_near_expiry():
+    cache = _cache()
+    cache.generate("a")
+    cache.generate("b")
+    soon = time.monotonic() + 1
+    cache.expires_at = soon
+    context_cache._local_caches[cache.name] = (PREFIX, soon)
+
+    cache.generate("c")
+
+    assert cache.expires_at > soon + 60
+    assert context_cache._local_caches[cache.name][1] == cache.expires_at
+    assert cache.cache_hits == 2
+    cache.close()
+
+
+def test_other_errors_are_not_swallowed():
+    cache = _cache()
+    cache.generate("a")
+    cache.client.models.fail_with = RuntimeError("quota exceeded")
+
+    with pytest.raises(RuntimeError):
+        cache.generate("b")
+    assert cache.name is not None   # 캐시와 무관한 오류로는 캐시를 버리지 않음
+    cache.close()
@@ -0,0 +1,191 @@
+"""프롬프트 토큰 사전 추정과 컨텍스트 창 가드.
+
+프롬프트 크기에 상한이 없어, 창을 넘으면 API가 거절하거나 출력이 잘린 채 돌아와
+"# 생성 실패" 스텁이나 반쯤 쓰인 파일이 남았습니다. 이 모듈은
+
+  - 로컬 토큰 추정기: ASCII는 약 4자당 1토큰, 한글 등 비ASCII는 글자당 0.8토큰으로 추정하고,
+    모델별 보정 계수(실제 usage_metadata.prompt_token_count / 추정치의 지수 이동 평균)를 곱합니다.
+  - 창 가드: 모델의 입력 창에서 출력 예약분을 뺀 한도를 넘는 프롬프트는 보내기 전에 PromptTooLarge
+  - 결정적 축소: fit_blocks()로 코드 컨텍스트를 큰 파일부터 골격으로 바꾸고, 그래도 넘치면 블록을 생략
+
+을 제공합니다. 보정 계수는 메모리에서 갱신하다가 프로세스 종료 시(또는 flush_calibration())
+.agent_logs/token_calibration.json에 한 번 기록되어 다음 실행에도 쓰입니다.
+
+환경변수:
+  MODEL_CONTEXT_TOKENS  입력 창 크기 재정의 (기본: 모델별 표, 모르는 모델은 128k)
+  MODEL_OUTPUT_RESERVE  출력용으로 남겨 둘 토큰 수 재정의
+  PROMPT_MAX_TOKENS     프롬프트 상한 (0 = 창 - 출력 예약, 비용 상한이 필요할 때 지정)
+"""
+
+import atexit
+import math
+import os
+
+import codec
+from vfs import atomic_write
+
+_CALIBRATION_PATH = ".agent_logs/token_calibration.json"
+
+# 모델 → (입력 창, 출력 예약)
+_WINDOWS = {
+    "gemini-2.5-pro": (1_048_576, 65_536),
+    "gemini-2.5-flash": (1_048_576, 65_536),
+    "gemini-2.5-flash-lite": (1_048_576, 65_536),
+    "gemini-2.0-flash": (1_048_576, 8_192),
+}
+_DEFAULT_WINDOW = (131_072, 8_192)
+
+_CONTEXT_OVERRIDE = int(os.getenv("MODEL_CONTEXT_TOKENS", "0"))
+_RESERVE_OVERRIDE = int(os.getenv("MODEL_OUTPUT_RESERVE", "0"))
+_PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "0"))
+
+_ASCII_CHARS_PER_TOKEN = 4.0
+_NON_ASCII_TOKENS_PER_CHAR = 0.8
+# _raw_estimate의 글자당 상한: UTF-8 4바이트 문자는 비ASCII 1.5자로 세어짐 (추가 3바이트 / 2)
+_MAX_TOKENS_PER_CHAR = 1.5 * _NON_ASCII_TOKENS_PER_CHAR
+_CALIBRATION_WEIGHT = 0.2        # 새 관측값의 가중치 (지수 이동 평균)
+_MIN_CALIBRATION_TOKENS = 200    # 너무 짧은 프롬프트는 보정에 쓰지 않음
+
+_factors = None                  # 모델 → 보정 계수 (처음 사용할 때 로드)
+_dirty = False                   # 디스크에 아직 기록하지 않은 보정값이 있음
+
+
+class PromptTooLarge(ValueError):
+    """추정 토큰 수가 모델의 프롬프트 한도를 넘음 (API를 호출하지 않음)."""
+
+
+def _load_factors() -> dict:
+    global _factors
+    if _factors is None:
+        try:
+            with open(_CALIBRATION_PATH, "rb") as f:
+                _factors = codec.loads(f.read())
+        except (OSError, ValueError):
+            _factors = {}
+    return _factors
+
+
+def _raw_estimate(text: str) -> float:
+    if not text:
+        return 0.0
+    if text.isascii():
+        return len(text) / _ASCII_CHARS_PER_TOKEN
+    # 비ASCII 문자 수 근사: UTF-8 추가 바이트 / 2 (한글 1자 = 3바이트)
+    non_ascii = (len(text.encode("utf-8")) - len(text)) // 2
+    return (len(text) - non_ascii) / _ASCII_CHARS_PER_TOKEN + non_ascii * _NON_ASCII_TOKENS_PER_CHAR
+
+
+def estimate_tokens(*parts: str, model: str = None) -> int:
+    """parts를 이어 붙인 프롬프트의 추정 토큰 수 (model의 보정 계수 적용)."""
+    raw = sum(_raw_estimate(p) for p in parts)
+    factor = _load_factors().get(model, 1.0) if model else 1.0
+    return math.ceil(raw * factor)
+
+
+def record_usage(model: str, response, *parts: str) -> None:
+    """응답의 usage_metadata.prompt_token_count로 model의 보정 계수를 갱신 (디스크 기록은 flush_calibration)."""
+    global _dirty
+    usage = getattr(response, "usage_metadata", None)
+    actual = getattr(usage, "prompt_token_count", None) if usage is not None else None
+    raw = sum(_raw_estimate(p) for p in parts)
+    if not actual or raw < _MIN_CALIBRATION_TOKENS:
+        return
+    ratio = min(max(actual / raw, 0.3), 3.0)
+    factors = _load_factors()
+    previous = factors.get(model)
+    factors[model] = round(ratio if previous is None else
+                           previous + _CALIBRATION_WEIGHT * (ratio - previous), 4)
+    _dirty = True
+
+
+def flush_calibration() -> None:
+    """메모리의 보정 계수를 디스크에 기록 (바뀐 값이 있을 때만, 종료 시 자동 호출)."""
+    global _dirty
+    if not _dirty:
+        return
+    try:
+        atomic_write(_CALIBRATION_PATH, codec.dumps(dict(_factors)))
+        _dirty = False
+    except OSError:
+        pass  # 보정값 저장 실패는 추정 정확도에만 영향
+
+
+atexit.register(flush_calibration)
+
+
+def prompt_limit(model: str) -> int:
+    """model에 보낼 수 있는 프롬프트 토큰 한도 (입력 창 - 출력 예약, PROMPT_MAX_TOKENS 적용)."""
+    window, reserve = _WINDOWS.get(model, _DEFAULT_WINDOW)
+    window = _CONTEXT_OVERRIDE or window
+    reserve = _RESERVE_OVERRIDE or reserve
+    limit = window - reserve
+    if _PROMPT_MAX_TOKENS:
+        limit = min(limit, _PROMPT_MAX_TOKENS)
+    return limit
+
+
+def remaining(model: str, *parts: str) -> int:
+    """parts를 넣고 남는 프롬프트 토큰 (음수면 이미 초과)."""
+    return prompt_limit(model) - estimate_tokens(*parts, model=model)
+
+
+def ensure_fits(model: str, *parts: str) -> int:
+    """추정 토큰 수를 반환. 한도를 넘으면 PromptTooLarge."""
+    estimate = estimate_tokens(*parts, model=model)
+    limit = prompt_limit(model)
+    if estimate > limit:
+        raise PromptTooLarge(f"프롬프트 약 {estimate:,} 토큰 > {model} 한도 {limit:,} 토큰")
+    return estimate
+
+
+def generate_checked(client, model: str, contents: str, **kwargs):
+    """창 가드를 거쳐 generate_content를 호출하고 실제 사용량으로 추정기를 보정."""
+    ensure_fits(model, contents)
+    response = client.models.generate_content(model=model, contents=contents, **kwargs)
+    record_usage(model, response, contents)
+    return response
+
+
+def fit_blocks(blocks: list, budget: int, model: str = None) -> tuple:
+    """컨텍스트 블록들을 budget 토큰 안에 맞춤 → (남은 블록 목록, 골격으로 바꾼 수, 생략한 수).
+
+    blocks는 [(전체 블록, 골격 블록을 만드는 함수), ...]입니다. 결정적으로 축소합니다:
+      1. 전부 넣어 맞으면 그대로
+      2. 큰 블록부터 골격으로 교체 (크기가 같으면 앞쪽 블록부터)
+      3. 그래도 넘치면 큰 블록부터 생략
+    반환 목록은 원래 순서를 유지합니다.
+    """
+    chosen = [full for full, _ in blocks]
+    # 빠른 경로: _raw_estimate의 글자당 상한으로 잡아도 맞으면 블록별 추정 생략
+    factor = _load_factors().get(model, 1.0) if model else 1.0
+    if sum(len(full) for full in chosen) * _MAX_TOKENS_PER_CHAR * factor <= budget:
+        return chosen, 0, 0
+
+    sizes = [estimate_tokens(full, model=model) for full in chosen]
+    total = sum(sizes)
+    if total <= budget:
+        return chosen, 0, 0
+
+    order = sorted(range(len(blocks)), key=lambda i: (-sizes[i], i))
+    degraded = 0
+    for i in order:
+        if total <= budget:
+            break
+        skeleton = blocks[i][1]()
+        skeleton_size = estimate_tokens(skeleton, model=model)
+        if skeleton_size < sizes[i]:
+            chosen[i] = skeleton
+            total += skeleton_size - sizes[i]
+            sizes[i] = skeleton_size
+            degraded += 1
+
+    dropped = 0
+    for i in sorted(range(len(blocks)), key=lambda i: (-sizes[i], i)):
+        if total <= budget:
+            break
+        if chosen[i] is not blocks[i][0]:
+            degraded -= 1   # 골격으로 바꿨다가 생략한 블록은 생략으로만 집계
+        chosen[i] = None
+        total -= sizes[i]
+        dropped += 1
+    return [b for b in chosen if b is not None], degraded, dropped
@@ -0,0 +1,188 @@
+"""QC 루프용 인메모리 가상 프로젝트 파일시스템.
+
+QC는 반복마다 전체 파일을 디스크에서 다시 읽고, 수정 파일을 즉시 디스크에 쓰던 구조였습니다.
+ProjectFS는 {경로: 코드} 매핑처럼 동작하는 오버레이로, 각 파일의 내용(blob_store 참조)·해시·dirty
+플래그를 메모리에 보관합니다. 실제 파일이 꼭 필요한 검사기(node --check)에는 real_path()로
+임시 사본을 제공하고, 변경분은 마지막에 flush()로 한 번에 원자적으로 기록합니다.
+
+프로젝트마다 독립된 인스턴스를 쓰므로 여러 프로젝트의 QC를 동시에 돌려도 서로 간섭하지 않습니다.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import MutableMapping
+
+import blob_store
+
+# 새 파일 권한 계산용 umask (os.umask는 조회만 하는 API가 없어 import 시 한 번 읽고 되돌림)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def content_hash(content: str) -> str:
+    """파일 내용의 sha256 hex digest."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _copy_mode(tmp_path: str, path: str) -> None:
+    """mkstemp의 0600 대신, 기존 파일이 있으면 그 권한(+x 등)을, 없으면 umask를 따른 권한을 적용."""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp_path, mode)
+
+
+def atomic_write(path: str, data, encoding: str = "utf-8") -> None:
+    """임시 파일에 쓴 뒤 os.replace로 교체 (중간에 죽어도 반쯤 쓰인 파일이 남지 않음)."""
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=parent or ".", prefix=".tmp_", suffix=os.path.basename(path))
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+                f.write(data)
+        _copy_mode(tmp_path, path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ProjectFS(MutableMapping):
+    """프로젝트 파일의 인메모리 오버레이. dict처럼 {경로: 코드}로 읽고 씁니다.
+
+    내용은 blob_store.CodesView로 보관하므로, codes가 CodesView면 본문 사본이나 해시 재계산 없이
+    참조 테이블만 공유합니다 (처음 수정할 때 테이블만 복사).
+
+    Args:
+        root: 최종적으로 flush할 프로젝트 디렉토리
+        codes: 초기 내용 (디스크와 동기화된 상태로 간주, dirty=False)
+    """
+
+    def __init__(self, root: str, codes=None):
+        self.root = root
+        self._view = blob_store.CodesView(codes)
+        self._dirty: set = set()
+        self._deleted: set = set()
+        self._scratch_dir = None
+
+    # ── Mapping 인터페이스 ─────────────────────────────────────────────────
+
+    def __getitem__(self, path: str) -> str:
+        return self._view[path]
+
+    def __setitem__(self, path: str, content: str) -> None:
+        previous = self._view.digest(path) if path in self._view else None
+        self._view[path] = content
+        if self._view.digest(path) == previous:
+            return  # 내용 동일 → dirty 표시하지 않음
+        self._dirty.add(path)
+        self._deleted.discard(path)
+
+    def __delitem__(self, path: str) -> None:
+        del self._view[path]
+        self._dirty.discard(path)
+        self._deleted.add(path)
+
+    def __contains__(self, path) -> bool:
+        return path in self._view
+
+    def __iter__(self):
+        return iter(self._view)
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    # ── 메타데이터 ─────────────────────────────────────────────────────────
+
+    def hash(self, path: str) -> str:
+        return self._view.digest(path)
+
+    def is_dirty(self, path: str) -> bool:
+        if path not in self._view:
+            raise KeyError(path)
+        return path in self._dirty
+
+    def dirty_paths(self) -> list:
+        return sorted(self._dirty)
+
+    def snapshot(self):
+        """현재 내용의 copy-on-write 사본 (state["codes"] 반환용, 본문은 복사하지 않음)."""
+        return self._view.copy()
+
+    def to_dict(self) -> dict:
+        """현재 내용의 일반 dict 사본."""
+        return dict(self._view.items())
+
+    # ── 실제 파일이 필요한 검사기용 ───────────────────────────────────────
+
+    def real_path(self, path: str) -> str:
+        """path의 현재 내용을 담은 실제 파일 경로.
+
+        디스크와 동기화된(dirty=False) 파일은 프로젝트 디렉토리의 원본을,
+        메모리에서 변경된 파일은 임시 디렉토리의 사본을 돌려줍니다.
+        """
+        content = self._view[path]
+        disk_path = os.path.join(self.root, path)
+        if path not in self._dirty and os.path.exists(disk_path):
+            return disk_path
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="vfs_")
+        scratch_path = os.path.join(self._scratch_dir, path)
+        os.makedirs(os.path.dirname(scratch_path), exist_ok=True)
+        with open(scratch_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return scratch_path
+
+    # ── 디스크 반영 ───────────────────────────────────────────────────────
+
+    def flush(self) -> list:
+        """dirty 파일을 디스크에 일괄 기록하고 기록된 경로 목록을 반환.
+
+        모든 파일을 먼저 임시 파일로 쓴 뒤 한꺼번에 교체하므로, 쓰기 도중 실패하면
+        프로젝트 디렉토리는 이전 상태 그대로 남습니다.
+        """
+        dirty = self.dirty_paths()
+        staged = []
+        try:
+            for path in dirty:
+                full_path = os.path.join(self.root, path)
+                parent = os.path.dirname(full_path)
+                os.makedirs(parent or ".", exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=parent or ".", prefix=".tmp_")
+                staged.append((tmp_path, full_path))
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                    f.write(self._view[path])
+                _copy_mode(tmp_path, full_path)
+        except BaseException:
+            for tmp_path, _ in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        for tmp_path, full_path in staged:
+            os.replace(tmp_path, full_path)
+        self._dirty.clear()
+
+        for path in sorted(self._deleted):
+            full_path = os.path.join(self.root, path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+        self._deleted.clear()
+
+        self.close()
+        return dirty
+
+    def close(self) -> None:
+        """real_path()가 만든 임시 사본 정리."""
+        if self._scratch_dir is not None:
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            self._scratch_dir = None